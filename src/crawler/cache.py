@@ -0,0 +1,309 @@
+"""Disk-backed conditional HTTP cache used by :class:`src.crawler.http.HttpClient`."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_DIR = Path("var") / "http_cache"
+INDEX_NAME = "index.json"
+
+# Headers describing the wire encoding rather than the (already decoded) body.
+_DROPPED_HEADERS = frozenset(
+    {"connection", "content-encoding", "content-length", "keep-alive", "transfer-encoding"}
+)
+
+
+def parse_cache_control(value: str | None) -> dict[str, str | None]:
+    """Parse a ``Cache-Control`` header into lower-cased directives."""
+
+    directives: dict[str, str | None] = {}
+    if not value:
+        return directives
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """Metadata for one cached URL; the body lives under its content digest."""
+
+    url: str
+    digest: str
+    size: int
+    stored_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+    max_age: float | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def is_fresh(self, now: float) -> bool:
+        return self.max_age is not None and now - self.stored_at < self.max_age
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Per-run cache counters."""
+
+    requests: int = 0
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    stored: int = 0
+    evicted: int = 0
+    bytes_saved: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        if not self.requests:
+            return 0.0
+        return (self.hits + self.revalidated) / self.requests
+
+    def as_dict(self) -> dict[str, Any]:
+        payload: dict[str, Any] = asdict(self)
+        payload["hit_ratio"] = self.hit_ratio
+        return payload
+
+
+class HttpCache:
+    """Content-addressed response cache with ETag/Last-Modified revalidation.
+
+    Bodies are stored once per SHA-256 digest under ``bodies/`` and shared
+    between URLs; the index of URL entries is kept in LRU order and written to
+    ``index.json`` on :meth:`flush`/:meth:`close` (and every *flush_every*
+    stores). Entries are evicted least-recently-used first once the unique
+    body bytes exceed *max_bytes*; a body larger than *max_bytes* on its own
+    is not cached at all.
+    """
+
+    def __init__(
+        self,
+        root: Path | str = DEFAULT_CACHE_DIR,
+        *,
+        max_bytes: int = 512 * 1024 * 1024,
+        flush_every: int = 100,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self._root = Path(root)
+        self._bodies = self._root / "bodies"
+        self._bodies.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._flush_every = max(1, flush_every)
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._refs: dict[str, int] = {}
+        self._total_bytes = 0
+        self._dirty = 0
+        self.stats = CacheStats()
+        self._load()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def now(self) -> float:
+        return self._clock()
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        """Return the entry for *url* and mark it most recently used."""
+
+        with self._lock:
+            self.stats.requests += 1
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def serve(self, entry: CacheEntry, *, revalidated: bool = False) -> Response | None:
+        """Build a response from the cached body, or ``None`` if it has gone missing."""
+
+        try:
+            body = self._body_path(entry.digest).read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self._remove(entry.url)
+            return None
+
+        with self._lock:
+            if revalidated:
+                self.stats.revalidated += 1
+            else:
+                self.stats.hits += 1
+            self.stats.bytes_saved += len(body)
+
+        response = Response()
+        response.status_code = 200
+        response._content = body  # type: ignore[attr-defined]
+        response.url = entry.url
+        response.headers = CaseInsensitiveDict(entry.headers)
+        return response
+
+    def revalidate(self, entry: CacheEntry, not_modified: Response) -> Response | None:
+        """Refresh *entry* after a 304 and return the cached response."""
+
+        with self._lock:
+            entry.stored_at = self.now()
+            if "Cache-Control" in not_modified.headers:
+                entry.max_age = _max_age(parse_cache_control(not_modified.headers["Cache-Control"]))
+            entry.etag = not_modified.headers.get("ETag") or entry.etag
+            entry.last_modified = not_modified.headers.get("Last-Modified") or entry.last_modified
+            self._mark_dirty()
+        return self.serve(entry, revalidated=True)
+
+    def store(self, url: str, response: Response) -> CacheEntry | None:
+        """Record a full response for *url*; returns ``None`` if it is not cacheable."""
+
+        with self._lock:
+            self.stats.misses += 1
+        directives = parse_cache_control(response.headers.get("Cache-Control"))
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        max_age = _max_age(directives)
+        if response.status_code != 200:
+            return None
+
+        uncacheable = "no-store" in directives or (not etag and not last_modified and not max_age)
+        body = b"" if uncacheable else response.content or b""
+        if uncacheable or len(body) > self._max_bytes:
+            # A fresh 200 supersedes the old copy even when it cannot be kept itself;
+            # oversized bodies would also evict everything else.
+            with self._lock:
+                self._remove(url)
+                self._mark_dirty()
+            return None
+        digest = hashlib.sha256(body).hexdigest()
+        entry = CacheEntry(
+            url=url,
+            digest=digest,
+            size=len(body),
+            stored_at=self.now(),
+            etag=etag,
+            last_modified=last_modified,
+            max_age=max_age,
+            headers={
+                key: value
+                for key, value in response.headers.items()
+                if key.lower() not in _DROPPED_HEADERS
+            },
+        )
+        with self._lock:
+            body_path = self._body_path(digest)
+            if not body_path.exists():
+                body_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = body_path.with_suffix(".tmp")
+                temp_path.write_bytes(body)
+                os.replace(temp_path, body_path)
+            previous = self._entries.pop(url, None)
+            self._add(entry)
+            if previous is not None:
+                self._release(previous)
+            self.stats.stored += 1
+            self._evict()
+            self._mark_dirty()
+        return entry
+
+    def flush(self) -> None:
+        """Persist the index atomically."""
+
+        with self._lock:
+            payload = [asdict(entry) for entry in self._entries.values()]
+            index_path = self._root / INDEX_NAME
+            temp_path = index_path.with_suffix(".tmp")
+            temp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(temp_path, index_path)
+            self._dirty = 0
+
+    def close(self) -> None:
+        self.flush()
+
+    def _load(self) -> None:
+        index_path = self._root / INDEX_NAME
+        if not index_path.exists():
+            return
+        try:
+            payload = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        for raw in payload if isinstance(payload, list) else ():
+            try:
+                entry = CacheEntry(**raw)
+                present = self._body_path(entry.digest).exists()
+            except (TypeError, KeyError):
+                continue  # a damaged row only loses its own entry
+            if present and entry.size <= self._max_bytes:
+                self._add(entry)
+        self._evict()
+
+    def _add(self, entry: CacheEntry) -> None:
+        self._entries[entry.url] = entry
+        count = self._refs.get(entry.digest, 0)
+        if count == 0:
+            self._total_bytes += entry.size
+        self._refs[entry.digest] = count + 1
+
+    def _remove(self, url: str) -> None:
+        entry = self._entries.pop(url, None)
+        if entry is not None:
+            self._release(entry)
+
+    def _release(self, entry: CacheEntry) -> None:
+        count = self._refs.get(entry.digest, 0) - 1
+        if count > 0:
+            self._refs[entry.digest] = count
+            return
+        self._refs.pop(entry.digest, None)
+        self._total_bytes -= entry.size
+        self._body_path(entry.digest).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        while self._total_bytes > self._max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats.evicted += 1
+
+    def _mark_dirty(self) -> None:
+        self._dirty += 1
+        if self._dirty >= self._flush_every:
+            self.flush()
+
+    def _body_path(self, digest: str) -> Path:
+        return self._bodies / digest[:2] / digest
+
+
+def _max_age(directives: Mapping[str, str | None]) -> float | None:
+    if "no-cache" in directives:
+        return 0.0
+    value = directives.get("max-age")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return 0.0
@@ -0,0 +1,421 @@
+"""Resumable, optionally parallel downloads of large files to disk."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+from requests import Response
+from requests import exceptions as requests_exceptions
+
+from src.crawler.http import HttpClient, HttpClientError, HttpError, HttpNetworkError, RetryConfig, default_client
+from src.utils.retry import retry as retry_call
+
+_CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadError(HttpError):
+    """Raised when a download cannot be completed as requested."""
+
+
+class ChecksumMismatchError(DownloadError):
+    """Raised when the downloaded bytes do not match the expected checksum."""
+
+    def __init__(self, *, url: str, expected: str, actual: str) -> None:
+        super().__init__(f"Checksum mismatch for {url}: expected {expected}, got {actual}", url=url)
+        self.expected = expected
+        self.actual = actual
+
+
+class _RestartDownload(Exception):
+    """The server no longer serves the bytes recorded in the resume state."""
+
+
+class _Cancelled(Exception):
+    """A sibling part failed, so this part stops early."""
+
+
+@dataclass(slots=True)
+class _Part:
+    start: int
+    end: int  # inclusive; -1 while the length is unknown
+    written: int = 0
+
+    @property
+    def offset(self) -> int:
+        return self.start + self.written
+
+    @property
+    def done(self) -> bool:
+        return self.end >= 0 and self.offset > self.end
+
+
+@dataclass(slots=True)
+class _State:
+    url: str
+    size: int | None
+    etag: str | None
+    last_modified: str | None
+    parts: list[_Part] = field(default_factory=list)
+
+    @property
+    def completed(self) -> int:
+        return sum(part.written for part in self.parts)
+
+    def validator(self) -> str | None:
+        return self.etag or self.last_modified
+
+
+@dataclass(frozen=True, slots=True)
+class DownloadResult:
+    """Summary of a finished download."""
+
+    url: str
+    path: Path
+    size: int
+    resumed_bytes: int
+    parts: int
+    elapsed: float
+    digest: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "path": str(self.path),
+            "size": self.size,
+            "resumed_bytes": self.resumed_bytes,
+            "parts": self.parts,
+            "elapsed": self.elapsed,
+            "digest": self.digest,
+        }
+
+
+def _parse_checksum(checksum: str) -> tuple[str, str]:
+    algorithm, _, expected = checksum.rpartition(":")
+    algorithm = algorithm.lower() or "sha256"
+    if algorithm not in hashlib.algorithms_available:
+        raise ValueError(f"Unsupported checksum algorithm: {algorithm}")
+    return algorithm, expected.lower()
+
+
+class DownloadManager:
+    """Stream large files to disk in chunks with resume and parallel ranges.
+
+    Bytes go to ``<dest>.part`` and progress to ``<dest>.part.json``; a failed
+    download called again resumes with ``Range`` (guarded by ``If-Range``)
+    instead of starting over. Files larger than *part_size* are split into
+    ranges fetched by up to *max_parts* threads when the server supports
+    ranges. Each thread holds at most *chunk_size* bytes, so memory stays
+    below ``max_parts * chunk_size`` whatever the file size.
+    """
+
+    def __init__(
+        self,
+        client: HttpClient | None = None,
+        *,
+        chunk_size: int = 1 << 20,
+        part_size: int = 16 << 20,
+        max_parts: int = 4,
+        timeout: float = 30.0,
+        retry: RetryConfig | None = None,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if part_size < 1:
+            raise ValueError("part_size must be at least 1")
+        if max_parts < 1:
+            raise ValueError("max_parts must be at least 1")
+        self._client = client
+        self._chunk_size = chunk_size
+        self._part_size = part_size
+        self._max_parts = max_parts
+        self._timeout = timeout
+        self._retry = retry
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> HttpClient:
+        return self._client or default_client()
+
+    def download(
+        self,
+        url: str,
+        dest: str | Path,
+        *,
+        checksum: str | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> DownloadResult:
+        """Download *url* to *dest*, resuming earlier progress when possible.
+
+        *checksum* is ``"<algorithm>:<hex digest>"`` (bare hex means sha256);
+        on a mismatch the partial download is discarded and
+        :class:`ChecksumMismatchError` raised.
+        """
+
+        expected = _parse_checksum(checksum) if checksum else None
+        target = Path(dest)
+        partial = target.with_name(target.name + ".part")
+        state_path = target.with_name(target.name + ".part.json")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        request_headers = {**(headers or {}), "Accept-Encoding": "identity"}
+        started = time.perf_counter()
+
+        state = self._load_state(url, partial, state_path)
+        resumed = state.completed if state is not None else 0
+        for restart in range(2):
+            opened: list[Response] = []
+            if state is None:
+                state = self._start(url, partial, state_path, request_headers, opened)
+            try:
+                self._fetch_remaining(state, partial, state_path, request_headers, opened)
+                break
+            except _RestartDownload:
+                for response in opened:
+                    response.close()
+                # Every part has stopped by now, so no thread still writes to these files.
+                _remove(partial, state_path)
+                if restart:
+                    raise DownloadError(f"{url} changed while it was being downloaded", url=url) from None
+                state, resumed = None, 0
+        # The loop either broke out after fetching under a state or raised.
+        assert state is not None
+
+        size = partial.stat().st_size
+        if state.size is not None and size != state.size:
+            raise DownloadError(f"Downloaded {size} bytes of {state.size} from {url}", url=url)
+
+        digest = None
+        if expected is not None:
+            algorithm, expected_digest = expected
+            digest = self._hash_file(partial, algorithm)
+            if digest != expected_digest:
+                _remove(partial, state_path)
+                raise ChecksumMismatchError(url=url, expected=expected_digest, actual=digest)
+
+        os.replace(partial, target)
+        _remove(state_path)
+        return DownloadResult(
+            url=url,
+            path=target,
+            size=size,
+            resumed_bytes=resumed,
+            parts=len(state.parts),
+            elapsed=time.perf_counter() - started,
+            digest=digest,
+        )
+
+    def _start(
+        self, url: str, partial: Path, state_path: Path, headers: Mapping[str, str], opened: list[Response]
+    ) -> _State:
+        """Probe with a ranged GET whose response is kept in *opened* as the first part."""
+
+        try:
+            response = self.client.stream(
+                url, timeout=self._timeout, headers={**headers, "Range": f"bytes=0-{self._part_size - 1}"}
+            )
+        except HttpClientError as exc:
+            if exc.status_code != 416:  # an empty file has no satisfiable range
+                raise
+            response = self.client.stream(url, timeout=self._timeout, headers=headers)
+        opened.append(response)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+
+        if response.status_code == 206 and match and match.group(3) != "*":
+            size = int(match.group(3))
+            parts = [
+                _Part(start, min(start + self._part_size, size) - 1) for start in range(0, size, self._part_size)
+            ]
+            state = _State(url, size, etag, last_modified, parts)
+            with open(partial, "wb") as handle:
+                handle.truncate(size)
+        else:
+            if response.status_code == 206:
+                # ``bytes 0-N/*``: the total size is unknown, so read one plain stream to EOF.
+                response.close()
+                opened.remove(response)
+                response = self.client.stream(url, timeout=self._timeout, headers=headers)
+                opened.append(response)
+                size = None
+            else:
+                length = response.headers.get("Content-Length")
+                size = int(length) if length is not None and length.isdigit() else None
+            state = _State(url, size, etag, last_modified, [_Part(0, size - 1 if size is not None else -1)])
+            partial.write_bytes(b"")
+        self._save_state(state, state_path)
+        return state
+
+    def _fetch_remaining(
+        self,
+        state: _State,
+        partial: Path,
+        state_path: Path,
+        headers: Mapping[str, str],
+        opened: list[Response],
+    ) -> None:
+        pending = [part for part in state.parts if not part.done]
+        if not pending:
+            return
+
+        fetch: Callable[..., None] = self._fetch_part
+        config = self._retry
+        if config is not None and config.max_attempts > 1:
+            fetch = retry_call(
+                config.retry_on,
+                max_attempts=config.max_attempts,
+                timeout=config.timeout,
+                initial_delay=config.initial_delay,
+                backoff_factor=config.backoff_factor,
+                max_delay=config.max_delay,
+                budget=config.budget,
+                jitter=config.jitter,
+            )(fetch)
+
+        # Only the first part may reuse the probe response, and only once.
+        calls = [(part, opened if part is state.parts[0] else []) for part in pending]
+        cancelled = threading.Event()
+        workers = min(self._max_parts, len(pending))
+        if workers == 1:
+            for part, first in calls:
+                fetch(state, part, partial, state_path, headers, first, cancelled)
+            return
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="download") as executor:
+            futures = [
+                executor.submit(fetch, state, part, partial, state_path, headers, first, cancelled)
+                for part, first in calls
+            ]
+            wait(futures, return_when=FIRST_EXCEPTION)
+            failed = [future for future in futures if future.done() and future.exception() is not None]
+            if failed:
+                # Stop the other parts; leaving the block joins them before the error propagates.
+                cancelled.set()
+                for future in futures:
+                    future.cancel()
+                failed[0].result()
+
+    def _fetch_part(
+        self,
+        state: _State,
+        part: _Part,
+        partial: Path,
+        state_path: Path,
+        headers: Mapping[str, str],
+        opened: list[Response],
+        cancelled: threading.Event,
+    ) -> None:
+        if part.done:
+            return
+        if cancelled.is_set():
+            raise _Cancelled(state.url)
+        if opened:
+            response = opened.pop()
+        else:
+            end = str(part.end) if part.end >= 0 else ""
+            ranged = {**headers, "Range": f"bytes={part.offset}-{end}"}
+            validator = state.validator()
+            if validator is not None:
+                ranged["If-Range"] = validator
+            response = self.client.stream(state.url, timeout=self._timeout, headers=ranged)
+
+        match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+        if response.status_code == 206:
+            aligned = match is not None and int(match.group(1)) == part.offset
+        else:
+            aligned = part.offset == 0 and len(state.parts) == 1
+        if not aligned:
+            response.close()
+            # The resource changed (If-Range failed) or ranges are unsupported.
+            raise _RestartDownload(state.url)
+        self._write_part(response, state, part, partial, state_path, cancelled)
+
+    def _write_part(
+        self,
+        response: Response,
+        state: _State,
+        part: _Part,
+        partial: Path,
+        state_path: Path,
+        cancelled: threading.Event,
+    ) -> None:
+        try:
+            with open(partial, "r+b") as handle:
+                handle.seek(part.offset)
+                for chunk in response.iter_content(self._chunk_size):
+                    if part.end >= 0:
+                        chunk = chunk[: part.end - part.offset + 1]
+                    handle.write(chunk)
+                    handle.flush()
+                    with self._lock:
+                        part.written += len(chunk)
+                        self._save_state(state, state_path)
+                    if part.done:
+                        break
+                    if cancelled.is_set():
+                        raise _Cancelled(state.url)
+        except requests_exceptions.RequestException as exc:
+            raise HttpNetworkError(
+                f"Download of {state.url} interrupted at byte {part.offset}: {exc}", url=state.url, original=exc
+            ) from exc
+        finally:
+            response.close()
+            with self._lock:
+                self._save_state(state, state_path)
+
+        if part.end < 0:
+            part.end = part.offset - 1
+        elif not part.done:
+            raise HttpNetworkError(
+                f"Connection closed after {part.written} of {part.end - part.start + 1} bytes from {state.url}",
+                url=state.url,
+            )
+
+    def _hash_file(self, path: Path, algorithm: str) -> str:
+        digest = hashlib.new(algorithm)
+        with open(path, "rb") as handle:
+            while chunk := handle.read(self._chunk_size):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _load_state(self, url: str, partial: Path, state_path: Path) -> _State | None:
+        if not partial.exists() or not state_path.exists():
+            _remove(partial, state_path)
+            return None
+        try:
+            raw = json.loads(state_path.read_text(encoding="utf-8"))
+            state = _State(
+                url=raw["url"],
+                size=raw["size"],
+                etag=raw["etag"],
+                last_modified=raw["last_modified"],
+                parts=[_Part(**part) for part in raw["parts"]],
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            state = None
+        # Without a validator there is no way to tell the remote file is unchanged.
+        if state is None or state.url != url or state.validator() is None or state.size is None:
+            _remove(partial, state_path)
+            return None
+        return state
+
+    @staticmethod
+    def _save_state(state: _State, state_path: Path) -> None:
+        temp_path = state_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(asdict(state)), encoding="utf-8")
+        os.replace(temp_path, state_path)
+
+
+def _remove(*paths: Path) -> None:
+    for path in paths:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
@@ -1,12 +1,21 @@
 ﻿from __future__ import annotations
 
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Mapping, Tuple, Type
+from typing import AsyncGenerator, Callable, Iterable, Mapping, Tuple, Type
+from urllib.parse import urlsplit
 
 import requests
 from requests import Response
 from requests import exceptions as requests_exceptions
+from requests.adapters import HTTPAdapter
 
+from src.crawler.cache import HttpCache
+from src.utils.retry import CircuitBreakers, CircuitOpenError, RetryBudget, async_retry
 from src.utils.retry import retry as retry_call
 
 Headers = Mapping[str, str]
@@ -66,7 +75,13 @@ class HttpConnectionError(HttpNetworkError):
 
 @dataclass(frozen=True)
 class RetryConfig:
-    """Configuration describing how GET should retry transient failures."""
+    """Configuration describing how GET should retry transient failures.
+
+    *budget* and *breakers* are shared across calls: the budget caps retries
+    at a share of all requests and the breakers, keyed by host, fail fast
+    with :class:`~src.utils.retry.CircuitOpenError` while a host is down.
+    *jitter* (``"full"`` or ``"decorrelated"``) randomises the backoff.
+    """
 
     max_attempts: int = 3
     timeout: float | None = None
@@ -74,6 +89,9 @@ class RetryConfig:
     backoff_factor: float = 2.0
     max_delay: float | None = None
     retry_on: Tuple[Type[BaseException], ...] = (HttpNetworkError, HttpServerError)
+    budget: RetryBudget | None = None
+    breakers: CircuitBreakers | None = None
+    jitter: str | None = None
 
     def __post_init__(self) -> None:
         if self.max_attempts < 1:
@@ -82,6 +100,10 @@ class RetryConfig:
             raise ValueError("retry_on must contain at least one exception type")
 
 
+def _host_key(session: requests.Session, url: str, **_: object) -> str:
+    return urlsplit(url).netloc.lower()
+
+
 def _coerce_headers(headers: Mapping[str, str] | None) -> Mapping[str, str] | None:
     if headers is None:
         return None
@@ -110,9 +132,21 @@ def _normalise_response(response: Response, *, url: str) -> Response:
     )
 
 
-def _request_once(url: str, *, timeout: float, headers: Mapping[str, str] | None) -> Response:
+def _request_once(
+    session: requests.Session,
+    url: str,
+    *,
+    timeout: float,
+    headers: Mapping[str, str] | None,
+    accept_not_modified: bool = False,
+    stream: bool = False,
+) -> Response:
     try:
-        response = requests.get(url, timeout=timeout, headers=_coerce_headers(headers))
+        if stream:
+            response = session.get(url, timeout=timeout, headers=_coerce_headers(headers), stream=True)
+        else:
+            # Plain GETs keep the original call shape that session wrappers rely on.
+            response = session.get(url, timeout=timeout, headers=_coerce_headers(headers))
     except requests_exceptions.Timeout as exc:
         raise HttpTimeoutError(url=url, timeout=timeout, original=exc) from exc
     except requests_exceptions.ConnectionError as exc:
@@ -123,30 +157,311 @@ def _request_once(url: str, *, timeout: float, headers: Mapping[str, str] | None
     if response.url is None:
         response.url = url  # type: ignore[assignment]
 
+    if accept_not_modified and response.status_code == 304:
+        return response
+    if stream and not 200 <= response.status_code < 300:
+        response.close()
     return _normalise_response(response, url=url)
 
 
+class HttpClient:
+    """GET client backed by a pooled keep-alive session.
+
+    ``pool_connections`` bounds how many hosts keep a connection pool and
+    ``pool_maxsize`` bounds the idle connections kept per host, which should
+    match the number of threads fetching from a single host. With a *cache*,
+    fresh entries are served from disk and stale ones are revalidated with
+    ``If-None-Match``/``If-Modified-Since``.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        headers: Mapping[str, str] | None = None,
+        cache: HttpCache | None = None,
+    ) -> None:
+        if pool_connections < 1:
+            raise ValueError("pool_connections must be at least 1")
+        if pool_maxsize < 1:
+            raise ValueError("pool_maxsize must be at least 1")
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if headers:
+            session.headers.update(headers)
+        self._session = session
+        self._cache = cache
+
+    @property
+    def cache(self) -> HttpCache | None:
+        return self._cache
+
+    def get(
+        self,
+        url: str,
+        *,
+        timeout: float,
+        headers: Mapping[str, str] | None = None,
+        retry: RetryConfig | None = None,
+    ) -> Response:
+        """Perform a GET request with consistent error mapping."""
+
+        cache = self._cache
+        if cache is None:
+            return self._send(url, timeout=timeout, headers=headers, retry=retry)
+
+        entry = cache.lookup(url)
+        if entry is not None and entry.is_fresh(cache.now()):
+            cached = cache.serve(entry)
+            if cached is not None:
+                return cached
+
+        if entry is not None:
+            conditional = {**(headers or {}), **entry.conditional_headers()}
+            response = self._send(
+                url, timeout=timeout, headers=conditional, retry=retry, accept_not_modified=True
+            )
+            if response.status_code == 304:
+                cached = cache.revalidate(entry, response)
+                if cached is not None:
+                    return cached
+                response = self._send(url, timeout=timeout, headers=headers, retry=retry)
+        else:
+            response = self._send(url, timeout=timeout, headers=headers, retry=retry)
+
+        cache.store(url, response)
+        return response
+
+    def _send(
+        self,
+        url: str,
+        *,
+        timeout: float,
+        headers: Mapping[str, str] | None,
+        retry: RetryConfig | None,
+        accept_not_modified: bool = False,
+    ) -> Response:
+        config = retry if retry is not None else RetryConfig(max_attempts=1, retry_on=(HttpNetworkError, HttpServerError))
+
+        if config.max_attempts <= 1 and config.breakers is None:
+            if config.budget is not None:
+                # Single attempts still count towards the budget's retry ratio.
+                config.budget.record_request()
+            return _request_once(
+                self._session,
+                url,
+                timeout=timeout,
+                headers=headers,
+                accept_not_modified=accept_not_modified,
+            )
+
+        wrapped = retry_call(
+            config.retry_on,
+            max_attempts=config.max_attempts,
+            timeout=config.timeout,
+            initial_delay=config.initial_delay,
+            backoff_factor=config.backoff_factor,
+            max_delay=config.max_delay,
+            budget=config.budget,
+            breakers=config.breakers,
+            breaker_key=_host_key if config.breakers is not None else None,
+            jitter=config.jitter,
+        )(_request_once)
+
+        return wrapped(
+            self._session,
+            url,
+            timeout=timeout,
+            headers=headers,
+            accept_not_modified=accept_not_modified,
+        )
+
+    def stream(self, url: str, *, timeout: float, headers: Mapping[str, str] | None = None) -> Response:
+        """Open a streaming GET that bypasses the cache; the caller must close it.
+
+        Status codes are mapped like :meth:`get`, but the body is left unread
+        so it can be consumed with ``iter_content``.
+        """
+
+        return _request_once(self._session, url, timeout=timeout, headers=headers, stream=True)
+
+    def _get_once(self, url: str, *, timeout: float, headers: Mapping[str, str] | None) -> Response:
+        return self.get(url, timeout=timeout, headers=headers)
+
+    def close(self) -> None:
+        """Close pooled connections held by the session and flush the cache index."""
+
+        self._session.close()
+        if self._cache is not None:
+            self._cache.close()
+
+    def __enter__(self) -> HttpClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+_default_client: HttpClient | None = None
+_default_client_lock = threading.Lock()
+
+
+def default_client() -> HttpClient:
+    """Return the process-wide client shared by :func:`GET`."""
+
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = HttpClient()
+    return _default_client
+
+
 def GET(
     url: str,
     *,
     timeout: float,
     headers: Mapping[str, str] | None = None,
     retry: RetryConfig | None = None,
+    client: HttpClient | None = None,
 ) -> Response:
-    """Perform a GET request with consistent error mapping."""
+    """Perform a GET request with consistent error mapping.
 
-    config = retry if retry is not None else RetryConfig(max_attempts=1, retry_on=(HttpNetworkError, HttpServerError))
+    Requests go through *client*, or the shared :func:`default_client`, so
+    repeated fetches from the same host reuse keep-alive connections.
+    """
+
+    return (client or default_client()).get(url, timeout=timeout, headers=headers, retry=retry)
+
+
+@dataclass(frozen=True)
+class FetchResult:
+    """Outcome of a single URL fetched by :func:`GET_many`."""
+
+    url: str
+    response: Response | None = None
+    error: HttpError | CircuitOpenError | None = None
+    attempts: int = 1
+    elapsed: float = 0.0
 
-    if config.max_attempts <= 1:
-        return _request_once(url, timeout=timeout, headers=headers)
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def _get_with_retry(
+    client: HttpClient,
+    executor: ThreadPoolExecutor,
+    url: str,
+    *,
+    timeout: float,
+    headers: Mapping[str, str] | None,
+    config: RetryConfig,
+    on_retry: Callable[[int, BaseException, float], None] | None = None,
+) -> Response:
+    """Run :meth:`HttpClient._get_once` on *executor* under :func:`async_retry`."""
 
-    wrapped = retry_call(
+    loop = asyncio.get_running_loop()
+    call = functools.partial(client._get_once, url, timeout=timeout, headers=headers)
+
+    @async_retry(
         config.retry_on,
         max_attempts=config.max_attempts,
         timeout=config.timeout,
         initial_delay=config.initial_delay,
         backoff_factor=config.backoff_factor,
         max_delay=config.max_delay,
-    )(_request_once)
+        on_retry=on_retry,
+        budget=config.budget,
+        breakers=config.breakers,
+        breaker_key=(lambda: urlsplit(url).netloc.lower()) if config.breakers is not None else None,
+        jitter=config.jitter,
+    )
+    async def attempt() -> Response:
+        return await loop.run_in_executor(executor, call)
+
+    try:
+        return await attempt()
+    except asyncio.TimeoutError as exc:
+        raise HttpTimeoutError(url=url, timeout=config.timeout or timeout, original=exc) from exc
+
+
+async def GET_many(
+    urls: Iterable[str],
+    *,
+    timeout: float,
+    concurrency: int = 10,
+    per_host: int = 2,
+    headers: Mapping[str, str] | None = None,
+    retry: RetryConfig | None = None,
+    client: HttpClient | None = None,
+) -> AsyncGenerator[FetchResult, None]:
+    """Fetch *urls* concurrently and yield a :class:`FetchResult` as each completes.
+
+    At most *concurrency* requests are in flight overall and at most
+    *per_host* against any single host. Retries follow *retry* like
+    :func:`GET`, but back off without blocking the event loop. Failures are
+    reported on the result instead of being raised. Closing or cancelling the
+    iterator cancels every pending fetch; requests already on the wire finish
+    in the background but are not retried.
+    """
+
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if per_host < 1:
+        raise ValueError("per_host must be at least 1")
 
-    return wrapped(url, timeout=timeout, headers=headers)
\ No newline at end of file
+    config = retry if retry is not None else RetryConfig(max_attempts=1, retry_on=(HttpNetworkError, HttpServerError))
+    http_client = client or default_client()
+    global_limit = asyncio.Semaphore(concurrency)
+    host_limits: dict[str, asyncio.Semaphore] = {}
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="get-many")
+
+    async def fetch(url: str) -> FetchResult:
+        host = urlsplit(url).netloc.lower()
+        host_limit = host_limits.setdefault(host, asyncio.Semaphore(per_host))
+        retries: list[int] = []
+        async with host_limit, global_limit:
+            started = time.perf_counter()
+            try:
+                response = await _get_with_retry(
+                    http_client,
+                    executor,
+                    url,
+                    timeout=timeout,
+                    headers=headers,
+                    config=config,
+                    on_retry=lambda attempt, *_: retries.append(attempt),
+                )
+            except (HttpError, CircuitOpenError) as exc:
+                return FetchResult(
+                    url=url,
+                    error=exc,
+                    attempts=len(retries) + 1,
+                    elapsed=time.perf_counter() - started,
+                )
+            return FetchResult(
+                url=url,
+                response=response,
+                attempts=len(retries) + 1,
+                elapsed=time.perf_counter() - started,
+            )
+
+    tasks = [asyncio.ensure_future(fetch(url)) for url in urls]
+    try:
+        for completed in asyncio.as_completed(tasks):
+            yield await completed
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,521 @@
+"""Per-host politeness scheduling for crawler fetches."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass, replace
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterable, Iterator
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from requests import Response
+
+from src.crawler.http import (
+    FetchResult,
+    HttpClient,
+    HttpClientError,
+    HttpError,
+    HttpNetworkError,
+    HttpServerError,
+    HttpStatusError,
+    RetryConfig,
+    default_client,
+)
+from src.ingest.registry import Registry
+from src.utils.retry import CircuitOpenError
+
+DEFAULT_USER_AGENT = "UltimateAutomationBot"
+_THROTTLE_STATUSES = frozenset({429, 503})
+# Refills are float sums; a token this close to whole counts as available.
+_TOKEN_EPSILON = 1e-9
+
+
+class RobotsDisallowedError(HttpError):
+    """Raised when robots.txt forbids fetching a URL."""
+
+    def __init__(self, *, url: str) -> None:
+        super().__init__(f"robots.txt disallows fetching {url}", url=url)
+
+
+def _single_attempt(retry: RetryConfig | None) -> RetryConfig | None:
+    # The budget is accounted for per URL by the scheduler, not per attempt.
+    return None if retry is None else replace(retry, max_attempts=1, budget=None)
+
+
+def _may_retry(retry: RetryConfig | None, error: BaseException | None, attempt: int) -> bool:
+    """Whether *error* from the *attempt*-th try (1-based) may be retried under *retry*."""
+
+    if retry is None or error is None or not isinstance(error, retry.retry_on) or attempt >= retry.max_attempts:
+        return False
+    return retry.budget is None or retry.budget.try_acquire()
+
+
+def _host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def _retry_after(response: Response | None) -> float | None:
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket refilled at ``1 / interval`` tokens per second."""
+
+    def __init__(self, *, interval: float, capacity: float = 1.0, now: float = 0.0) -> None:
+        if interval < 0:
+            raise ValueError("interval cannot be negative")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.interval = interval
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = now
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self._updated = now
+        if self.interval == 0:
+            self._tokens = self.capacity
+        else:
+            self._tokens = min(self.capacity, self._tokens + elapsed / self.interval)
+
+    def reserve(self, now: float) -> float:
+        """Take a token and return 0, or return the seconds until one is available."""
+
+        self._refill(now)
+        if self._tokens >= 1 - _TOKEN_EPSILON:
+            self._tokens = max(0.0, self._tokens - 1)
+            return 0.0
+        return (1 - self._tokens) * self.interval
+
+    def drain(self, now: float) -> None:
+        self._refill(now)
+        self._tokens = 0.0
+
+
+@dataclass(slots=True)
+class HostState:
+    """Adaptive politeness state for a single host."""
+
+    host: str
+    bucket: TokenBucket
+    min_delay: float
+    max_delay: float
+    blocked_until: float = 0.0
+    in_flight: int = 0
+    latency: float | None = None
+    fetched: int = 0
+    throttled: int = 0
+    failed: int = 0
+
+    @property
+    def delay(self) -> float:
+        return self.bucket.interval
+
+    def wait_time(self, now: float, per_host: int) -> float | None:
+        """Seconds until the host may be hit again, or ``None`` while saturated."""
+
+        if self.in_flight >= per_host:
+            return None
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        return self.bucket.reserve(now)
+
+    def record_success(self, latency: float, *, latency_factor: float) -> None:
+        self.fetched += 1
+        self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+        target = max(self.min_delay, self.latency * latency_factor)
+        # Speed up gradually, slow down at once when the host gets slower.
+        if target >= self.delay:
+            self.bucket.interval = min(self.max_delay, target)
+        else:
+            self.bucket.interval = max(target, self.delay * 0.9)
+
+    def record_throttle(self, now: float, retry_after: float | None) -> None:
+        self.throttled += 1
+        self.bucket.interval = min(self.max_delay, max(self.delay * 2, self.min_delay, 0.001))
+        self.bucket.drain(now)
+        if retry_after is not None:
+            self.blocked_until = max(self.blocked_until, now + min(retry_after, self.max_delay))
+
+    def record_failure(self) -> None:
+        self.failed += 1
+        self.bucket.interval = min(self.max_delay, max(self.delay * 1.5, self.min_delay))
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "delay": self.delay,
+            "latency": self.latency,
+            "fetched": self.fetched,
+            "throttled": self.throttled,
+            "failed": self.failed,
+        }
+
+
+class RobotsCache:
+    """Fetch and cache robots.txt rules per host.
+
+    Following RFC 9309, a 4xx robots.txt allows everything, while server or
+    network errors disallow the host until the (shorter) error TTL expires.
+    """
+
+    def __init__(
+        self,
+        *,
+        client: HttpClient | None = None,
+        user_agent: str = DEFAULT_USER_AGENT,
+        ttl: float = 24 * 3600,
+        error_ttl: float = 300,
+        timeout: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._client = client
+        self._user_agent = user_agent
+        self._ttl = ttl
+        self._error_ttl = error_ttl
+        self._timeout = timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._rules: dict[str, tuple[float, RobotFileParser]] = {}
+
+    def allowed(self, url: str) -> bool:
+        return self._parser_for(url).can_fetch(self._user_agent, url)
+
+    def crawl_delay(self, url: str) -> float | None:
+        delay = self._parser_for(url).crawl_delay(self._user_agent)
+        return float(delay) if delay is not None else None
+
+    def _parser_for(self, url: str) -> RobotFileParser:
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        now = self._clock()
+        with self._lock:
+            cached = self._rules.get(host)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+        parser = RobotFileParser(robots_url)
+        ttl = self._ttl
+        try:
+            response = (self._client or default_client()).get(
+                robots_url, timeout=self._timeout, headers={"User-Agent": self._user_agent}
+            )
+        except HttpClientError:
+            # No robots.txt: everything is allowed.
+            parser.parse([])
+        except (HttpServerError, HttpNetworkError, HttpStatusError):
+            # Unreachable robots.txt: assume everything is disallowed until it is retried.
+            parser.parse(["User-agent: *", "Disallow: /"])
+            ttl = self._error_ttl
+        else:
+            parser.parse(response.text.splitlines())
+        parser.modified()
+
+        with self._lock:
+            self._rules[host] = (now + ttl, parser)
+        return parser
+
+
+class CrawlScheduler:
+    """Polite fetcher that spreads requests across hosts.
+
+    Each host gets a token bucket whose interval adapts to observed latency
+    (``latency_factor`` times the smoothed latency, never below
+    ``min_delay`` or the robots.txt crawl-delay) and backs off on 429/503,
+    honouring ``Retry-After``. :meth:`crawl` always hands the next request
+    to the host that becomes ready first, so many slow hosts are crawled in
+    parallel while each individual host sees at most ``per_host`` requests
+    at a time. Robots rules are enforced for URLs whose registry entry has
+    ``respects_robots`` set; unregistered URLs respect robots.txt too.
+    Retries go back through the host's bucket like any other request, so
+    every re-attempt waits for a token; *clock* and *sleep* drive all of
+    the waiting and can be replaced together in tests.
+    """
+
+    def __init__(
+        self,
+        *,
+        client: HttpClient | None = None,
+        registry: Registry | None = None,
+        robots: RobotsCache | None = None,
+        user_agent: str = DEFAULT_USER_AGENT,
+        timeout: float = 10.0,
+        initial_delay: float = 1.0,
+        min_delay: float = 0.1,
+        max_delay: float = 60.0,
+        burst: int = 1,
+        per_host: int = 1,
+        latency_factor: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] | None = None,
+    ) -> None:
+        if per_host < 1:
+            raise ValueError("per_host must be at least 1")
+        if not 0 <= min_delay <= max_delay:
+            raise ValueError("min_delay must be between 0 and max_delay")
+        self._client = client or default_client()
+        self._registry = registry
+        self._robots = robots or RobotsCache(client=self._client, user_agent=user_agent, timeout=timeout, clock=clock)
+        self._headers = {"User-Agent": user_agent}
+        self._timeout = timeout
+        self._initial_delay = min(max(initial_delay, min_delay), max_delay)
+        self._min_delay = min_delay
+        self._max_delay = max_delay
+        self._burst = burst
+        self._per_host = per_host
+        self._latency_factor = latency_factor
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Condition()
+        self._hosts: dict[str, HostState] = {}
+
+    def host_stats(self) -> dict[str, dict[str, object]]:
+        with self._lock:
+            return {host: state.as_dict() for host, state in self._hosts.items()}
+
+    def fetch(self, url: str, *, retry: RetryConfig | None = None) -> Response:
+        """Fetch a single URL once its host is ready, blocking the caller.
+
+        Failures listed in *retry* are retried up to its ``max_attempts``,
+        each attempt waiting for a fresh token from the host bucket.
+        """
+
+        state = self._state(url)
+        if retry is not None and retry.budget is not None:
+            retry.budget.record_request()
+        attempt = 1
+        while True:
+            with self._lock:
+                while True:
+                    wait = state.wait_time(self._clock(), self._per_host)
+                    if wait is None:
+                        # Saturated: the release path notifies when a slot frees up.
+                        self._lock.wait()
+                        continue
+                    if wait == 0:
+                        state.in_flight += 1
+                        break
+                    self._wait(wait)
+            try:
+                return self._fetch_reserved(url, state, retry)
+            except (HttpError, CircuitOpenError) as exc:
+                if not _may_retry(retry, exc, attempt):
+                    raise
+            attempt += 1
+
+    def crawl(
+        self,
+        urls: Iterable[str],
+        *,
+        workers: int = 8,
+        max_requeues: int = 2,
+        retry: RetryConfig | None = None,
+    ) -> Iterator[FetchResult]:
+        """Fetch *urls* with *workers* threads, yielding results as they complete.
+
+        URLs throttled with 429/503 are put back on their host queue up to
+        *max_requeues* times after the host backs off; other failures listed
+        in *retry* are put back the same way, up to its ``max_attempts``.
+        """
+
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        pending: dict[str, list[str]] = {}
+        for url in urls:
+            pending.setdefault(_host_of(url), []).append(url)
+        remaining = sum(len(items) for items in pending.values())
+        if not remaining:
+            return
+
+        requeues: dict[str, int] = {}
+        attempts: dict[str, int] = {}
+        ready: list[tuple[float, int, str]] = []
+        counter = itertools.count()
+        for host, items in pending.items():
+            items.reverse()  # pop() from the end preserves input order
+            self._state(items[-1])
+            heapq.heappush(ready, (0.0, next(counter), host))
+        results: queue.Queue[FetchResult | None] = queue.Queue()
+        stop = threading.Event()
+
+        def next_job() -> tuple[str, HostState] | None:
+            with self._lock:
+                while not stop.is_set():
+                    if not ready:
+                        if not any(pending.values()):
+                            return None
+                        self._lock.wait(0.05)
+                        continue
+                    ready_at, _, host = ready[0]
+                    now = self._clock()
+                    if ready_at > now:
+                        self._wait(ready_at - now)
+                        continue
+                    heapq.heappop(ready)
+                    state = self._hosts[host]
+                    items = pending[host]
+                    if not items:
+                        continue
+                    wait = state.wait_time(now, self._per_host)
+                    if wait is None:
+                        continue  # re-queued when an in-flight request completes
+                    if wait > 0:
+                        heapq.heappush(ready, (now + wait, next(counter), host))
+                        continue
+                    state.in_flight += 1
+                    url = items.pop()
+                    if url not in attempts and retry is not None and retry.budget is not None:
+                        retry.budget.record_request()
+                    attempts[url] = attempts.get(url, 0) + 1
+                    if items:
+                        heapq.heappush(ready, (now, next(counter), host))
+                    return url, state
+                return None
+
+        def finish(url: str, state: HostState, result: FetchResult) -> bool:
+            with self._lock:
+                host = state.host
+                throttled = (
+                    isinstance(result.error, HttpStatusError)
+                    and result.error.status_code in _THROTTLE_STATUSES
+                )
+                if throttled and requeues.get(url, 0) < max_requeues:
+                    requeues[url] = requeues.get(url, 0) + 1
+                    requeue = True
+                else:
+                    requeue = _may_retry(retry, result.error, attempts[url])
+                if requeue:
+                    pending[host].append(url)
+                if pending[host] and not any(entry[2] == host for entry in ready):
+                    heapq.heappush(ready, (self._clock(), next(counter), host))
+                self._lock.notify_all()
+            return requeue
+
+        def worker() -> None:
+            while True:
+                job = next_job()
+                if job is None:
+                    return
+                url, state = job
+                started = time.perf_counter()
+                try:
+                    response = self._fetch_reserved(url, state, retry)
+                except (HttpError, CircuitOpenError) as exc:
+                    result = FetchResult(url=url, error=exc, elapsed=time.perf_counter() - started)
+                else:
+                    result = FetchResult(url=url, response=response, elapsed=time.perf_counter() - started)
+                if not finish(url, state, result):
+                    results.put(result)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+
+        def watcher() -> None:
+            for thread in threads:
+                thread.join()
+            results.put(None)
+
+        threading.Thread(target=watcher, daemon=True).start()
+        try:
+            while True:
+                result = results.get()
+                if result is None:
+                    return
+                yield result
+        finally:
+            stop.set()
+            with self._lock:
+                self._lock.notify_all()
+
+    def _wait(self, timeout: float) -> None:
+        """Wait up to *timeout* seconds with the lock held on entry and exit."""
+
+        if self._sleep is None:
+            self._lock.wait(timeout)
+            return
+        self._lock.release()
+        try:
+            self._sleep(timeout)
+        finally:
+            self._lock.acquire()
+
+    def _state(self, url: str) -> HostState:
+        host = _host_of(url)
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = HostState(
+                    host=host,
+                    bucket=TokenBucket(interval=self._initial_delay, capacity=self._burst, now=self._clock()),
+                    min_delay=self._min_delay,
+                    max_delay=self._max_delay,
+                )
+                self._hosts[host] = state
+            return state
+
+    def _respects_robots(self, url: str) -> bool:
+        if self._registry is None:
+            return True
+        entry = self._registry.get(url)
+        return entry.respects_robots if entry is not None else True
+
+    def _fetch_reserved(self, url: str, state: HostState, retry: RetryConfig | None) -> Response:
+        """Make one attempt at *url* for a host slot already reserved by the caller.
+
+        Only the breakers of *retry* apply here; the callers retry through
+        the host bucket themselves.
+        """
+
+        try:
+            if self._respects_robots(url):
+                if not self._robots.allowed(url):
+                    raise RobotsDisallowedError(url=url)
+                crawl_delay = self._robots.crawl_delay(url)
+                if crawl_delay is not None:
+                    with self._lock:
+                        state.min_delay = min(max(state.min_delay, crawl_delay), state.max_delay)
+                        state.bucket.interval = max(state.bucket.interval, state.min_delay)
+
+            started = time.perf_counter()
+            try:
+                response = self._client.get(
+                    url, timeout=self._timeout, headers=self._headers, retry=_single_attempt(retry)
+                )
+            except HttpStatusError as exc:
+                with self._lock:
+                    if exc.status_code in _THROTTLE_STATUSES:
+                        state.record_throttle(self._clock(), _retry_after(exc.response))
+                    else:
+                        state.record_failure()
+                raise
+            except HttpNetworkError:
+                with self._lock:
+                    state.record_failure()
+                raise
+            with self._lock:
+                state.record_success(time.perf_counter() - started, latency_factor=self._latency_factor)
+            return response
+        finally:
+            with self._lock:
+                state.in_flight -= 1
+                self._lock.notify_all()
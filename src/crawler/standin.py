@@ -0,0 +1,299 @@
+"""Configurable local HTTP server standing in for vendor sites in tests and benchmarks."""
+
+from __future__ import annotations
+
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Mapping
+
+Latency = Callable[[random.Random], float]
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+_WRITE_CHUNK = 64 * 1024
+
+
+def constant(seconds: float) -> Latency:
+    return lambda _rng: seconds
+
+
+def uniform(low: float, high: float) -> Latency:
+    return lambda rng: rng.uniform(low, high)
+
+
+def exponential(mean: float) -> Latency:
+    return lambda rng: rng.expovariate(1 / mean) if mean > 0 else 0.0
+
+
+def lognormal(median: float, sigma: float) -> Latency:
+    """Long-tailed latency whose median is *median* seconds."""
+
+    mu = math.log(median) if median > 0 else float("-inf")
+    return lambda rng: rng.lognormvariate(mu, sigma) if median > 0 else 0.0
+
+
+def parse_latency(spec: str) -> Latency:
+    """Parse ``"constant:0.01"``, ``"uniform:0.005,0.02"``, ``"exponential:0.01"`` or ``"lognormal:0.01,0.5"``."""
+
+    name, _, raw = spec.partition(":")
+    factories: dict[str, Callable[..., Latency]] = {
+        "constant": constant,
+        "uniform": uniform,
+        "exponential": exponential,
+        "lognormal": lognormal,
+    }
+    if name not in factories:
+        raise ValueError(f"Unknown latency distribution: {name}")
+    try:
+        values = [float(part) for part in raw.split(",")] if raw else []
+        return factories[name](*values)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid latency spec: {spec}") from exc
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    """Behaviour of the paths served by a :class:`StandinServer`.
+
+    Rates are independent probabilities per request, drawn in the order
+    timeout, throttle, error. ``fail_first`` deterministically answers the
+    first N requests for each path with *error_status*.
+    """
+
+    body_size: int = 2048
+    latency: Latency = constant(0.0)
+    error_rate: float = 0.0
+    error_status: int = 503
+    throttle_rate: float = 0.0
+    retry_after: float = 0.0
+    timeout_rate: float = 0.0
+    stall: float = 5.0
+    fail_first: int = 0
+    etag: bool = True
+    ranges: bool = True
+    content_type: str = "text/html; charset=utf-8"
+
+    def __post_init__(self) -> None:
+        if self.body_size < 0:
+            raise ValueError("body_size cannot be negative")
+        for name in ("error_rate", "throttle_rate", "timeout_rate"):
+            if not 0 <= getattr(self, name) <= 1:
+                raise ValueError(f"{name} must be between 0 and 1")
+
+
+class StandinServer:
+    """Threaded keep-alive HTTP server driven by :class:`Route` settings.
+
+    *routes* maps path prefixes to behaviour (longest prefix wins, falling
+    back to *default*, a plain :class:`Route` when None). Bodies are
+    deterministic per size, carry a strong ETag honoured through
+    ``If-None-Match`` and support single ``Range`` requests. :attr:`hits` counts answered requests per status code, with
+    stalled (timed out) requests under 0 once their stall ends;
+    :attr:`total_requests` counts requests as they arrive.
+    """
+
+    def __init__(
+        self,
+        routes: Mapping[str, Route] | None = None,
+        *,
+        default: Route | None = None,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self._routes = sorted((routes or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self._default = default if default is not None else Route()
+        self._seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._bodies: dict[int, bytes] = {}
+        self._path_hits: Counter[str] = Counter()
+        self._requests = 0
+        self.hits: Counter[int] = Counter()
+        self._server = _StandinHTTPServer((host, port), _handler_for(self))
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{str(host)}:{port}"
+
+    def url(self, path: str = "/") -> str:
+        return self.base_url + (path if path.startswith("/") else f"/{path}")
+
+    @property
+    def total_hits(self) -> int:
+        with self._lock:
+            return sum(self.hits.values())
+
+    @property
+    def total_requests(self) -> int:
+        """Requests received so far, including ones still stalled or sleeping."""
+
+        with self._lock:
+            return self._requests
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._requests = 0
+            self.hits.clear()
+            self._path_hits.clear()
+
+    def start(self) -> "StandinServer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="standin")
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def route_for(self, path: str) -> Route:
+        for prefix, route in self._routes:
+            if path.startswith(prefix):
+                return route
+        return self._default
+
+    def body(self, size: int) -> bytes:
+        with self._lock:
+            body = self._bodies.get(size)
+            if body is None:
+                body = random.Random(f"{self._seed}:{size}").randbytes(size)
+                self._bodies[size] = body
+            return body
+
+    def _decide(self, path: str, route: Route) -> tuple[float, str | None]:
+        """Return the injected latency and fault (``timeout``/``throttle``/``error``) for a request."""
+
+        with self._lock:
+            self._requests += 1
+            self._path_hits[path] += 1
+            if self._path_hits[path] <= route.fail_first:
+                return route.latency(self._rng), "error"
+            latency = route.latency(self._rng)
+            if self._rng.random() < route.timeout_rate:
+                return latency, "timeout"
+            if self._rng.random() < route.throttle_rate:
+                return latency, "throttle"
+            if self._rng.random() < route.error_rate:
+                return latency, "error"
+            return latency, None
+
+    def _record(self, status: int) -> None:
+        with self._lock:
+            self.hits[status] += 1
+
+
+class _StandinHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops SYNs under load and adds 1s retransmits.
+    request_queue_size = 128
+
+
+def _handler_for(server: StandinServer) -> type[BaseHTTPRequestHandler]:
+    class _StandinHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            self._serve(send_body=True)
+
+        def do_HEAD(self) -> None:  # noqa: N802 - http.server naming
+            self._serve(send_body=False)
+
+        def _serve(self, *, send_body: bool) -> None:
+            path = self.path.split("?", 1)[0]
+            route = server.route_for(path)
+            latency, fault = server._decide(path, route)
+            if latency > 0:
+                time.sleep(latency)
+
+            if fault == "timeout":
+                time.sleep(route.stall)
+                self.close_connection = True
+                server._record(0)
+                return
+            if fault == "throttle":
+                self._send_empty(429, {"Retry-After": f"{route.retry_after:g}"})
+                return
+            if fault == "error":
+                self._send_empty(route.error_status)
+                return
+
+            body = server.body(route.body_size)
+            headers = {"Content-Type": route.content_type}
+            etag = f'"{server._seed}-{route.body_size}"'
+            if route.etag:
+                headers["ETag"] = etag
+                if self.headers.get("If-None-Match") == etag:
+                    self._send_empty(304, headers)
+                    return
+
+            status, start, end = 200, 0, len(body)
+            requested = self.headers.get("Range")
+            if route.ranges:
+                headers["Accept-Ranges"] = "bytes"
+                if_range = self.headers.get("If-Range")
+                match = _RANGE.fullmatch(requested or "")
+                if match and (if_range is None or if_range == headers.get("ETag")):
+                    span = _resolve_range(match.group(1), match.group(2), len(body))
+                    if span is None:
+                        self._send_empty(416, {"Content-Range": f"bytes */{len(body)}"})
+                        return
+                    start, end = span
+                    status = 206
+                    headers["Content-Range"] = f"bytes {start}-{end - 1}/{len(body)}"
+
+            # Count before responding so a client never observes a response the stats miss.
+            server._record(status)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(end - start))
+            self.end_headers()
+            if send_body:
+                view = memoryview(body)
+                for offset in range(start, end, _WRITE_CHUNK):
+                    self.wfile.write(view[offset : min(offset + _WRITE_CHUNK, end)])
+
+        def _send_empty(self, status: int, headers: Mapping[str, str] | None = None) -> None:
+            server._record(status)
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            return
+
+    return _StandinHandler
+
+
+def _resolve_range(first: str, last: str, size: int) -> tuple[int, int] | None:
+    """Return the ``[start, end)`` span of a single byte range, or None if unsatisfiable."""
+
+    if not first and not last:
+        return None
+    if not first:
+        length = min(int(last), size)
+        return (size - length, size) if length else None
+    start = int(first)
+    end = min(int(last) + 1, size) if last else size
+    if start >= size or end <= start:
+        return None
+    return start, end
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import hashlib
+import math
+
+__all__ = ["BloomFilter"]
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing.
+
+    Sized for *capacity* items at the requested *error_rate*; membership tests
+    may return false positives but never false negatives.
+    """
+
+    __slots__ = ("_bits", "_size", "_hashes", "_count")
+
+    def __init__(self, capacity: int, *, error_rate: float = 0.01) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        size = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self._size = max(8, size)
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+        self._count = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+    def __len__(self) -> int:
+        """Return the number of items added (duplicates included)."""
+
+        return self._count
+
+    def _positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        size = self._size
+        return [(first + index * second) % size for index in range(self._hashes)]
+
+    def add(self, item: str) -> bool:
+        """Add *item*; return True when it was (probably) not present before."""
+
+        added = False
+        bits = self._bits
+        for position in self._positions(item):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                added = True
+        self._count += 1
+        return added
+
+    def __contains__(self, item: object) -> bool:
+        if not isinstance(item, str):
+            return False
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
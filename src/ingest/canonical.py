@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import re
+from typing import FrozenSet, List
+from urllib.parse import urlsplit, urlunsplit
+
+__all__ = ["canonicalize_url", "TRACKING_PARAMS", "TRACKING_PREFIXES"]
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+TRACKING_PREFIXES = ("utm_",)
+TRACKING_PARAMS: FrozenSet[str] = frozenset(
+    {
+        "_ga",
+        "_gl",
+        "dclid",
+        "fbclid",
+        "gclid",
+        "igshid",
+        "mc_cid",
+        "mc_eid",
+        "msclkid",
+        "yclid",
+    }
+)
+
+_PERCENT_PATTERN = re.compile(r"%([0-9A-Fa-f]{2})")
+_UNRESERVED = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
+
+
+def _normalize_percent(component: str) -> str:
+    """Upper-case percent escapes and decode the ones for unreserved characters."""
+
+    def replace(match: re.Match[str]) -> str:
+        char = chr(int(match.group(1), 16))
+        return char if char in _UNRESERVED else f"%{match.group(1).upper()}"
+
+    return _PERCENT_PATTERN.sub(replace, component)
+
+
+def _remove_dot_segments(path: str) -> str:
+    output: List[str] = []
+    for segment in path.split("/"):
+        if segment == "..":
+            if len(output) > 1:
+                output.pop()
+        elif segment != ".":
+            output.append(segment)
+    if path.endswith(("/.", "/..")):
+        output.append("")
+    return "/".join(output)
+
+
+def _is_tracking_param(name: str) -> bool:
+    lowered = name.lower()
+    return lowered in TRACKING_PARAMS or lowered.startswith(TRACKING_PREFIXES)
+
+
+def _canonical_query(query: str) -> str:
+    pairs = []
+    for part in query.split("&"):
+        if not part:
+            continue
+        name = part.split("=", 1)[0]
+        if _is_tracking_param(_normalize_percent(name)):
+            continue
+        pairs.append(_normalize_percent(part))
+    pairs.sort()
+    return "&".join(pairs)
+
+
+def _canonical_netloc(scheme: str, netloc: str) -> str:
+    userinfo, _, hostport = netloc.rpartition("@")
+    parts = urlsplit(f"//{hostport}")
+    host = (parts.hostname or "").rstrip(".")
+    if host and not host.isascii():
+        try:
+            host = host.encode("idna").decode("ascii")
+        except UnicodeError:
+            pass
+    if ":" in host:
+        host = f"[{host}]"
+    port = parts.port  # raises ValueError for malformed ports
+    if port is not None and DEFAULT_PORTS.get(scheme) != port:
+        host = f"{host}:{port}"
+    return f"{userinfo}@{host}" if userinfo else host
+
+
+def canonicalize_url(url: str) -> str:
+    """Return the RFC 3986 canonical form of *url*.
+
+    Lower-cases the scheme and host, drops default ports and the fragment,
+    resolves dot segments, normalizes percent escapes, removes tracking
+    parameters (``utm_*``, ``gclid``, ...) and sorts the query. Strings
+    without a scheme and host are only stripped of surrounding whitespace.
+    """
+
+    stripped = url.strip()
+    parts = urlsplit(stripped)
+    if not parts.scheme or not parts.netloc:
+        return stripped
+
+    scheme = parts.scheme.lower()
+    netloc = _canonical_netloc(scheme, parts.netloc)
+    path = _remove_dot_segments(_normalize_percent(parts.path)) or "/"
+    query = _canonical_query(parts.query)
+    return urlunsplit((scheme, netloc, path, query, ""))
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+import html as html_lib
+import re
+import sqlite3
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Union
+
+__all__ = ["DuplicateMatch", "FingerprintIndex", "hamming_distance", "page_text", "simhash"]
+
+_BANDS = 4
+_BAND_BITS = 64 // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+_HIDDEN_BLOCKS = re.compile(r"<(script|style|noscript|template)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_COMMENTS = re.compile(r"<!--.*?-->", re.DOTALL)
+_TAGS = re.compile(r"<[^>]+>")
+_WORDS = re.compile(r"\w+", re.UNICODE)
+_BIT_TABLES = [bytes(value >> bit & 1 for value in range(256)) for bit in range(8)]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    source TEXT PRIMARY KEY,
+    fingerprint INTEGER NOT NULL,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fingerprints_band0 ON fingerprints (band0);
+CREATE INDEX IF NOT EXISTS fingerprints_band1 ON fingerprints (band1);
+CREATE INDEX IF NOT EXISTS fingerprints_band2 ON fingerprints (band2);
+CREATE INDEX IF NOT EXISTS fingerprints_band3 ON fingerprints (band3);
+"""
+
+
+def page_text(html: str) -> str:
+    """Return the visible text of *html*, lower-cased with whitespace collapsed.
+
+    Uses regular expressions rather than a DOM so that fingerprinting stays
+    much cheaper than the parse it is meant to skip.
+    """
+
+    text = _COMMENTS.sub(" ", html)
+    text = _HIDDEN_BLOCKS.sub(" ", text)
+    text = _TAGS.sub(" ", text)
+    return " ".join(html_lib.unescape(text).lower().split())
+
+
+def simhash(text: str, *, shingle_size: int = 3) -> int:
+    """Return the 64-bit SimHash of the word shingles in *text*.
+
+    Texts that share most shingles get fingerprints a small Hamming distance
+    apart. Empty text hashes to 0.
+    """
+
+    if shingle_size < 1:
+        raise ValueError("shingle_size must be at least 1")
+    words = _WORDS.findall(text)
+    if len(words) <= shingle_size:
+        shingles = Counter([" ".join(words)] if words else [])
+    else:
+        shingles = Counter(" ".join(words[index : index + shingle_size]) for index in range(len(words) - shingle_size + 1))
+
+    digests = b"".join(
+        hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() * count for shingle, count in shingles.items()
+    )
+    total = len(digests) // 8
+    fingerprint = 0
+    # Count set bits column by column with bytes.translate so the inner loop runs in C.
+    for position in range(8):
+        column = digests[position::8]
+        for bit, table in enumerate(_BIT_TABLES):
+            if 2 * column.translate(table).count(1) > total:
+                fingerprint |= 1 << (position * 8 + bit)
+    return fingerprint
+
+
+def hamming_distance(first: int, second: int) -> int:
+    return (first ^ second).bit_count()
+
+
+def _signed(value: int) -> int:
+    """Map an unsigned 64-bit value onto SQLite's signed INTEGER range."""
+
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _bands(fingerprint: int) -> List[int]:
+    return [fingerprint >> (band * _BAND_BITS) & _BAND_MASK for band in range(_BANDS)]
+
+
+@dataclass(frozen=True, slots=True)
+class DuplicateMatch:
+    """An indexed document that a new document nearly duplicates."""
+
+    source: str
+    fingerprint: int
+    distance: int
+
+    def as_dict(self) -> dict[str, object]:
+        return {"of": self.source, "distance": self.distance}
+
+
+class FingerprintIndex:
+    """Persistent SimHash index answering "is this page a near-duplicate?".
+
+    Fingerprints are split into four 16-bit bands; two fingerprints within
+    Hamming distance 3 share at least one band exactly, so candidates come
+    from indexed band lookups and only those are compared bit by bit.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:", *, max_distance: int = 3) -> None:
+        if not 0 <= max_distance < _BANDS:
+            raise ValueError(f"max_distance must be between 0 and {_BANDS - 1}")
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._max_distance = max_distance
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "FingerprintIndex":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()
+        return int(row[0])
+
+    def find(self, fingerprint: int, *, exclude: Optional[str] = None) -> Optional[DuplicateMatch]:
+        """Return the closest indexed document within ``max_distance``, if any."""
+
+        with self._lock:
+            return self._find(fingerprint, exclude)
+
+    def add(self, source: str, fingerprint: int) -> None:
+        """Index *source* under *fingerprint*, replacing an earlier fingerprint."""
+
+        with self._lock:
+            self._add(source, fingerprint)
+
+    def check(self, source: str, fingerprint: int) -> Optional[DuplicateMatch]:
+        """Return the document *source* duplicates, or index it as canonical.
+
+        A source that was indexed before is never reported as a duplicate of
+        itself; its fingerprint is refreshed instead.
+        """
+
+        with self._lock:
+            match = self._find(fingerprint, source)
+            if match is None:
+                self._add(source, fingerprint)
+            return match
+
+    def _find(self, fingerprint: int, exclude: Optional[str]) -> Optional[DuplicateMatch]:
+        bands = [_signed(band) for band in _bands(fingerprint)]
+        rows = self._conn.execute(
+            "SELECT source, fingerprint FROM fingerprints WHERE band0 = ? OR band1 = ? OR band2 = ? OR band3 = ?",
+            bands,
+        )
+        best: Optional[DuplicateMatch] = None
+        for source, stored in rows:
+            if source == exclude:
+                continue
+            candidate = stored & ((1 << 64) - 1)
+            distance = hamming_distance(fingerprint, candidate)
+            if distance <= self._max_distance and (best is None or distance < best.distance):
+                best = DuplicateMatch(source=source, fingerprint=candidate, distance=distance)
+        return best
+
+    def _add(self, source: str, fingerprint: int) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO fingerprints (source, fingerprint, band0, band1, band2, band3) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [source, _signed(fingerprint), *_bands(fingerprint)],
+        )
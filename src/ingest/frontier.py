@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from src.ingest.bloom import BloomFilter
+from src.ingest.canonical import canonicalize_url
+
+PENDING, LEASED, DONE, FAILED = 0, 1, 2, 3
+_STATE_NAMES = {PENDING: "pending", LEASED: "leased", DONE: "done", FAILED: "failed"}
+
+FrontierInput = Union[str, Tuple[str, int]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    url TEXT PRIMARY KEY,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    lease_id INTEGER,
+    seq INTEGER NOT NULL,
+    last_error TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS frontier_ready ON frontier (state, priority DESC, seq);
+CREATE INDEX IF NOT EXISTS frontier_leases ON frontier (state, lease_until);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class FrontierItem:
+    """A URL leased from the frontier."""
+
+    url: str
+    priority: int
+    attempts: int
+    lease_until: float
+    lease_id: int
+
+
+class Frontier:
+    """Persistent, deduplicating crawl frontier backed by SQLite.
+
+    Every URL is stored once (the table primary key is the exact seen-set and
+    a Bloom filter in front of it answers most "new URL" checks without a
+    lookup). Pending URLs are leased in priority order (higher first, FIFO
+    within a priority) for *lease_seconds*; leases that are neither completed
+    nor failed expire and the URL becomes pending again, which is how work
+    held by a crashed worker resumes. Each lease carries a ``lease_id`` that
+    ``complete`` and ``fail`` require, so a worker whose lease expired cannot
+    settle a URL that has since been leased to someone else. A URL that fails *max_attempts* times
+    is parked in the failed state.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        lease_seconds: float = 300.0,
+        max_attempts: int = 3,
+        expected_urls: int = 1_000_000,
+        error_rate: float = 0.01,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if lease_seconds <= 0:
+            raise ValueError("lease_seconds must be greater than 0")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lease_seconds = lease_seconds
+        self._max_attempts = max_attempts
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(frontier)")}
+        if "lease_id" not in columns:
+            # Frontiers created before lease ids; their open leases simply expire.
+            self._conn.execute("ALTER TABLE frontier ADD COLUMN lease_id INTEGER")
+
+        self._bloom = BloomFilter(expected_urls, error_rate=error_rate)
+        for (url,) in self._conn.execute("SELECT url FROM frontier"):
+            self._bloom.add(url)
+        row = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM frontier").fetchone()
+        self._seq = int(row[0])
+        # lease_id is never cleared, so the maximum keeps ids unique across restarts.
+        row = self._conn.execute("SELECT COALESCE(MAX(lease_id), 0) FROM frontier").fetchone()
+        self._lease_seq = int(row[0])
+
+    def __enter__(self) -> "Frontier":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def seen(self, url: str) -> bool:
+        """Return True when the URL has ever been enqueued."""
+
+        normalized = _normalize_url(url)
+        if normalized not in self._bloom:
+            return False
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM frontier WHERE url = ?", (normalized,)).fetchone()
+        return row is not None
+
+    def enqueue(self, url: str, *, priority: int = 0) -> bool:
+        """Add a URL unless it was seen before; return True when it was added."""
+
+        return self.enqueue_many([(url, priority)]) == 1
+
+    def enqueue_many(self, items: Iterable[FrontierInput], *, priority: int = 0) -> int:
+        """Add many URLs (or ``(url, priority)`` pairs) in one transaction.
+
+        Returns the number of URLs that were new.
+        """
+
+        rows: List[Tuple[str, int, int]] = []
+        batch: Dict[str, int] = {}
+        for item in items:
+            url, item_priority = (item, priority) if isinstance(item, str) else item
+            normalized = _normalize_url(url)
+            if normalized not in batch:
+                batch[normalized] = item_priority
+
+        with self._lock:
+            # Only Bloom filter hits need an exact lookup in the store.
+            existing = self._existing([url for url in batch if url in self._bloom])
+            for url, item_priority in batch.items():
+                if url in existing:
+                    continue
+                self._seq += 1
+                rows.append((url, item_priority, self._seq))
+
+            if rows:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(
+                        "INSERT INTO frontier (url, priority, state, attempts, seq) VALUES (?, ?, 0, 0, ?)",
+                        rows,
+                    )
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+                for url, _, _ in rows:
+                    self._bloom.add(url)
+        return len(rows)
+
+    def lease(self, count: int = 1) -> List[FrontierItem]:
+        """Lease up to *count* pending URLs, highest priority first."""
+
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        now = self._clock()
+        lease_until = now + self._lease_seconds
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._expire_leases(now)
+                # SELECT then UPDATE rather than UPDATE ... RETURNING, which
+                # needs SQLite 3.35; BEGIN IMMEDIATE keeps the pair atomic.
+                rows = self._conn.execute(
+                    "SELECT url, priority, attempts FROM frontier WHERE state = ? ORDER BY priority DESC, seq LIMIT ?",
+                    (PENDING, count),
+                ).fetchall()
+                lease_ids = list(range(self._lease_seq + 1, self._lease_seq + 1 + len(rows)))
+                self._conn.executemany(
+                    "UPDATE frontier SET state = ?, lease_until = ?, lease_id = ?, attempts = attempts + 1 "
+                    "WHERE url = ?",
+                    [(LEASED, lease_until, lease_id, row[0]) for row, lease_id in zip(rows, lease_ids, strict=True)],
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            self._lease_seq += len(rows)
+        return [
+            FrontierItem(url=row[0], priority=row[1], attempts=row[2] + 1, lease_until=lease_until, lease_id=lease_id)
+            for row, lease_id in zip(rows, lease_ids, strict=True)
+        ]
+
+    def complete(self, url: str, lease_id: int) -> None:
+        """Mark a URL held under *lease_id* as done."""
+
+        if self.complete_many([(url, lease_id)]) == 0:
+            raise KeyError(f"URL is not leased under lease {lease_id}: {_normalize_url(url)}")
+
+    def complete_many(self, leases: Iterable[Tuple[str, int]]) -> int:
+        """Mark ``(url, lease_id)`` pairs as done in one transaction.
+
+        Returns how many were still held under the given lease.
+        """
+
+        rows = [(DONE, _normalize_url(url), LEASED, lease_id) for url, lease_id in leases]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "UPDATE frontier SET state = ?, lease_until = NULL, last_error = NULL "
+                    "WHERE url = ? AND state = ? AND lease_id = ?",
+                    rows,
+                )
+                changed = self._conn.total_changes - before
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return changed
+
+    def fail(self, url: str, lease_id: int, *, error: Optional[str] = None, retry: bool = True) -> bool:
+        """Record a failed attempt under *lease_id*; return True when the URL was re-queued."""
+
+        normalized = _normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts FROM frontier WHERE url = ? AND state = ? AND lease_id = ?",
+                (normalized, LEASED, lease_id),
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"URL is not leased under lease {lease_id}: {normalized}")
+            requeue = retry and row[0] < self._max_attempts
+            cursor = self._conn.execute(
+                "UPDATE frontier SET state = ?, lease_until = NULL, last_error = ? "
+                "WHERE url = ? AND state = ? AND lease_id = ?",
+                (PENDING if requeue else FAILED, error, normalized, LEASED, lease_id),
+            )
+            if cursor.rowcount != 1:
+                raise KeyError(f"URL is not leased under lease {lease_id}: {normalized}")
+        return requeue
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of URLs in each state."""
+
+        counts = {name: 0 for name in _STATE_NAMES.values()}
+        with self._lock:
+            for state, total in self._conn.execute("SELECT state, COUNT(*) FROM frontier GROUP BY state"):
+                counts[_STATE_NAMES[state]] = total
+        return counts
+
+    def __len__(self) -> int:
+        """Return the number of URLs that are pending or leased."""
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM frontier WHERE state IN (?, ?)", (PENDING, LEASED)
+            ).fetchone()
+        return int(row[0])
+
+    def _existing(self, urls: List[str]) -> Set[str]:
+        found: Set[str] = set()
+        for start in range(0, len(urls), 500):
+            chunk = urls[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(
+                url for (url,) in self._conn.execute(f"SELECT url FROM frontier WHERE url IN ({placeholders})", chunk)
+            )
+        return found
+
+    def _expire_leases(self, now: float) -> None:
+        self._conn.execute(
+            "UPDATE frontier SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, lease_until = NULL "
+            "WHERE state = ? AND lease_until <= ?",
+            (self._max_attempts, FAILED, PENDING, LEASED, now),
+        )
+
+
+def _normalize_url(url: str) -> str:
+    normalized = canonicalize_url(url) if isinstance(url, str) else ""
+    if not normalized:
+        raise ValueError("URL must be a non-empty string")
+    return normalized
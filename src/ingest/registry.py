@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
+
+from src.ingest.canonical import canonicalize_url
+from src.ingest.url_index import UrlIndex
 
 
 @dataclass(frozen=True, slots=True)
@@ -13,39 +16,80 @@ class RegistryEntry:
 
 
 class Registry:
-    """In-memory registry for ingest targets with duplicate protection."""
+    """In-memory registry for ingest targets with duplicate protection.
+
+    URLs are canonicalized before storage, and membership is tracked in a
+    compact hashed index. With ``keep_entries=False`` only the index (plus a
+    second index of robots-exempt URLs) is kept, which keeps tens of millions
+    of URLs within a few hundred MB; :meth:`list_entries` is unavailable then.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, *, keep_entries: bool = True) -> None:
         self._entries: Dict[str, RegistryEntry] = {}
+        self._index = UrlIndex()
+        self._robots_exempt = UrlIndex()
+        self._keep_entries = keep_entries
+
+    def __len__(self) -> int:
+        return len(self._index)
 
     def add(self, url: str, *, respects_robots: bool = True) -> RegistryEntry:
         """Register a new URL and store whether it respects robots rules."""
 
         normalized = self._normalize_url(url)
-        if normalized in self._entries:
+        entry = self._insert(normalized, respects_robots)
+        if entry is None:
             raise ValueError(f"URL already registered: {normalized}")
-
-        entry = RegistryEntry(url=normalized, respects_robots=respects_robots)
-        self._entries[normalized] = entry
         return entry
 
+    def add_many(self, urls: Iterable[str], *, respects_robots: bool = True) -> int:
+        """Register URLs in bulk, skipping duplicates; return how many were new."""
+
+        added = 0
+        for url in urls:
+            if self._insert(self._normalize_url(url), respects_robots) is not None:
+                added += 1
+        return added
+
     def exists(self, url: str) -> bool:
         """Return True when the URL has already been registered."""
 
         normalized = self._normalize_url(url)
-        return normalized in self._entries
+        return normalized in self._index
+
+    def get(self, url: str) -> Optional[RegistryEntry]:
+        """Return the entry registered for the URL, if any."""
+
+        normalized = self._normalize_url(url)
+        if self._keep_entries:
+            return self._entries.get(normalized)
+        if normalized not in self._index:
+            return None
+        return RegistryEntry(url=normalized, respects_robots=normalized not in self._robots_exempt)
 
     def list_entries(self) -> List[RegistryEntry]:
         """Return all registered entries preserving insertion order."""
 
+        if not self._keep_entries:
+            raise RuntimeError("Registry was created with keep_entries=False")
         return list(self._entries.values())
 
+    def _insert(self, normalized: str, respects_robots: bool) -> Optional[RegistryEntry]:
+        if not self._index.add(normalized):
+            return None
+        if not respects_robots:
+            self._robots_exempt.add(normalized)
+        entry = RegistryEntry(url=normalized, respects_robots=respects_robots)
+        if self._keep_entries:
+            self._entries[normalized] = entry
+        return entry
+
     @staticmethod
     def _normalize_url(url: str) -> str:
         if not isinstance(url, str):
             raise ValueError("URL must be provided as a string")
 
-        normalized = url.strip()
+        normalized = canonicalize_url(url)
         if not normalized:
             raise ValueError("URL must be a non-empty string")
         return normalized
@@ -66,6 +110,12 @@ def exists(url: str) -> bool:
     return _registry.exists(url)
 
 
+def add_many(urls: Iterable[str], *, respects_robots: bool = True) -> int:
+    """Bulk-add URLs to the default registry, skipping duplicates."""
+
+    return _registry.add_many(urls, respects_robots=respects_robots)
+
+
 def list_entries() -> List[RegistryEntry]:
     """Expose the default registry entries."""
 
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Set
+
+__all__ = ["UrlIndex", "url_hash"]
+
+_BUFFER_SIZE = 65_536
+
+
+def url_hash(url: str) -> int:
+    """Return a stable 64-bit hash of *url*."""
+
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class UrlIndex:
+    """Compact set of URLs stored as 64-bit hashes.
+
+    Hashes live in sorted ``array('Q')`` runs (8 bytes per URL) searched
+    with bisect. Recent additions are kept in a set of at most
+    ``_BUFFER_SIZE`` hashes, which is sorted into a new run when full; a run
+    is merged into the previous one while that one is no larger, so there
+    are O(log n) runs and inserts stay amortised O(log n). With 64-bit
+    hashes a false positive needs a collision, which is negligible below
+    billions of URLs.
+    """
+
+    __slots__ = ("_runs", "_recent")
+
+    def __init__(self, urls: Iterable[str] = ()) -> None:
+        # Sorted, disjoint runs, largest first.
+        self._runs: List[array] = []
+        self._recent: Set[int] = set()
+        for url in urls:
+            self.add(url)
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self._runs) + len(self._recent)
+
+    def __contains__(self, url: object) -> bool:
+        if not isinstance(url, str):
+            return False
+        return self._contains_hash(url_hash(url))
+
+    @property
+    def size_bytes(self) -> int:
+        # The recent set costs a hash table slot plus an int object per entry.
+        recent = sys.getsizeof(self._recent) + sum(sys.getsizeof(value) for value in self._recent)
+        return sum(run.itemsize * len(run) for run in self._runs) + recent
+
+    def add(self, url: str) -> bool:
+        """Add *url*; return False when it was already present."""
+
+        value = url_hash(url)
+        if self._contains_hash(value):
+            return False
+        self._recent.add(value)
+        if len(self._recent) >= _BUFFER_SIZE:
+            self._flush()
+        return True
+
+    def compact(self) -> None:
+        """Merge recent additions and every run into a single sorted array."""
+
+        if self._recent or len(self._runs) > 1:
+            # Stream the merge so the peak stays near two arrays, not a list of ints.
+            merged = array("Q", heapq.merge(*self._runs, sorted(self._recent)))
+            self._runs = [merged]
+            self._recent = set()
+
+    def _flush(self) -> None:
+        run = array("Q", sorted(self._recent))
+        self._recent = set()
+        while self._runs and len(self._runs[-1]) <= len(run):
+            run = array("Q", heapq.merge(self._runs.pop(), run))
+        self._runs.append(run)
+
+    def _contains_hash(self, value: int) -> bool:
+        if value in self._recent:
+            return True
+        for run in self._runs:
+            position = bisect_left(run, value)
+            if position < len(run) and run[position] == value:
+                return True
+        return False
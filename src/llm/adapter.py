@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 from abc import ABC, abstractmethod
-from collections.abc import Mapping, Sequence
-from typing import Any, Protocol
+from collections.abc import Awaitable, Mapping, Sequence
+from typing import Any, Callable, Protocol
 
 
 class CompletionClient(Protocol):
@@ -14,6 +16,13 @@ class CompletionClient(Protocol):
         ...
 
 
+class AsyncCompletionClient(CompletionClient, Protocol):
+    """Completion client that also offers a native coroutine API."""
+
+    async def acreate_completion(self, **kwargs: Any) -> Mapping[str, Any]:
+        ...
+
+
 class LLMBackend(ABC):
     """Common interface for large language model backends."""
 
@@ -30,6 +39,22 @@ class LLMBackend(ABC):
         """Generate a completion for the supplied prompt."""
         ...
 
+    async def acomplete(
+        self,
+        prompt: str,
+        *,
+        temperature: float | None = None,
+        stop: Sequence[str] | None = None,
+        max_tokens: int | None = None,
+        **extra: Any,
+    ) -> str:
+        """Async :meth:`complete`; by default runs it on the event loop's executor."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(
+            self.complete, prompt, temperature=temperature, stop=stop, max_tokens=max_tokens, **extra
+        )
+        return await loop.run_in_executor(None, call)
+
 
 class CodexBackend(LLMBackend):
     """Adapter around a Codex-style completion endpoint."""
@@ -38,6 +63,10 @@ class CodexBackend(LLMBackend):
         self._client = client
         self._model = model
 
+    @property
+    def model(self) -> str:
+        return self._model
+
     def complete(
         self,
         prompt: str,
@@ -57,6 +86,33 @@ class CodexBackend(LLMBackend):
         response = self._client.create_completion(**payload)
         return self._extract_text(response)
 
+    async def acomplete(
+        self,
+        prompt: str,
+        *,
+        temperature: float | None = None,
+        stop: Sequence[str] | None = None,
+        max_tokens: int | None = None,
+        **extra: Any,
+    ) -> str:
+        """Await the client's ``acreate_completion`` when it has one, without a thread."""
+        create: Callable[..., Awaitable[Mapping[str, Any]]] | None = getattr(
+            self._client, "acreate_completion", None
+        )
+        if create is None:
+            return await super().acomplete(
+                prompt, temperature=temperature, stop=stop, max_tokens=max_tokens, **extra
+            )
+        payload = self._build_payload(
+            prompt=prompt,
+            temperature=temperature,
+            stop=stop,
+            max_tokens=max_tokens,
+            extra=extra,
+        )
+        response = await create(**payload)
+        return self._extract_text(response)
+
     def _build_payload(
         self,
         *,
@@ -0,0 +1,368 @@
+"""Disk-backed completion cache wrapping any :class:`src.llm.adapter.LLMBackend`."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from src.llm.adapter import LLMBackend
+
+DEFAULT_CACHE_DIR = Path("var") / "llm_cache"
+INDEX_NAME = "index.json"
+
+
+def completion_key(
+    model: str,
+    prompt: str,
+    *,
+    temperature: float | None = None,
+    stop: Sequence[str] | None = None,
+    max_tokens: int | None = None,
+    extra: dict[str, Any] | None = None,
+) -> str:
+    """Return the SHA-256 of the canonical JSON of a completion request."""
+
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "temperature": None if temperature is None else float(temperature),
+        "stop": None if stop is None else list(stop),
+        "max_tokens": max_tokens,
+        # Backends drop None-valued extras, so they do not change the request.
+        "extra": {key: value for key, value in (extra or {}).items() if value is not None},
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass(slots=True)
+class CompletionEntry:
+    """Metadata for one cached completion; the text lives under its key."""
+
+    key: str
+    size: int
+    stored_at: float
+
+
+@dataclass(slots=True)
+class CompletionCacheStats:
+    """Per-run cache counters."""
+
+    requests: int = 0
+    hits: int = 0
+    coalesced: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    stored: int = 0
+    expired: int = 0
+    evicted: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        if not self.requests:
+            return 0.0
+        return (self.hits + self.coalesced) / self.requests
+
+    def as_dict(self) -> dict[str, Any]:
+        payload: dict[str, Any] = asdict(self)
+        payload["hit_ratio"] = self.hit_ratio
+        return payload
+
+
+class _LeaderGaveUp(Exception):
+    """The call a follower waited on ended without a result; the follower retries."""
+
+
+class CachingBackend(LLMBackend):
+    """Serve repeated completions from disk instead of calling *backend* again.
+
+    Requests are keyed by :func:`completion_key` over *model* and every
+    completion parameter. Texts are stored under ``completions/`` and the
+    index of entries is kept in LRU order, written to ``index.json`` on
+    :meth:`flush`/:meth:`close` (and every *flush_every* stores); entries are
+    evicted least-recently-used first once the stored text exceeds
+    *max_bytes* (a single text larger than that is not cached), and treated
+    as misses once older than *ttl* seconds.
+    Concurrent requests for the same key share one backend call; when that
+    call is cancelled, one of the waiting requests makes it instead. Pass
+    ``bypass=True`` to skip the lookup; the fresh result still replaces the
+    cached one.
+    """
+
+    def __init__(
+        self,
+        backend: LLMBackend,
+        *,
+        model: str | None = None,
+        root: Path | str = DEFAULT_CACHE_DIR,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float | None = None,
+        flush_every: int = 100,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self._backend = backend
+        self._model = model or getattr(backend, "model", None) or type(backend).__name__
+        self._root = Path(root)
+        self._texts = self._root / "completions"
+        self._texts.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._flush_every = max(1, flush_every)
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._entries: OrderedDict[str, CompletionEntry] = OrderedDict()
+        self._in_flight: dict[str, Future[str]] = {}
+        self._total_bytes = 0
+        self._dirty = 0
+        self.stats = CompletionCacheStats()
+        self._load()
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def complete(
+        self,
+        prompt: str,
+        *,
+        temperature: float | None = None,
+        stop: Sequence[str] | None = None,
+        max_tokens: int | None = None,
+        bypass: bool = False,
+        **extra: Any,
+    ) -> str:
+        key = completion_key(
+            self._model, prompt, temperature=temperature, stop=stop, max_tokens=max_tokens, extra=extra
+        )
+        entry = self._lookup(key, bypass=bypass)
+        if entry is not None:
+            text = self._read(key, entry)
+            if text is not None:
+                return text
+        future, leader = self._claim(key)
+        while not leader:
+            try:
+                return future.result()
+            except _LeaderGaveUp:
+                future, leader = self._claim(key, retry=True)
+        try:
+            text = self._backend.complete(prompt, temperature=temperature, stop=stop, max_tokens=max_tokens, **extra)
+        except BaseException as exc:
+            self._finish(key, future, exc=exc)
+            raise
+        self._finish(key, future, text=text)
+        return text
+
+    async def acomplete(
+        self,
+        prompt: str,
+        *,
+        temperature: float | None = None,
+        stop: Sequence[str] | None = None,
+        max_tokens: int | None = None,
+        bypass: bool = False,
+        **extra: Any,
+    ) -> str:
+        key = completion_key(
+            self._model, prompt, temperature=temperature, stop=stop, max_tokens=max_tokens, extra=extra
+        )
+        entry = self._lookup(key, bypass=bypass)
+        if entry is not None:
+            text = await asyncio.to_thread(self._read, key, entry)
+            if text is not None:
+                return text
+        future, leader = self._claim(key)
+        while not leader:
+            try:
+                # Shielded: a cancelled follower must not cancel the shared future.
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _LeaderGaveUp:
+                future, leader = self._claim(key, retry=True)
+        try:
+            text = await self._backend.acomplete(
+                prompt, temperature=temperature, stop=stop, max_tokens=max_tokens, **extra
+            )
+        except BaseException as exc:
+            self._finish(key, future, exc=exc)
+            raise
+        await asyncio.to_thread(self._finish, key, future, text=text)
+        return text
+
+    def flush(self) -> None:
+        """Persist the index atomically."""
+
+        with self._flush_lock:
+            with self._lock:
+                payload = [asdict(entry) for entry in self._entries.values()]
+                self._dirty = 0
+            index_path = self._root / INDEX_NAME
+            temp_path = index_path.with_suffix(".tmp")
+            temp_path.write_text(json.dumps(payload), encoding="utf-8")
+            os.replace(temp_path, index_path)
+
+    def close(self) -> None:
+        self.flush()
+
+    # File I/O stays outside ``_lock``: it only guards the index, counters and
+    # in-flight map, so a slow disk never blocks lookups of other keys.
+
+    def _lookup(self, key: str, *, bypass: bool) -> CompletionEntry | None:
+        """Count the request and return the live entry for *key*, if any."""
+
+        with self._lock:
+            self.stats.requests += 1
+            if bypass:
+                self.stats.bypassed += 1
+                return None
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expired = self._ttl is not None and self._clock() - entry.stored_at >= self._ttl
+            if expired:
+                self._discard(key)
+                self.stats.expired += 1
+        if expired:
+            self._text_path(key).unlink(missing_ok=True)
+            return None
+        return entry
+
+    def _read(self, key: str, entry: CompletionEntry) -> str | None:
+        try:
+            text = self._text_path(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    self._discard(key)
+            return None
+        with self._lock:
+            self.stats.hits += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return text
+
+    def _claim(self, key: str, *, retry: bool = False) -> tuple[Future[str], bool]:
+        """Join the in-flight call for *key*, or start one; the flag is True for the caller that must run it.
+
+        *retry* is set by a follower whose leader gave up; it was already
+        counted as coalesced.
+        """
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                if not retry:
+                    self.stats.coalesced += 1
+                return future, False
+            if retry:
+                self.stats.coalesced -= 1
+            self.stats.misses += 1
+            future = self._in_flight[key] = Future()
+            return future, True
+
+    def _finish(
+        self, key: str, future: Future[str], *, text: str | None = None, exc: BaseException | None = None
+    ) -> None:
+        try:
+            if exc is None and text:
+                self._store(key, text)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            if exc is None:
+                future.set_result(text or "")
+            elif isinstance(exc, Exception):
+                future.set_exception(exc)
+            else:
+                # Cancelled or interrupted: no answer to share, so a follower takes over.
+                future.set_exception(_LeaderGaveUp())
+
+    def _store(self, key: str, text: str) -> None:
+        data = text.encode("utf-8")
+        path = self._text_path(key)
+        if len(data) > self._max_bytes:
+            with self._lock:
+                dropped = self._discard(key)
+            if dropped:
+                path.unlink(missing_ok=True)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{key}.{threading.get_ident()}.tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._discard(key)
+            self._add(CompletionEntry(key=key, size=len(data), stored_at=self._clock()))
+            self.stats.stored += 1
+            evicted = self._evict()
+            self._dirty += 1
+            flush = self._dirty >= self._flush_every
+        for old_key in evicted:
+            self._text_path(old_key).unlink(missing_ok=True)
+        if flush:
+            self.flush()
+
+    def _load(self) -> None:
+        index_path = self._root / INDEX_NAME
+        if not index_path.exists():
+            return
+        try:
+            payload = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        for raw in payload if isinstance(payload, list) else ():
+            try:
+                entry = CompletionEntry(**raw)
+                present = self._text_path(entry.key).exists()
+            except (TypeError, KeyError):
+                continue  # a damaged row only loses its own entry
+            if present and entry.size <= self._max_bytes:
+                self._add(entry)
+        for key in self._evict():
+            self._text_path(key).unlink(missing_ok=True)
+
+    def _add(self, entry: CompletionEntry) -> None:
+        self._entries[entry.key] = entry
+        self._total_bytes += entry.size
+
+    def _discard(self, key: str) -> bool:
+        """Drop *key* from the index; the caller removes its file outside the lock."""
+
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._total_bytes -= entry.size
+        return True
+
+    def _evict(self) -> list[str]:
+        evicted: list[str] = []
+        while self._total_bytes > self._max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._discard(key)
+            evicted.append(key)
+            self.stats.evicted += 1
+        return evicted
+
+    def _text_path(self, key: str) -> Path:
+        return self._texts / key[:2] / key
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
+import queue
 import re
 import sys
+import threading
 from pathlib import Path
 from typing import Iterator, Sequence
 
@@ -11,6 +14,8 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from src.crawler.http import GET_many, FetchResult, HttpClient
+from src.ingest.dedup import FingerprintIndex, page_text, simhash
 from src.normalize.company import canonical_company_name, normalize_company_name
 from src.normalize.contact import contact_dedup_key, normalize_email, normalize_phone
 from src.parser.extract import Parser
@@ -34,6 +39,16 @@ def _positive_int(value: str) -> int:
     return parsed
 
 
+def _positive_float(value: str) -> float:
+    try:
+        parsed = float(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("value must be a positive number") from exc
+    if parsed <= 0:
+        raise argparse.ArgumentTypeError("value must be a positive number")
+    return parsed
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="pipeline", description="Run the offline automation pipeline.")
     subparsers = parser.add_subparsers(dest="command", required=True)
@@ -45,6 +60,34 @@ def build_parser() -> argparse.ArgumentParser:
         default=Path("tests/fixtures"),
         help="Directory or file with HTML documents. Defaults to tests/fixtures.",
     )
+    run_parser.add_argument(
+        "--urls",
+        type=Path,
+        help="File with one URL per line to fetch and parse instead of reading --input.",
+    )
+    run_parser.add_argument(
+        "--concurrency",
+        type=_positive_int,
+        default=8,
+        help="Maximum concurrent fetches in --urls mode.",
+    )
+    run_parser.add_argument(
+        "--per-host",
+        type=_positive_int,
+        default=2,
+        help="Maximum concurrent fetches per host in --urls mode.",
+    )
+    run_parser.add_argument(
+        "--timeout",
+        type=_positive_float,
+        default=10.0,
+        help="Per-request timeout in seconds for --urls mode.",
+    )
+    run_parser.add_argument(
+        "--dedup-index",
+        type=Path,
+        help="SQLite fingerprint index; near-duplicate pages are linked to the first copy instead of processed.",
+    )
     run_parser.add_argument(
         "--from",
         dest="from_stage",
@@ -75,15 +118,20 @@ def build_parser() -> argparse.ArgumentParser:
 
 
 class PipelineRunner:
-    def __init__(self, *, input_path: Path, language: str = "en") -> None:
+    def __init__(
+        self,
+        *,
+        input_path: Path,
+        language: str = "en",
+        fingerprints: FingerprintIndex | None = None,
+    ) -> None:
         self._input_path = input_path
         self._language = language
         self._parser = Parser()
+        self._fingerprints = fingerprints
+        self.deduped = 0
 
     def execute(self, from_stage: str, to_stage: str, limit: int | None = None) -> Iterator[dict[str, object]]:
-        stage_start = _STAGE_INDEX[from_stage]
-        stage_end = _STAGE_INDEX[to_stage]
-
         inputs = self._collect_inputs()
         processed = 0
 
@@ -92,29 +140,128 @@ class PipelineRunner:
                 break
 
             html = html_path.read_text(encoding="utf-8")
-            parsed = self._parser.parse(html)
-            record: dict[str, object] = {"source": str(html_path)}
-
-            if stage_start <= _STAGE_INDEX["parse"] <= stage_end:
-                record["parse"] = parsed
-
-            if stage_end >= _STAGE_INDEX["normalize"]:
-                normalized = _normalize_record(parsed)
-            else:
-                normalized = None
-            if normalized is not None and stage_start <= _STAGE_INDEX["normalize"] <= stage_end:
-                record["normalize"] = normalized
-
-            if stage_end >= _STAGE_INDEX["compose"]:
-                composed = _compose_email(normalized or _normalize_record(parsed), language=self._language)
-            else:
-                composed = None
-            if composed is not None and stage_start <= _STAGE_INDEX["compose"] <= stage_end:
-                record["compose"] = composed
-
-            yield record
+            yield self._process(html, {"source": str(html_path)}, from_stage, to_stage)
             processed += 1
 
+    def execute_urls(
+        self,
+        urls: Sequence[str],
+        from_stage: str,
+        to_stage: str,
+        limit: int | None = None,
+        *,
+        concurrency: int = 8,
+        per_host: int = 2,
+        timeout: float = 10.0,
+    ) -> Iterator[dict[str, object]]:
+        """Fetch *urls* concurrently and run the stages on each page as it arrives.
+
+        Records come out in completion order and carry a ``fetch`` entry with
+        the status and latency; failed fetches yield a record with an
+        ``error`` instead of stage output. The fetches run on an event loop
+        in a background thread, so they keep going while the caller's
+        thread parses a page.
+        """
+
+        if limit is not None:
+            urls = urls[:limit]
+        # At most *concurrency* results wait for the caller, plus the final None;
+        # the fetch task takes a slot before each put and the caller frees it.
+        results: queue.Queue[FetchResult | None] = queue.Queue(maxsize=concurrency + 1)
+        loop = asyncio.new_event_loop()
+        slots = asyncio.Semaphore(concurrency)
+        task = loop.create_task(
+            self._fetch_urls(urls, results, slots, concurrency=concurrency, per_host=per_host, timeout=timeout)
+        )
+        thread = threading.Thread(target=_run_until_done, args=(loop, task), name="pipeline-fetch", daemon=True)
+        thread.start()
+        try:
+            while (result := results.get()) is not None:
+                loop.call_soon_threadsafe(slots.release)
+                yield self._fetched_record(result, from_stage, to_stage)
+            thread.join()
+            task.result()
+        finally:
+            loop.call_soon_threadsafe(task.cancel)
+            thread.join()
+            loop.close()
+
+    async def _fetch_urls(
+        self,
+        urls: Sequence[str],
+        results: queue.Queue[FetchResult | None],
+        slots: asyncio.Semaphore,
+        *,
+        concurrency: int,
+        per_host: int,
+        timeout: float,
+    ) -> None:
+        """Put each fetch result on *results* as it completes, then ``None``.
+
+        Each result first takes one of *slots*, so a slow consumer holds the
+        fetches back instead of letting results pile up in the queue.
+        """
+
+        try:
+            with HttpClient(pool_maxsize=concurrency) as client:
+                fetched = GET_many(urls, timeout=timeout, concurrency=concurrency, per_host=per_host, client=client)
+                try:
+                    async for result in fetched:
+                        await slots.acquire()
+                        results.put_nowait(result)
+                finally:
+                    await fetched.aclose()
+        finally:
+            results.put_nowait(None)
+
+    def _fetched_record(self, result: FetchResult, from_stage: str, to_stage: str) -> dict[str, object]:
+        fetch: dict[str, object] = {
+            "url": result.url,
+            "elapsed_ms": round(result.elapsed * 1000, 3),
+            "attempts": result.attempts,
+        }
+        if result.response is None:
+            fetch["error"] = str(result.error)
+            return {"source": result.url, "fetch": fetch}
+        fetch["status"] = result.response.status_code
+        return self._process(result.response.text, {"source": result.url, "fetch": fetch}, from_stage, to_stage)
+
+    def _process(
+        self, html: str, record: dict[str, object], from_stage: str, to_stage: str
+    ) -> dict[str, object]:
+        stage_start = _STAGE_INDEX[from_stage]
+        stage_end = _STAGE_INDEX[to_stage]
+
+        if self._fingerprints is not None:
+            text = page_text(html)
+            if text:
+                match = self._fingerprints.check(str(record["source"]), simhash(text))
+                if match is not None:
+                    self.deduped += 1
+                    record["duplicate"] = match.as_dict()
+                    return record
+
+        parsed = self._parser.parse(html)
+
+        if stage_start <= _STAGE_INDEX["parse"] <= stage_end:
+            record["parse"] = parsed
+
+        if stage_end >= _STAGE_INDEX["normalize"]:
+            normalized = _normalize_record(parsed)
+        else:
+            normalized = None
+        if normalized is not None and stage_start <= _STAGE_INDEX["normalize"] <= stage_end:
+            record["normalize"] = normalized
+
+        if stage_end >= _STAGE_INDEX["compose"]:
+            composed = _compose_email(normalized or _normalize_record(parsed), language=self._language)
+        else:
+            composed = None
+        if composed is not None and stage_start <= _STAGE_INDEX["compose"] <= stage_end:
+            record["compose"] = composed
+
+        return record
+
     def _collect_inputs(self) -> Sequence[Path]:
         path = self._input_path
         if path.is_file():
@@ -126,6 +273,13 @@ class PipelineRunner:
         return html_files
 
 
+def _run_until_done(loop: asyncio.AbstractEventLoop, task: asyncio.Task[None]) -> None:
+    try:
+        loop.run_until_complete(task)
+    except BaseException:
+        pass  # the consumer re-raises it through ``task.result()``
+
+
 def _normalize_record(parsed: dict[str, object]) -> dict[str, object]:
     company_raw = parsed.get("company") if isinstance(parsed, dict) else None
     services_raw = parsed.get("services") if isinstance(parsed, dict) else None
@@ -241,6 +395,17 @@ def _compose_email(normalized: dict[str, object], *, language: str) -> dict[str,
     }
 
 
+def _read_urls(path: Path) -> list[str]:
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
 def _infer_first_name(email: str | None) -> str | None:
     if not email:
         return None
@@ -274,19 +439,80 @@ def _handle_run(args: argparse.Namespace) -> int:
     if _STAGE_INDEX[from_stage] > _STAGE_INDEX[to_stage]:
         parser.error("--from stage must not come after --to stage")
 
+    if args.urls is not None:
+        return _run_urls(args, from_stage, to_stage)
+
     input_path = args.input.expanduser().resolve()
-    runner = PipelineRunner(input_path=input_path, language=args.language)
+    fingerprints = _open_fingerprints(args)
+    runner = PipelineRunner(input_path=input_path, language=args.language, fingerprints=fingerprints)
 
     emitted = 0
-    for record in runner.execute(from_stage, to_stage, limit=args.limit):
-        print(json.dumps(record, ensure_ascii=False))
-        emitted += 1
+    try:
+        for record in runner.execute(from_stage, to_stage, limit=args.limit):
+            print(json.dumps(record, ensure_ascii=False))
+            emitted += 1
+    finally:
+        if fingerprints is not None:
+            fingerprints.close()
 
     if emitted == 0:
         print(f"No HTML inputs found at {input_path}", file=sys.stderr)
+    elif fingerprints is not None:
+        print(f"Deduplicated {runner.deduped} of {emitted} documents", file=sys.stderr)
     return 0
 
 
+def _open_fingerprints(args: argparse.Namespace) -> FingerprintIndex | None:
+    if args.dedup_index is None:
+        return None
+    return FingerprintIndex(args.dedup_index.expanduser().resolve())
+
+
+def _run_urls(args: argparse.Namespace, from_stage: str, to_stage: str) -> int:
+    urls_path = args.urls.expanduser().resolve()
+    try:
+        urls = _read_urls(urls_path)
+    except OSError as exc:
+        args.parser.error(f"cannot read --urls file: {exc}")
+    fingerprints = _open_fingerprints(args)
+    runner = PipelineRunner(input_path=urls_path, language=args.language, fingerprints=fingerprints)
+
+    latencies: list[float] = []
+    failed = 0
+    records = runner.execute_urls(
+        urls,
+        from_stage,
+        to_stage,
+        limit=args.limit,
+        concurrency=args.concurrency,
+        per_host=args.per_host,
+        timeout=args.timeout,
+    )
+    try:
+        for record in records:
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+            fetch = record["fetch"]
+            if isinstance(fetch, dict):
+                latencies.append(float(fetch["elapsed_ms"]))
+                failed += "error" in fetch
+    finally:
+        if fingerprints is not None:
+            fingerprints.close()
+
+    if not latencies:
+        print(f"No URLs found in {urls_path}", file=sys.stderr)
+        return 0
+    print(
+        f"Fetched {len(latencies)} URLs ({failed} failed); latency ms "
+        f"p50={_percentile(latencies, 0.5):.1f} p95={_percentile(latencies, 0.95):.1f} "
+        f"max={max(latencies):.1f}",
+        file=sys.stderr,
+    )
+    if fingerprints is not None:
+        print(f"Deduplicated {runner.deduped} of {len(latencies) - failed} documents", file=sys.stderr)
+    return 1 if failed == len(latencies) else 0
+
+
 def main(argv: Sequence[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
@@ -0,0 +1,170 @@
+"""Snapshot catalog: one manifest describing every snapshot, plus retention policies."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from src.store.locks import held_lock
+
+CATALOG_NAME = "catalog.json"
+_LOCK_SUFFIX = ".lock"
+
+
+@dataclass(frozen=True, slots=True)
+class SnapshotEntry:
+    """Catalog row of one snapshot; *bytes* and *checksum* describe its data file."""
+
+    version: str
+    format: str
+    records: int
+    bytes: int
+    checksum: str
+    created: float
+    base: Optional[str] = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class Catalog:
+    """The ``catalog.json`` manifest of a snapshot directory.
+
+    Reading is a single file load, so listing snapshots costs the same for
+    any number of them. Updates rewrite the manifest atomically under a lock
+    file. A manifest created by an update, rather than by :meth:`replace`
+    after a scan of the directory, is marked incomplete: it may miss
+    snapshots written before the catalog existed.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.path = directory / CATALOG_NAME
+        self._lock_path = directory / f"{CATALOG_NAME}{_LOCK_SUFFIX}"
+
+    def load(self) -> Optional[dict[str, SnapshotEntry]]:
+        """Return the entries by version, or None when the catalog is missing or incomplete."""
+
+        complete, entries = self._read()
+        return entries if complete else None
+
+    def get(self, version: str) -> Optional[SnapshotEntry]:
+        return self._read()[1].get(version)
+
+    def record(self, entry: SnapshotEntry) -> None:
+        with held_lock(self._lock_path):
+            complete, entries = self._read()
+            entries[entry.version] = entry
+            self._write(complete, entries)
+
+    def remove(self, versions: Iterable[str]) -> None:
+        with held_lock(self._lock_path):
+            complete, entries = self._read()
+            for version in versions:
+                entries.pop(version, None)
+            self._write(complete, entries)
+
+    def replace(
+        self, scanned: Iterable[SnapshotEntry], *, since: float, exists: Callable[[str], bool]
+    ) -> dict[str, SnapshotEntry]:
+        """Store the entries of a directory scan started at *since* and mark the catalog complete.
+
+        Entries recorded since the scan started win over scanned ones, and
+        versions for which *exists* is False (deleted meanwhile) are dropped.
+        """
+
+        with held_lock(self._lock_path):
+            _complete, current = self._read()
+            entries = {entry.version: entry for entry in scanned}
+            entries.update((version, entry) for version, entry in current.items() if entry.created >= since)
+            entries = {version: entry for version, entry in entries.items() if exists(version)}
+            self._write(True, entries)
+        return entries
+
+    def _read(self) -> tuple[bool, dict[str, SnapshotEntry]]:
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+            entries = [SnapshotEntry(**item) for item in payload["snapshots"]]
+        except FileNotFoundError:
+            return False, {}
+        except (ValueError, KeyError, TypeError):
+            # A damaged catalog is rebuilt from the snapshot files.
+            return False, {}
+        return bool(payload.get("complete")), {entry.version: entry for entry in entries}
+
+    def _write(self, complete: bool, entries: dict[str, SnapshotEntry]) -> None:
+        ordered = sorted(entries.values(), key=lambda entry: (entry.created, entry.version))
+        payload = {"complete": complete, "snapshots": [entry.as_dict() for entry in ordered]}
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, prefix=f".{CATALOG_NAME}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, indent=2)
+            os.replace(temp_name, self.path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+
+@dataclass(frozen=True, slots=True)
+class RetentionPolicy:
+    """Which snapshots to keep: the newest *keep_last*, plus the newest one of each
+    of the last *keep_daily* days and *keep_weekly* ISO weeks that have snapshots (UTC).
+    """
+
+    keep_last: int = 0
+    keep_daily: int = 0
+    keep_weekly: int = 0
+
+    def __post_init__(self) -> None:
+        counts = (self.keep_last, self.keep_daily, self.keep_weekly)
+        if any(count < 0 for count in counts):
+            raise ValueError("Retention counts cannot be negative.")
+        if not any(counts):
+            raise ValueError("Retention policy must keep at least one snapshot.")
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _day(created: float) -> object:
+    return datetime.fromtimestamp(created, timezone.utc).date()
+
+
+def _week(created: float) -> object:
+    year, week, _weekday = datetime.fromtimestamp(created, timezone.utc).isocalendar()
+    return year, week
+
+
+def select_expired(entries: Iterable[SnapshotEntry], policy: RetentionPolicy) -> list[str]:
+    """Return the versions *policy* does not keep, oldest first.
+
+    The bases of kept delta snapshots are kept as well, since reading a
+    delta replays its chain.
+    """
+
+    newest_first = sorted(entries, key=lambda entry: (entry.created, entry.version), reverse=True)
+    keep = {entry.version for entry in newest_first[: policy.keep_last]}
+    for count, bucket in ((policy.keep_daily, _day), (policy.keep_weekly, _week)):
+        buckets: set[object] = set()
+        for entry in newest_first:
+            period = bucket(entry.created)
+            if period in buckets:
+                continue
+            if len(buckets) == count:
+                break
+            buckets.add(period)
+            keep.add(entry.version)
+
+    by_version = {entry.version: entry for entry in newest_first}
+    pending = list(keep)
+    while pending:
+        base = by_version[pending.pop()].base
+        if base is not None and base in by_version and base not in keep:
+            keep.add(base)
+            pending.append(base)
+    return [entry.version for entry in reversed(newest_first) if entry.version not in keep]
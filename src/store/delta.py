@@ -0,0 +1,228 @@
+"""Record-level diffs between snapshots and the delta files built from them."""
+
+from __future__ import annotations
+
+import heapq
+import json
+import pickle
+import tempfile
+from dataclasses import asdict, dataclass
+from json.encoder import encode_basestring
+from pathlib import Path
+from typing import Any, Callable, Generator, Iterable, Iterator, Optional, Tuple, Union
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+SAME = "same"
+
+# A delta's ops are stored like a snapshot under "<version>.delta", next to
+# its "<version>.delta.json" metadata, so a full snapshot of the same version
+# (which readers prefer) can replace it atomically.
+DELTA_BASE_SUFFIX = ".delta"
+DELTA_SUFFIX = ".delta.json"
+RUN_SIZE = 100_000
+_SPILL_BATCH = 4096
+
+KeyFunc = Callable[[Any], Any]
+# (canonical key JSON, line in its snapshot, record). Records read back from
+# a spilled run stay pickled as bytes, which no JSON record can be, until needed.
+Entry = Tuple[str, int, Any]
+
+_KEY_ENCODER = json.JSONEncoder(ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+@dataclass(frozen=True, slots=True)
+class Change:
+    """One record that differs between two snapshots."""
+
+    op: str
+    key: Any
+    before: Any = None
+    after: Any = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"op": self.op, "key": self.key, "before": self.before, "after": self.after}
+
+
+@dataclass(frozen=True, slots=True)
+class DeltaInfo:
+    """Sidecar metadata of a delta snapshot; *depth* counts deltas back to a full snapshot."""
+
+    base: str
+    depth: int
+    records: int
+    inserted: int
+    updated: int
+    deleted: int
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def key_function(key: Union[str, KeyFunc]) -> KeyFunc:
+    """Return *key* itself when callable, else a getter for that record field."""
+
+    if callable(key):
+        return key
+
+    def field(record: Any) -> Any:
+        try:
+            return record[key]
+        except (KeyError, TypeError, IndexError) as exc:
+            raise ValueError(f"Record has no {key!r} key: {record!r}") from exc
+
+    return field
+
+
+def encode_key(value: Any) -> str:
+    """Return the canonical JSON of a key value; entries sort by this string."""
+
+    if isinstance(value, str):
+        return encode_basestring(value)
+    if type(value) is int:
+        return repr(value)
+    return _KEY_ENCODER.encode(value)
+
+
+def sorted_entries(records: Iterable[Any], key: KeyFunc, *, run_size: int = RUN_SIZE) -> Iterator[Entry]:
+    """Yield an entry per record ordered by key, holding at most *run_size* in memory.
+
+    Larger inputs are sorted in runs spilled to temporary files and merged.
+    """
+
+    if run_size < 1:
+        raise ValueError("run_size must be at least 1")
+    run: list[Entry] = []
+    with tempfile.TemporaryDirectory(prefix="snapshot-diff-") as scratch:
+        runs: list[Path] = []
+        for line, record in enumerate(records):
+            run.append((encode_key(key(record)), line, record))
+            if len(run) >= run_size:
+                runs.append(_spill(run, Path(scratch) / f"{len(runs)}.run"))
+                run = []
+        if not runs:
+            run.sort()
+            yield from run
+            return
+        if run:
+            runs.append(_spill(run, Path(scratch) / f"{len(runs)}.run"))
+        readers = [_read_run(path) for path in runs]
+        try:
+            yield from heapq.merge(*readers)
+        finally:
+            for reader in readers:
+                reader.close()
+
+
+def _spill(run: list[Entry], path: Path) -> Path:
+    # Runs are private scratch files, so pickle (several times faster than
+    # JSON both ways) is safe here.
+    run.sort()
+    with path.open("wb") as handle:
+        for start in range(0, len(run), _SPILL_BATCH):
+            batch = [
+                (key, line, pickle.dumps(record, pickle.HIGHEST_PROTOCOL))
+                for key, line, record in run[start : start + _SPILL_BATCH]
+            ]
+            pickle.dump(batch, handle, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: Path) -> Generator[Entry, None, None]:
+    with path.open("rb") as handle:
+        while True:
+            try:
+                batch = pickle.load(handle)
+            except EOFError:
+                return
+            yield from batch
+
+
+def _decoded(entry: Entry) -> Entry:
+    record = entry[2]
+    return (entry[0], entry[1], pickle.loads(record)) if type(record) is bytes else entry
+
+
+def _same(before: Any, after: Any) -> bool:
+    if type(before) is bytes and type(after) is bytes and before == after:
+        return True
+    before = pickle.loads(before) if type(before) is bytes else before
+    after = pickle.loads(after) if type(after) is bytes else after
+    return before == after
+
+
+def diff_entries(
+    old: Iterable[Entry], new: Iterable[Entry]
+) -> Iterator[Tuple[str, str, Optional[Entry], Optional[Entry]]]:
+    """Merge two key-sorted entry streams into ``(op, key, old, new)`` tuples, SAME included.
+
+    Records of changed entries are decoded; SAME entries are passed through as read.
+    """
+
+    old_iter, new_iter = iter(old), iter(new)
+    before = _next_unique(old_iter, None)
+    after = _next_unique(new_iter, None)
+    while before is not None or after is not None:
+        if before is not None and (after is None or before[0] < after[0]):
+            yield DELETE, before[0], _decoded(before), None
+            before = _next_unique(old_iter, before)
+        elif after is not None and (before is None or after[0] < before[0]):
+            yield INSERT, after[0], None, _decoded(after)
+            after = _next_unique(new_iter, after)
+        else:
+            assert before is not None and after is not None
+            if _same(before[2], after[2]):
+                yield SAME, before[0], before, after
+            else:
+                yield UPDATE, before[0], _decoded(before), _decoded(after)
+            before = _next_unique(old_iter, before)
+            after = _next_unique(new_iter, after)
+
+
+def _next_unique(entries: Iterator[Entry], previous: Optional[Entry]) -> Optional[Entry]:
+    entry = next(entries, None)
+    if entry is not None and previous is not None and entry[0] == previous[0]:
+        raise ValueError(f"Duplicate record key {entry[0]} in snapshot.")
+    return entry
+
+
+def apply_delta(parent: Iterable[Any], ops: Iterable[dict[str, Any]]) -> Iterator[Any]:
+    """Yield the records of *parent* with delta *ops* applied.
+
+    Updates and deletes name a parent line and come sorted by it, followed
+    by inserts, so both streams are consumed in a single pass.
+    """
+
+    op_iter = iter(ops)
+    op = next(op_iter, None)
+    for line, record in enumerate(parent):
+        if op is not None and op["op"] != INSERT and op["line"] == line:
+            if op["op"] == UPDATE:
+                yield op["record"]
+            op = next(op_iter, None)
+        else:
+            yield record
+    while op is not None:
+        if op["op"] != INSERT:
+            raise ValueError(f"Delta {op['op']} refers to missing base line {op['line']}.")
+        yield op["record"]
+        op = next(op_iter, None)
+
+
+def delta_base(base: Path) -> Path:
+    return Path(f"{base}{DELTA_BASE_SUFFIX}")
+
+
+def read_delta_info(base: Path) -> Optional[DeltaInfo]:
+    path = Path(f"{base}{DELTA_SUFFIX}")
+    if not path.exists():
+        return None
+    return DeltaInfo(**json.loads(path.read_text(encoding="utf-8")))
+
+
+def remove_delta_info(base: Path) -> None:
+    try:
+        Path(f"{base}{DELTA_SUFFIX}").unlink()
+    except FileNotFoundError:
+        pass
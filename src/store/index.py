@@ -0,0 +1,188 @@
+"""Offset and key index sidecars for random access into JSON Lines snapshots."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import re
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+OFFSETS_SUFFIX = ".offsets"
+KEYS_SUFFIX = ".keys"
+META_SUFFIX = ".index.json"
+
+_KEY_NAME = re.compile(r"[A-Za-z0-9_-]+")
+_KEY_ENCODER = json.JSONEncoder(ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def key_hash(value: Any) -> int:
+    """Return a stable 64-bit hash of a JSON-serialisable key value."""
+
+    if isinstance(value, str):
+        encoded = b"s" + value.encode("utf-8")
+    elif type(value) is int:
+        encoded = b"i%d" % value
+    else:
+        encoded = b"j" + _KEY_ENCODER.encode(value).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "little")
+
+
+def validate_keys(keys: Sequence[str]) -> None:
+    for key in keys:
+        if not _KEY_NAME.fullmatch(key):
+            raise ValueError(f"Index key must match {_KEY_NAME.pattern}: {key!r}")
+
+
+def remove_index(base: Path) -> None:
+    """Delete the sidecars written for *base*, metadata first so readers stop using them."""
+
+    for path in [Path(f"{base}{META_SUFFIX}"), Path(f"{base}{OFFSETS_SUFFIX}"), *base.parent.glob(f"{base.name}.*{KEYS_SUFFIX}")]:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class IndexBuilder:
+    """Collect line offsets and key hashes while a snapshot is written."""
+
+    def __init__(self, keys: Sequence[str] = ()) -> None:
+        validate_keys(keys)
+        self._offsets = array("Q", [0])
+        self._hashes = {key: array("Q") for key in keys}
+        self._lines = {key: array("Q") for key in keys}
+
+    def add(self, record: Any, length: int) -> None:
+        """Register *record*, whose encoded line (newline included) is *length* bytes."""
+
+        line = len(self._offsets) - 1
+        if isinstance(record, dict):
+            for key, hashes in self._hashes.items():
+                if key in record:
+                    hashes.append(key_hash(record[key]))
+                    self._lines[key].append(line)
+        self._offsets.append(self._offsets[-1] + length)
+
+    def sidecars(self) -> dict[str, bytes]:
+        """Return the sidecar files as ``{suffix: content}``, metadata last.
+
+        Readers only use an index once its metadata exists, so writing the
+        files in this order never exposes a partial index.
+        """
+
+        records = len(self._offsets) - 1
+        line_bits = max(1, (records - 1).bit_length())
+        files = {OFFSETS_SUFFIX: self._offsets.tobytes()}
+        for key, hashes in self._hashes.items():
+            # Pack (hash prefix, line) into one sortable word; prefix collisions
+            # are resolved by comparing the decoded record on lookup.
+            pairs = zip(hashes, self._lines[key], strict=True)
+            packed = array("Q", sorted((value >> line_bits << line_bits) | line for value, line in pairs))
+            files[f".{key}{KEYS_SUFFIX}"] = packed.tobytes()
+        meta = {"records": records, "line_bits": line_bits, "keys": sorted(self._hashes)}
+        files[META_SUFFIX] = json.dumps(meta).encode("utf-8")
+        return files
+
+
+class _WordFile:
+    """Read-only ``array('Q')`` view of a file through mmap."""
+
+    def __init__(self, path: Path) -> None:
+        self._handle = open(path, "rb")
+        size = path.stat().st_size
+        self._map = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.words = memoryview(self._map).cast("Q") if self._map is not None else memoryview(array("Q"))
+
+    def close(self) -> None:
+        self.words.release()
+        if self._map is not None:
+            self._map.close()
+        self._handle.close()
+
+
+class SnapshotIndex:
+    """Random access to one snapshot through its offset and key sidecars.
+
+    Offsets and keys are memory-mapped, so opening costs the same for any
+    snapshot size; a point lookup is a binary search plus one read.
+    Records are read through mmap as well unless *use_mmap* is False.
+    """
+
+    def __init__(self, data_path: Path, base: Path, *, use_mmap: bool = True) -> None:
+        meta_path = Path(f"{base}{META_SUFFIX}")
+        if not meta_path.exists():
+            raise FileNotFoundError(f"No index for snapshot '{data_path.name}'.")
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        self._records = int(meta["records"])
+        self._line_bits = int(meta["line_bits"])
+        self.keys: tuple[str, ...] = tuple(meta["keys"])
+        self._offsets = _WordFile(Path(f"{base}{OFFSETS_SUFFIX}"))
+        self._key_files = {key: _WordFile(Path(f"{base}.{key}{KEYS_SUFFIX}")) for key in self.keys}
+        self._handle = open(data_path, "rb")
+        self._data: mmap.mmap | None = None
+        if use_mmap and data_path.stat().st_size:
+            self._data = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return self._records
+
+    def __enter__(self) -> "SnapshotIndex":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._offsets.close()
+        for key_file in self._key_files.values():
+            key_file.close()
+        if self._data is not None:
+            self._data.close()
+        self._handle.close()
+
+    def read(self, line: int) -> Any:
+        """Return the record on *line* (0-based)."""
+
+        if not 0 <= line < self._records:
+            raise IndexError(f"Record {line} is out of range.")
+        offsets = self._offsets.words
+        return json.loads(self._read_bytes(offsets[line], offsets[line + 1]))
+
+    def range(self, start: int, stop: int) -> Iterator[Any]:
+        """Yield records ``start <= line < stop`` from one contiguous read."""
+
+        start = max(0, start)
+        stop = min(stop, self._records)
+        if start >= stop:
+            return
+        offsets = self._offsets.words
+        for line in self._read_bytes(offsets[start], offsets[stop]).splitlines():
+            yield json.loads(line)
+
+    def get(self, value: Any, *, key: str = "id") -> Any | None:
+        """Return the first record whose *key* equals *value*, or None."""
+
+        key_file = self._key_files.get(key)
+        if key_file is None:
+            raise KeyError(f"Snapshot is not indexed on {key!r}.")
+        entries = key_file.words
+        shift = self._line_bits
+        prefix = key_hash(value) >> shift
+        mask = (1 << shift) - 1
+        position = bisect_left(entries, prefix << shift)
+        while position < len(entries) and entries[position] >> shift == prefix:
+            record = self.read(entries[position] & mask)
+            if isinstance(record, dict) and record.get(key) == value:
+                return record
+            position += 1
+        return None
+
+    def _read_bytes(self, start: int, stop: int) -> bytes:
+        if self._data is not None:
+            return self._data[start:stop]
+        self._handle.seek(start)
+        return self._handle.read(stop - start)
@@ -1,18 +1,45 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import threading
 import time
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, Any
+from typing import Any, Callable, Iterable, Iterator, Sequence, TextIO
+
+from src.store.catalog import Catalog, RetentionPolicy, SnapshotEntry, select_expired
+from src.store.delta import (
+    DELETE,
+    INSERT,
+    RUN_SIZE,
+    SAME,
+    UPDATE,
+    Change,
+    DeltaInfo,
+    KeyFunc,
+    apply_delta,
+    delta_base,
+    diff_entries,
+    key_function,
+    read_delta_info,
+    sorted_entries,
+)
+from src.store.formats import COLUMNAR, GROUP_SIZE, JSONL, detect_format, iter_columnar, iter_framed, validate_format
+from src.store.index import SnapshotIndex
+from src.store.locks import acquire_lock
+from src.store.writer import LOCK_SUFFIX, SnapshotLockedError, SnapshotWriter
+
+Predicate = Callable[[Any], bool]
 
 SNAPSHOT_DIR = Path("var") / "snapshots"
 JSONL_SUFFIX = ".jsonl"
 JSON_SUFFIX = ".json"
+CHECKPOINT_EVERY = 7
+COMPACT_INTERVAL = 300.0
 
 
-def _normalise_version(version: str | None) -> str:
-    if version is None:
-        version = f"v{int(time.time())}"
+def _normalise_version(version: str) -> str:
     if not version:
         raise ValueError("Snapshot version must be a non-empty string.")
     if not version.startswith("v"):
@@ -24,35 +51,489 @@ def _snapshot_path(version: str, suffix: str = JSONL_SUFFIX) -> Path:
     return SNAPSHOT_DIR / f"{version}{suffix}"
 
 
-def save_snapshot(records: Iterable[Any], version: str | None = None) -> str:
-    """Persist *records* to disk as JSON Lines and return the snapshot version."""
+def _index_base(version: str) -> Path:
+    return SNAPSHOT_DIR / version
+
+
+def _find_snapshot(version: str) -> tuple[str, Path, DeltaInfo | None]:
+    """Return the format, path and delta metadata of *version*, detected from the files on disk.
+
+    A full snapshot wins over a delta of the same version, which is how
+    compaction replaces a delta without readers seeing a gap.
+    """
+    base = _index_base(version)
+    found = detect_format(base)
+    if found is not None:
+        return (*found, None)
+    found = detect_format(delta_base(base))
+    info = read_delta_info(base)
+    if found is not None and info is not None:
+        return (*found, info)
+    json_path = _snapshot_path(version, JSON_SUFFIX)
+    if json_path.exists():
+        return "json", json_path, None
+    raise FileNotFoundError(f"Snapshot '{version}' not found.")
+
+
+def open_writer(
+    version: str | None = None,
+    *,
+    format: str = JSONL,
+    index_keys: Sequence[str] | None = None,
+    group_size: int = GROUP_SIZE,
+    durable: bool = True,
+) -> SnapshotWriter:
+    """Return a :class:`SnapshotWriter` for appending a snapshot incrementally.
+
+    Nothing is visible under the version until the writer commits (on a
+    clean exit from its ``with`` block); without *version* a collision-free
+    one is allocated.
+    """
+    resolved_version = _normalise_version(version) if version is not None else None
+    return SnapshotWriter(
+        SNAPSHOT_DIR,
+        resolved_version,
+        format=format,
+        index_keys=index_keys,
+        group_size=group_size,
+        durable=durable,
+    )
+
+
+def save_snapshot(
+    records: Iterable[Any],
+    version: str | None = None,
+    *,
+    format: str = JSONL,
+    index_keys: Sequence[str] | None = None,
+) -> str:
+    """Persist *records* to disk and return the snapshot version.
+
+    *format* is ``"jsonl"`` (the default), ``"jsonl.gz"`` or ``"jsonl.zst"``
+    for JSON Lines compressed in seekable frames, or ``"columnar"`` for dict
+    records stored column by column. Readers detect the format on their own.
+    With *index_keys* (an empty list indexes line offsets only) sidecar
+    indexes are written for :func:`get_record` and :func:`read_range`; they
+    need the plain ``jsonl`` format. The snapshot is written through
+    :func:`open_writer`, so it appears atomically or not at all.
+    """
+    with open_writer(version, format=format, index_keys=index_keys) as writer:
+        writer.extend(records)
+    return writer.version
+
+
+def save_delta(
+    records: Iterable[Any],
+    base: str,
+    version: str | None = None,
+    *,
+    key: str | KeyFunc = "id",
+    checkpoint_every: int = CHECKPOINT_EVERY,
+    format: str = JSONL,
+    run_size: int = RUN_SIZE,
+) -> str:
+    """Persist *records* as the changes since snapshot *base* and return the version.
+
+    Records are matched by *key* (a field name or a function of the record)
+    and only inserted, updated and deleted ones are stored. Once the chain
+    back to a full snapshot would exceed *checkpoint_every* deltas a full
+    snapshot is written instead. Reading a delta replays the chain: records
+    keep the order of the base, with inserts appended.
+    """
+    if checkpoint_every < 1:
+        raise ValueError("checkpoint_every must be at least 1")
+    validate_format(format)
+    base_version = _normalise_version(base)
+    resolved_version = _normalise_version(version) if version is not None else None
+    if resolved_version == base_version:
+        raise ValueError("A delta cannot use its own version as base.")
+    base_records = iter_snapshot(base_version)
+    base_info = _find_snapshot(base_version)[2]
+    depth = (base_info.depth if base_info is not None else 0) + 1
+    if depth > checkpoint_every:
+        return save_snapshot(records, resolved_version, format=format)
+
+    key_func = key_function(key)
+    changes: list[tuple[int, dict[str, Any]]] = []
+    inserts: list[tuple[int, dict[str, Any]]] = []
+    counts = dict.fromkeys((INSERT, UPDATE, DELETE, SAME), 0)
+    for op, _key, before, after in diff_entries(
+        sorted_entries(base_records, key_func, run_size=run_size),
+        sorted_entries(records, key_func, run_size=run_size),
+    ):
+        counts[op] += 1
+        if op == INSERT:
+            assert after is not None
+            inserts.append((after[1], {"op": INSERT, "record": after[2]}))
+        elif op == UPDATE:
+            assert before is not None and after is not None
+            changes.append((before[1], {"op": UPDATE, "line": before[1], "record": after[2]}))
+        elif op == DELETE:
+            assert before is not None
+            changes.append((before[1], {"op": DELETE, "line": before[1]}))
+
+    changes.sort(key=lambda item: item[0])
+    inserts.sort(key=lambda item: item[0])
+    info = DeltaInfo(
+        base=base_version,
+        depth=depth,
+        records=counts[INSERT] + counts[UPDATE] + counts[SAME],
+        inserted=counts[INSERT],
+        updated=counts[UPDATE],
+        deleted=counts[DELETE],
+    )
+    with SnapshotWriter(SNAPSHOT_DIR, resolved_version, format=format, delta=info) as writer:
+        writer.extend(op for _, op in changes + inserts)
+    return writer.version
+
+
+def delta_info(version: str) -> DeltaInfo | None:
+    """Return the delta metadata of *version*, or None for a full snapshot."""
+    return _find_snapshot(_normalise_version(version))[2]
+
+
+def diff_snapshots(
+    old_version: str,
+    new_version: str,
+    *,
+    key: str | KeyFunc = "id",
+    run_size: int = RUN_SIZE,
+) -> Iterator[Change]:
+    """Return a lazy iterator over the records that differ between two snapshots.
+
+    Changes come ordered by the canonical JSON of their key. Both snapshots
+    are streamed and sorted in runs of *run_size* records spilled to
+    temporary files, so memory stays bounded whatever their size.
+    """
+    key_func = key_function(key)
+    old_entries = sorted_entries(iter_snapshot(old_version), key_func, run_size=run_size)
+    new_entries = sorted_entries(iter_snapshot(new_version), key_func, run_size=run_size)
+    return (
+        Change(
+            op=op,
+            key=json.loads(encoded_key),
+            before=before[2] if before is not None else None,
+            after=after[2] if after is not None else None,
+        )
+        for op, encoded_key, before, after in diff_entries(old_entries, new_entries)
+        if op != SAME
+    )
+
+
+def list_snapshots() -> list[SnapshotEntry]:
+    """Return the catalog entries of all snapshots, oldest first.
+
+    This reads the catalog alone; when there is none yet (or it was created
+    by a writer and may miss older snapshots) it is rebuilt once first.
+    """
+    entries = Catalog(SNAPSHOT_DIR).load()
+    if entries is None:
+        entries = rebuild_catalog()
+    return sorted(entries.values(), key=lambda entry: (entry.created, entry.version))
+
+
+def rebuild_catalog() -> dict[str, SnapshotEntry]:
+    """Scan the snapshot files, rewrite the catalog from them and return its entries."""
+    started = time.time()
+    scanned = []
+    for version in _versions_on_disk():
+        try:
+            scanned.append(_scan_entry(version))
+        except FileNotFoundError:
+            continue
+    return Catalog(SNAPSHOT_DIR).replace(scanned, since=started, exists=_snapshot_exists)
+
+
+def _versions_on_disk() -> set[str]:
+    if not SNAPSHOT_DIR.is_dir():
+        return set()
+    return {
+        path.name.split(".", 1)[0]
+        for path in SNAPSHOT_DIR.iterdir()
+        if path.name.startswith("v") and not path.name.endswith(LOCK_SUFFIX)
+    }
+
+
+def _snapshot_exists(version: str) -> bool:
+    try:
+        _find_snapshot(version)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _scan_entry(version: str) -> SnapshotEntry:
+    format, path, delta = _find_snapshot(version)
+    if delta is not None:
+        records = delta.records
+    elif format == "json":
+        records = sum(1 for _ in _iter_json(path))
+    else:
+        records = sum(1 for _ in _iter_file(format, path, fields=()))
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    stat = path.stat()
+    return SnapshotEntry(
+        version=version,
+        format=format,
+        records=records,
+        bytes=stat.st_size,
+        checksum=f"sha256:{digest.hexdigest()}",
+        created=stat.st_mtime,
+        base=delta.base if delta is not None else None,
+    )
+
+
+def apply_retention(policy: RetentionPolicy, *, dry_run: bool = False) -> list[str]:
+    """Delete the snapshots *policy* does not keep and return their versions.
+
+    Versions locked by a writer or a compaction are left alone. With
+    *dry_run* nothing is deleted. Readers that already opened a deleted
+    snapshot keep reading it (on POSIX file systems).
+    """
+    expired = select_expired(list_snapshots(), policy)
+    if dry_run:
+        return expired
+    removed = []
+    for version in expired:
+        lock_path = SNAPSHOT_DIR / f"{version}{LOCK_SUFFIX}"
+        if not acquire_lock(lock_path):
+            continue
+        try:
+            for path in SNAPSHOT_DIR.glob(f"{version}.*"):
+                if path != lock_path:
+                    path.unlink(missing_ok=True)
+        finally:
+            lock_path.unlink()
+        removed.append(version)
+    Catalog(SNAPSHOT_DIR).remove(removed)
+    return removed
+
+
+def compact_snapshot(version: str) -> bool:
+    """Rewrite delta snapshot *version* as a full snapshot in the same format.
+
+    The full snapshot replaces the delta atomically, so readers see one or
+    the other. Returns False when *version* is not a delta.
+    """
     resolved_version = _normalise_version(version)
-    target = _snapshot_path(resolved_version)
-    target.parent.mkdir(parents=True, exist_ok=True)
+    format, path, delta = _find_snapshot(resolved_version)
+    if delta is None:
+        return False
+    entry = Catalog(SNAPSHOT_DIR).get(resolved_version)
+    with SnapshotWriter(SNAPSHOT_DIR, resolved_version, format=format) as writer:
+        # Keep the snapshot's place in the history for retention.
+        writer.created = entry.created if entry is not None else path.stat().st_mtime
+        writer.extend(iter_snapshot(resolved_version))
+    return True
+
 
-    with target.open("w", encoding="utf-8") as handle:
-        for record in records:
-            handle.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
-            handle.write("\n")
+def compact_snapshots(*, min_depth: int = 1) -> list[str]:
+    """Compact every delta at least *min_depth* deep, oldest first; return the compacted versions.
 
-    return resolved_version
+    Deltas locked by a writer are skipped and picked up by the next run.
+    """
+    if min_depth < 1:
+        raise ValueError("min_depth must be at least 1")
+    compacted = []
+    for entry in list_snapshots():
+        if entry.base is None:
+            continue
+        try:
+            info = _find_snapshot(entry.version)[2]
+            if info is None or info.depth < min_depth:
+                continue
+            if compact_snapshot(entry.version):
+                compacted.append(entry.version)
+        except (FileNotFoundError, SnapshotLockedError):
+            continue
+    return compacted
 
 
-def load_snapshot(version: str) -> Any:
-    """Load snapshot *version* from disk.
+class Compactor:
+    """Run :func:`compact_snapshots` every *interval* seconds on a daemon thread.
 
-    The loader prefers JSON Lines snapshots, but will fall back to JSON if present.
+    Compaction never blocks readers: they keep reading the delta until the
+    full snapshot replaces it.
     """
+
+    def __init__(self, *, interval: float = COMPACT_INTERVAL, min_depth: int = 1) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.min_depth = min_depth
+        self.compacted: list[str] = []
+        self.error: BaseException | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "Compactor":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("Compactor is already running.")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="snapshot-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Ask the thread to stop and wait for the compaction in progress, if any."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self) -> list[str]:
+        compacted = compact_snapshots(min_depth=self.min_depth)
+        self.compacted.extend(compacted)
+        return compacted
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                self.error = None
+            except Exception as exc:  # keep compacting on the next tick
+                self.error = exc
+            self._stop.wait(self.interval)
+
+
+def open_index(version: str, *, use_mmap: bool = True) -> SnapshotIndex:
+    """Open the sidecar index of snapshot *version* for repeated lookups."""
     resolved_version = _normalise_version(version)
+    return SnapshotIndex(_snapshot_path(resolved_version), _index_base(resolved_version), use_mmap=use_mmap)
 
-    jsonl_path = _snapshot_path(resolved_version, JSONL_SUFFIX)
-    if jsonl_path.exists():
-        with jsonl_path.open("r", encoding="utf-8") as handle:
-            return [json.loads(line) for line in handle if line.strip()]
 
-    json_path = _snapshot_path(resolved_version, JSON_SUFFIX)
-    if json_path.exists():
-        with json_path.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
+def get_record(version: str, key: Any, *, field: str = "id", use_mmap: bool = True) -> Any | None:
+    """Return the first record of *version* whose *field* equals *key*, or None.
+
+    Seeks straight to the record when the snapshot was saved with *field* in
+    ``index_keys``; otherwise falls back to a streaming scan.
+    """
+    try:
+        index = open_index(version, use_mmap=use_mmap)
+    except FileNotFoundError:
+        index = None
+    if index is not None:
+        with index:
+            if field in index.keys:
+                return index.get(key, key=field)
+
+    matches = iter_snapshot(version, where=lambda record: isinstance(record, dict) and record.get(field) == key, limit=1)
+    return next(matches, None)
+
+
+def read_range(version: str, start: int, stop: int, *, use_mmap: bool = True) -> list[Any]:
+    """Return records ``start <= line < stop`` of *version*, seeking when indexed."""
+    if start < 0 or stop < start:
+        raise ValueError("read_range needs 0 <= start <= stop")
+    try:
+        index = open_index(version, use_mmap=use_mmap)
+    except FileNotFoundError:
+        return list(iter_snapshot(version, skip=start, limit=stop - start))
+    with index:
+        return list(index.range(start, stop))
+
 
-    raise FileNotFoundError(f"Snapshot '{resolved_version}' not found.")
+def iter_snapshot(
+    version: str,
+    *,
+    fields: Sequence[str] | None = None,
+    where: Predicate | None = None,
+    skip: int = 0,
+    limit: int | None = None,
+) -> Iterator[Any]:
+    """Return a lazy iterator over the records of snapshot *version*.
+
+    *where* filters records before *skip* and *limit* apply; *fields* keeps
+    only those top-level keys of dict records. JSON Lines snapshots are read
+    line by line, so memory stays constant, and lines that are skipped
+    without a predicate are never decoded. Compressed snapshots seek to the
+    frame holding the first wanted record and columnar snapshots read only
+    the *fields* columns when there is no predicate. Delta snapshots replay
+    their chain back to the last full snapshot. JSON snapshots are loaded
+    whole and iterated when they hold a list.
+    """
+    if skip < 0:
+        raise ValueError("skip cannot be negative")
+    if limit is not None and limit < 0:
+        raise ValueError("limit cannot be negative")
+    resolved_version = _normalise_version(version)
+    format, path, delta = _find_snapshot(resolved_version)
+
+    records: Iterator[Any]
+    if format == "json":
+        records = _iter_json(path)
+    elif delta is not None:
+        records = apply_delta(iter_snapshot(delta.base), _iter_file(format, path))
+    else:
+        seek, skip = (skip, 0) if where is None else (0, skip)
+        if format == COLUMNAR and where is None:
+            records, fields = _iter_file(format, path, skip=seek, fields=fields), None
+        else:
+            records = _iter_file(format, path, skip=seek)
+
+    if where is not None:
+        records = filter(where, records)
+    records = islice(records, skip, None if limit is None else skip + limit)
+    if fields is not None:
+        records = (_project(record, fields) for record in records)
+    return records
+
+
+def _iter_file(format: str, path: Path, *, skip: int = 0, fields: Sequence[str] | None = None) -> Iterator[Any]:
+    if format == JSONL:
+        return _iter_jsonl(path, skip=skip)
+    if format == COLUMNAR:
+        return iter_columnar(path, fields=fields, skip=skip)
+    return iter_framed(path, format, skip=skip)
+
+
+def _iter_jsonl(path: Path, *, skip: int = 0) -> Iterator[Any]:
+    # Open now rather than on first use, so the iterator survives the
+    # snapshot being replaced or deleted before it is consumed.
+    return _read_jsonl(path.open("r", encoding="utf-8"), skip)
+
+
+def _read_jsonl(handle: TextIO, skip: int) -> Iterator[Any]:
+    with handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            if skip:
+                skip -= 1
+                continue
+            yield json.loads(line)
+
+
+def _iter_json(path: Path) -> Iterator[Any]:
+    with path.open("r", encoding="utf-8") as handle:
+        payload = json.load(handle)
+    return iter(payload if isinstance(payload, list) else [payload])
+
+
+def _project(record: Any, fields: Sequence[str]) -> Any:
+    if not isinstance(record, dict):
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+def load_snapshot(version: str) -> Any:
+    """Load snapshot *version* from disk, whatever format it was saved in.
+
+    Legacy JSON snapshots are used only when no other format exists. Use
+    :func:`iter_snapshot` to stream large snapshots instead.
+    """
+    resolved_version = _normalise_version(version)
+    format, path, _delta = _find_snapshot(resolved_version)
+    if format == "json":
+        with path.open("r", encoding="utf-8") as handle:
+            return json.load(handle)
+    return list(iter_snapshot(resolved_version))
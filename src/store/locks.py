@@ -0,0 +1,110 @@
+"""Lock files guarding snapshot versions and the catalog across processes."""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+# A lock file without owner details is only considered abandoned after this long.
+_UNREADABLE_LOCK_GRACE = 60.0
+_TAKEOVER_SUFFIX = ".takeover"
+
+
+def acquire_lock(path: Path) -> bool:
+    """Create the lock file at *path*, taking it over when its owner died; False if held."""
+
+    try:
+        return _create_lock(path)
+    except FileExistsError:
+        pass
+    if not _lock_is_stale(path):
+        return False
+    return _take_over(path)
+
+
+def _create_lock(path: Path) -> bool:
+    fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        json.dump({"pid": os.getpid(), "host": socket.gethostname(), "created": time.time()}, handle)
+    return True
+
+
+def _take_over(path: Path) -> bool:
+    """Replace the stale lock at *path* with ours, one taker at a time.
+
+    Takers serialize on a second lock file and repeat the stale check while
+    holding it, so a slow taker never removes the fresh lock a faster one
+    has just created.
+    """
+
+    guard = path.with_name(f"{path.name}{_TAKEOVER_SUFFIX}")
+    try:
+        os.close(os.open(guard, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+    except FileExistsError:
+        try:
+            # Left behind by a taker that died mid-takeover.
+            if time.time() - guard.stat().st_mtime > _UNREADABLE_LOCK_GRACE:
+                guard.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+        return False
+    try:
+        # Only takers remove other owners' locks, so a lock that is still
+        # present and stale here cannot be swapped before the unlink.
+        if path.exists():
+            if not _lock_is_stale(path):
+                return False
+            path.unlink(missing_ok=True)
+        try:
+            return _create_lock(path)
+        except FileExistsError:
+            return False
+    finally:
+        guard.unlink(missing_ok=True)
+
+
+def _lock_is_stale(path: Path) -> bool:
+    try:
+        owner = json.loads(path.read_text(encoding="utf-8"))
+        pid, host = int(owner["pid"]), owner["host"]
+    except FileNotFoundError:
+        return True
+    except (OSError, ValueError, KeyError, TypeError):
+        try:
+            return time.time() - path.stat().st_mtime > _UNREADABLE_LOCK_GRACE
+        except FileNotFoundError:
+            return True
+    return host == socket.gethostname() and not _pid_alive(pid)
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill(pid, 0) terminates the process on Windows; assume it is alive.
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def held_lock(path: Path, *, timeout: float = 10.0, poll: float = 0.005) -> Iterator[None]:
+    """Hold the lock at *path* for the ``with`` block, waiting up to *timeout* seconds."""
+
+    deadline = time.monotonic() + timeout
+    while not acquire_lock(path):
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Timed out waiting for lock {path}.")
+        time.sleep(poll)
+    try:
+        yield
+    finally:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,283 @@
+"""Atomic, lock-guarded snapshot writer with group commit."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Optional, Sequence
+
+from src.store.catalog import Catalog, SnapshotEntry
+from src.store.delta import DELTA_SUFFIX, DeltaInfo, delta_base, remove_delta_info
+from src.store.formats import (
+    COLUMNAR,
+    GROUP_SIZE,
+    JSONL,
+    SUFFIXES,
+    ColumnarWriter,
+    FramedWriter,
+    JsonlWriter,
+    remove_other_formats,
+    validate_format,
+)
+from src.store.index import IndexBuilder, remove_index
+from src.store.locks import acquire_lock
+
+LOCK_SUFFIX = ".lock"
+TEMP_SUFFIX = ".tmp"
+
+
+class SnapshotLockedError(FileExistsError):
+    """Raised when another live writer holds the lock of a snapshot version."""
+
+    def __init__(self, version: str) -> None:
+        super().__init__(f"Snapshot '{version}' is locked by another writer.")
+        self.version = version
+
+
+class SnapshotWriter:
+    """Append records to a new snapshot and publish it atomically on :meth:`commit`.
+
+    Records are buffered and written to a hidden temporary file in groups:
+    *group_size* records for JSON Lines, one frame or row group for the
+    compressed and columnar formats; :meth:`flush` forces a group out.
+    Committing fsyncs the file (unless *durable* is False), renames it into
+    place and only then publishes its sidecars, so readers never see a
+    torn snapshot, and records it in the directory's catalog with the
+    size and SHA-256 of its data file. A ``.lock`` file guards the version while it is being
+    written; without an explicit *version* the first free ``v<unix time>``
+    at or after the current second is reserved. Appends are thread-safe.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        version: Optional[str] = None,
+        *,
+        format: str = JSONL,
+        index_keys: Optional[Sequence[str]] = None,
+        delta: Optional[DeltaInfo] = None,
+        group_size: int = GROUP_SIZE,
+        durable: bool = True,
+    ) -> None:
+        validate_format(format)
+        if index_keys is not None and format != JSONL:
+            raise ValueError("index_keys needs the jsonl snapshot format.")
+        if group_size < 1:
+            raise ValueError("group_size must be at least 1")
+        index = IndexBuilder(index_keys) if index_keys is not None else None
+
+        directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self.format = format
+        self.records = 0
+        # Catalog timestamp of the snapshot; the commit time unless set.
+        self.created: Optional[float] = None
+        self._delta = delta
+        self._durable = durable
+        self._lock = threading.Lock()
+        self._closed = False
+        self.version, self._lock_path = _reserve(directory, version)
+        try:
+            fd, temp_name = tempfile.mkstemp(
+                dir=directory, prefix=f".{self.version}{SUFFIXES[format]}.", suffix=TEMP_SUFFIX
+            )
+            self._temp_path = Path(temp_name)
+            self._handle = os.fdopen(fd, "wb")
+        except BaseException:
+            self._lock_path.unlink()
+            raise
+        self._output = _HashingFile(self._handle)
+        if format == JSONL:
+            self._sink: Any = JsonlWriter(self._output, index=index, group_size=group_size)
+        elif format == COLUMNAR:
+            self._sink = ColumnarWriter(self._output)
+        else:
+            self._sink = FramedWriter(self._output, format)
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type: object, *exc_info: object) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def append(self, record: Any) -> None:
+        with self._lock:
+            self._check_open()
+            self._sink.write(record)
+            self.records += 1
+
+    def extend(self, records: Iterable[Any]) -> None:
+        with self._lock:
+            self._check_open()
+            write = self._sink.write
+            count = 0
+            try:
+                for record in records:
+                    write(record)
+                    count += 1
+            finally:
+                self.records += count
+
+    def flush(self) -> None:
+        """Write the pending group to the temporary file."""
+
+        with self._lock:
+            self._check_open()
+            self._sink.flush()
+            self._handle.flush()
+
+    def commit(self) -> str:
+        """Make the snapshot durable and visible under its version, then release the lock."""
+
+        with self._lock:
+            self._check_open()
+            self._closed = True
+            try:
+                sidecars = self._sink.finish()
+                self._handle.flush()
+                if self._durable:
+                    os.fsync(self._handle.fileno())
+                self._handle.close()
+                self._publish(sidecars)
+            except BaseException:
+                self._discard()
+                raise
+            try:
+                Catalog(self.directory).record(self._entry())
+            finally:
+                self._lock_path.unlink()
+        return self.version
+
+    def abort(self) -> None:
+        """Drop everything appended so far and release the lock."""
+
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._discard()
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise ValueError("Snapshot writer is closed.")
+
+    def _publish(self, sidecars: dict[str, bytes]) -> None:
+        base = self.directory / self.version
+        data_base = base if self._delta is None else delta_base(base)
+        # Drop sidecars describing a previous snapshot of this version before
+        # the data changes under them.
+        remove_index(base)
+        for suffix in sidecars:
+            Path(f"{data_base}{suffix}").unlink(missing_ok=True)
+        if self._delta is not None:
+            # Metadata first: a delta is only read once its data file exists.
+            self._write_file(Path(f"{base}{DELTA_SUFFIX}"), json.dumps(self._delta.as_dict()).encode("utf-8"))
+        os.replace(self._temp_path, Path(f"{data_base}{SUFFIXES[self.format]}"))
+        for suffix, content in sidecars.items():
+            self._write_file(Path(f"{data_base}{suffix}"), content)
+        # Readers prefer a full snapshot over a delta, so each side switches
+        # atomically with the rename above and the leftovers can go.
+        remove_other_formats(data_base, keep=self.format)
+        if self._delta is None:
+            remove_other_formats(delta_base(base))
+            remove_delta_info(base)
+        else:
+            remove_other_formats(base)
+        if self._durable:
+            _fsync_directory(self.directory)
+
+    def _entry(self) -> SnapshotEntry:
+        return SnapshotEntry(
+            version=self.version,
+            format=self.format,
+            records=self.records if self._delta is None else self._delta.records,
+            bytes=self._output.size,
+            checksum=f"sha256:{self._output.digest.hexdigest()}",
+            created=self.created if self.created is not None else time.time(),
+            base=self._delta.base if self._delta is not None else None,
+        )
+
+    def _write_file(self, path: Path, content: bytes) -> None:
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=TEMP_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(content)
+                handle.flush()
+                if self._durable:
+                    os.fsync(handle.fileno())
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+    def _discard(self) -> None:
+        self._handle.close()
+        self._temp_path.unlink(missing_ok=True)
+        self._lock_path.unlink(missing_ok=True)
+
+
+class _HashingFile:
+    """Binary file wrapper that hashes and counts everything written through it."""
+
+    def __init__(self, handle: BinaryIO) -> None:
+        self._handle = handle
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        self.size += len(data)
+        return self._handle.write(data)
+
+    def flush(self) -> None:
+        self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+def _reserve(directory: Path, version: Optional[str]) -> tuple[str, Path]:
+    """Lock *version*, or the first free ``v<unix time>`` when it is None."""
+
+    if version is not None:
+        lock_path = directory / f"{version}{LOCK_SUFFIX}"
+        if not acquire_lock(lock_path):
+            raise SnapshotLockedError(version)
+        return version, lock_path
+
+    stamp = int(time.time())
+    while True:
+        candidate = f"v{stamp}"
+        lock_path = directory / f"{candidate}{LOCK_SUFFIX}"
+        if acquire_lock(lock_path):
+            if not any(path != lock_path for path in directory.glob(f"{candidate}.*")):
+                return candidate, lock_path
+            lock_path.unlink()
+        stamp += 1
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist renames in *directory*; not supported (nor needed) on Windows."""
+
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
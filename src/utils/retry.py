@@ -1,14 +1,217 @@
 from __future__ import annotations
 
+import asyncio
 import functools
+import inspect
+import random
+import threading
 import time
-from typing import Callable, Iterable, Optional, Tuple, Type, TypeVar, Union, cast
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple, Type, TypeVar, Union, cast
 
 T = TypeVar("T")
 ExceptionTypes = Union[Type[BaseException], Iterable[Type[BaseException]]]
 RetryCallback = Optional[Callable[[int, BaseException, float], None]]
+KeyFunction = Callable[..., Hashable]
 
-__all__ = ["retry"]
+__all__ = [
+    "retry",
+    "async_retry",
+    "FULL_JITTER",
+    "DECORRELATED_JITTER",
+    "RetryBudget",
+    "CircuitBreaker",
+    "CircuitBreakers",
+    "CircuitOpenError",
+    "CLOSED",
+    "OPEN",
+    "HALF_OPEN",
+]
+
+FULL_JITTER = "full"
+DECORRELATED_JITTER = "decorrelated"
+_JITTER_MODES = (None, FULL_JITTER, DECORRELATED_JITTER)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling through while a circuit breaker is open."""
+
+    def __init__(self, key: Hashable, retry_at: float) -> None:
+        super().__init__(f"Circuit for {key!r} is open")
+        self.key = key
+        self.retry_at = retry_at
+
+
+class RetryBudget:
+    """Cap retries at a share of the requests seen in a sliding window.
+
+    A retry is allowed while ``retries < min_retries + ratio * requests`` over
+    the last *window* seconds, so a failing dependency costs at most *ratio*
+    extra load instead of ``max_attempts`` times the original load.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        *,
+        min_retries: int = 10,
+        window: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 0 <= ratio <= 1:
+            raise ValueError("ratio must be between 0 and 1")
+        if min_retries < 0:
+            raise ValueError("min_retries cannot be negative")
+        if window <= 0:
+            raise ValueError("window must be greater than 0")
+        self._ratio = ratio
+        self._min_retries = min_retries
+        self._window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._requests: Dict[int, int] = {}
+        self._retries: Dict[int, int] = {}
+
+    def _bucket(self) -> int:
+        now = int(self._clock())
+        horizon = now - int(self._window)
+        for counts in (self._requests, self._retries):
+            for stale in [second for second in counts if second <= horizon]:
+                del counts[stale]
+        return now
+
+    def record_request(self) -> None:
+        with self._lock:
+            bucket = self._bucket()
+            self._requests[bucket] = self._requests.get(bucket, 0) + 1
+
+    def try_acquire(self) -> bool:
+        """Consume a retry from the budget; return False when it is exhausted."""
+
+        with self._lock:
+            bucket = self._bucket()
+            allowed = self._min_retries + self._ratio * sum(self._requests.values())
+            if sum(self._retries.values()) >= allowed:
+                return False
+            self._retries[bucket] = self._retries.get(bucket, 0) + 1
+            return True
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            self._bucket()
+            return {"requests": sum(self._requests.values()), "retries": sum(self._retries.values())}
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker.
+
+    The breaker opens after *failure_threshold* consecutive failures, rejects
+    calls for *recovery_timeout* seconds, then lets up to *half_open_calls*
+    trial calls through; a trial success closes it, a trial failure re-opens.
+    """
+
+    def __init__(
+        self,
+        key: Hashable = None,
+        *,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if recovery_timeout <= 0:
+            raise ValueError("recovery_timeout must be greater than 0")
+        if half_open_calls < 1:
+            raise ValueError("half_open_calls must be at least 1")
+        self.key = key
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._half_open_calls = half_open_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self._recovery_timeout:
+            self._state = HALF_OPEN
+            self._trials = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """Raise :class:`CircuitOpenError` unless a call may go through now."""
+
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._trials < self._half_open_calls:
+                self._trials += 1
+                return
+            raise CircuitOpenError(self.key, self._opened_at + self._recovery_timeout)
+
+    def release(self) -> None:
+        """Give back the trial slot of a call that ended without success or failure."""
+
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trials = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            self._failures += 1
+            if state == HALF_OPEN or self._failures >= self._failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._trials = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self._current_state(), "failures": self._failures}
+
+
+class CircuitBreakers:
+    """Lazily created circuit breakers keyed by e.g. host name."""
+
+    def __init__(self, **breaker_options: Any) -> None:
+        CircuitBreaker(**breaker_options)  # validate options eagerly
+        self._options = breaker_options
+        self._lock = threading.Lock()
+        self._breakers: Dict[Hashable, CircuitBreaker] = {}
+
+    def get(self, key: Hashable) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(key, **self._options)
+                self._breakers[key] = breaker
+            return breaker
+
+    def states(self) -> Dict[Hashable, str]:
+        """Return the current state of every known breaker."""
+
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {key: breaker.state for key, breaker in breakers}
 
 
 def _normalize_exceptions(exceptions: ExceptionTypes) -> Tuple[Type[BaseException], ...]:
@@ -53,6 +256,34 @@ def _validate_parameters(
         raise ValueError("max_delay must be greater than 0 when provided")
 
 
+def _validate_jitter(jitter: Optional[str]) -> None:
+    if jitter not in _JITTER_MODES:
+        raise ValueError(f"jitter must be one of {', '.join(repr(mode) for mode in _JITTER_MODES)}")
+
+
+def _jittered_delay(
+    delay: float,
+    previous: float,
+    *,
+    jitter: Optional[str],
+    initial_delay: float,
+    max_delay: Optional[float],
+    rng: Any,
+) -> float:
+    """Return the sleep before the next attempt.
+
+    Full jitter draws uniformly from ``[0, delay]``; decorrelated jitter draws
+    from ``[initial_delay, 3 * previous]`` and ignores the exponential delay.
+    """
+
+    if jitter == FULL_JITTER:
+        return rng.uniform(0.0, delay)
+    if jitter == DECORRELATED_JITTER:
+        sleep_for = rng.uniform(initial_delay, max(initial_delay, previous * 3))
+        return min(sleep_for, max_delay) if max_delay is not None else sleep_for
+    return delay
+
+
 def _next_delay(current_delay: float, backoff_factor: float, max_delay: Optional[float]) -> float:
     next_delay = current_delay * backoff_factor if current_delay > 0 else 0.0
     if max_delay is not None:
@@ -69,23 +300,52 @@ def retry(
     backoff_factor: float = 2.0,
     max_delay: Optional[float] = None,
     on_retry: RetryCallback = None,
+    budget: Optional[RetryBudget] = None,
+    breakers: Optional[CircuitBreakers] = None,
+    breaker_key: Optional[KeyFunction] = None,
+    jitter: Optional[str] = None,
+    rng: Optional[random.Random] = None,
 ) -> Callable[[Callable[..., T]], Callable[..., T]]:
-    """Retry a callable with exponential backoff for whitelisted exceptions."""
+    """Retry a callable with exponential backoff for whitelisted exceptions.
+
+    A shared *budget* stops retrying once retries exceed its share of calls.
+    With *breakers*, every attempt goes through the breaker for
+    ``breaker_key(*args, **kwargs)``: whitelisted exceptions count as
+    failures and an open breaker raises :class:`CircuitOpenError` at once.
+    *jitter* (``"full"`` or ``"decorrelated"``) randomises the backoff so
+    concurrent callers do not retry in lockstep.
+    """
 
     exc_types = _normalize_exceptions(exceptions)
     _validate_parameters(max_attempts, timeout, initial_delay, backoff_factor, max_delay)
+    _validate_jitter(jitter)
+    if breakers is not None and breaker_key is None:
+        raise ValueError("breaker_key is required when breakers are provided")
+    random_source = rng if rng is not None else random
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> T:
             attempts = 1
             delay = initial_delay
+            previous = initial_delay
             start_time = time.monotonic()
+            breaker = breakers.get(breaker_key(*args, **kwargs)) if breakers is not None else None  # type: ignore[misc]
+            if budget is not None:
+                budget.record_request()
 
             while True:
+                if breaker is not None:
+                    breaker.before_call()
                 try:
-                    return func(*args, **kwargs)
+                    result = func(*args, **kwargs)
                 except exc_types as exc:  # type: ignore[misc]
+                    if isinstance(exc, CircuitOpenError):
+                        if breaker is not None:
+                            breaker.release()
+                        raise
+                    if breaker is not None:
+                        breaker.record_failure()
                     if attempts >= max_attempts:
                         raise
 
@@ -94,7 +354,14 @@ def retry(
                     if timeout is not None and elapsed >= timeout:
                         raise
 
-                    sleep_for = delay
+                    sleep_for = _jittered_delay(
+                        delay,
+                        previous,
+                        jitter=jitter,
+                        initial_delay=initial_delay,
+                        max_delay=max_delay,
+                        rng=random_source,
+                    )
                     if timeout is not None:
                         remaining = timeout - elapsed
                         if remaining <= 0:
@@ -103,6 +370,9 @@ def retry(
 
                     sleep_for = max(0.0, round(sleep_for, 6))
 
+                    if budget is not None and not budget.try_acquire():
+                        raise
+
                     if on_retry is not None:
                         on_retry(attempts, exc, sleep_for)
 
@@ -110,8 +380,129 @@ def retry(
                         time.sleep(sleep_for)
 
                     attempts += 1
+                    previous = max(sleep_for, initial_delay)
                     delay = _next_delay(delay, backoff_factor, max_delay)
+                except BaseException:
+                    # Neither a success nor a counted failure (a 404, a bug,
+                    # cancellation): hand a half-open trial slot back.
+                    if breaker is not None:
+                        breaker.release()
+                    raise
+                else:
+                    if breaker is not None:
+                        breaker.record_success()
+                    return result
 
         return wrapper
 
     return decorator
+
+
+def async_retry(
+    exceptions: ExceptionTypes,
+    *,
+    max_attempts: int = 3,
+    timeout: Optional[float] = None,
+    initial_delay: float = 0.1,
+    backoff_factor: float = 2.0,
+    max_delay: Optional[float] = None,
+    on_retry: Optional[Callable[[int, BaseException, float], Union[None, Awaitable[None]]]] = None,
+    budget: Optional[RetryBudget] = None,
+    breakers: Optional[CircuitBreakers] = None,
+    breaker_key: Optional[KeyFunction] = None,
+    jitter: Optional[str] = None,
+    rng: Optional[random.Random] = None,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Retry a coroutine function, backing off with ``asyncio.sleep``.
+
+    Takes the same options as :func:`retry`. Here *timeout* budgets the
+    attempts as well as the sleeps: an attempt still running when the budget
+    is spent is cancelled and :class:`TimeoutError` raised. *on_retry* may be
+    a coroutine function.
+    """
+
+    exc_types = _normalize_exceptions(exceptions)
+    _validate_parameters(max_attempts, timeout, initial_delay, backoff_factor, max_delay)
+    _validate_jitter(jitter)
+    if breakers is not None and breaker_key is None:
+        raise ValueError("breaker_key is required when breakers are provided")
+    random_source = rng if rng is not None else random
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        if not inspect.iscoroutinefunction(func):
+            raise TypeError("async_retry can only decorate coroutine functions")
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            attempts = 1
+            delay = initial_delay
+            previous = initial_delay
+            start_time = time.monotonic()
+            breaker = breakers.get(breaker_key(*args, **kwargs)) if breakers is not None else None  # type: ignore[misc]
+            if budget is not None:
+                budget.record_request()
+
+            while True:
+                if breaker is not None:
+                    breaker.before_call()
+                try:
+                    if timeout is None:
+                        result = await func(*args, **kwargs)
+                    else:
+                        remaining = timeout - (time.monotonic() - start_time)
+                        result = await asyncio.wait_for(func(*args, **kwargs), max(remaining, 0.0))
+                except exc_types as exc:  # type: ignore[misc]
+                    if isinstance(exc, CircuitOpenError):
+                        if breaker is not None:
+                            breaker.release()
+                        raise
+                    if breaker is not None:
+                        breaker.record_failure()
+                    if attempts >= max_attempts:
+                        raise
+
+                    sleep_for = _jittered_delay(
+                        delay,
+                        previous,
+                        jitter=jitter,
+                        initial_delay=initial_delay,
+                        max_delay=max_delay,
+                        rng=random_source,
+                    )
+                    if timeout is not None:
+                        remaining = timeout - (time.monotonic() - start_time)
+                        if remaining <= 0:
+                            raise
+                        sleep_for = min(sleep_for, remaining)
+
+                    sleep_for = max(0.0, round(sleep_for, 6))
+
+                    if budget is not None and not budget.try_acquire():
+                        raise
+
+                    if on_retry is not None:
+                        outcome = on_retry(attempts, exc, sleep_for)
+                        if inspect.isawaitable(outcome):
+                            await outcome
+
+                    if sleep_for > 0:
+                        await asyncio.sleep(sleep_for)
+
+                    attempts += 1
+                    previous = max(sleep_for, initial_delay)
+                    delay = _next_delay(delay, backoff_factor, max_delay)
+                except BaseException:
+                    # Neither a success nor a counted failure (a 404, a bug,
+                    # cancellation): hand a half-open trial slot back.
+                    if breaker is not None:
+                        breaker.release()
+                    raise
+                else:
+                    if breaker is not None:
+                        breaker.record_success()
+                    return result
+
+        return wrapper
+
+    return decorator
+
@@ -5,7 +5,7 @@ from __future__ import annotations
 from collections.abc import Mapping, Sequence
 from typing import Any
 
-from .schema import ValidationIssue
+from .schema import IssueSink, ValidationIssue
 
 _PLACEHOLDER_TOKENS = {"tbd", "todo", "lorem ipsum"}
 
@@ -16,9 +16,11 @@ def _normalise_text(value: str | None) -> str:
     return value.strip()
 
 
-def validate_content(data: Any) -> tuple[list[ValidationIssue], dict[str, int]]:
+def validate_content(
+    data: Any, *, start: int = 0, sink: IssueSink | None = None
+) -> tuple[list[ValidationIssue], dict[str, int]]:
     """Perform content-focused validation on the payload."""
-    issues: list[ValidationIssue] = []
+    issues: Any = sink if sink is not None else []
 
     if not isinstance(data, Mapping):
         return issues, {"content_checked": 0}
@@ -28,7 +30,7 @@ def validate_content(data: Any) -> tuple[list[ValidationIssue], dict[str, int]]:
         return issues, {"content_checked": 0}
 
     checked = 0
-    for index, record in enumerate(records):
+    for index, record in enumerate(records, start):
         if not isinstance(record, Mapping):
             continue
         checked += 1
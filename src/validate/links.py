@@ -5,16 +5,18 @@ from __future__ import annotations
 from collections.abc import Callable, Mapping, Sequence
 from typing import Any
 
-from .schema import ValidationIssue
+from .schema import IssueSink, ValidationIssue
 
 
 def validate_links(
     data: Any,
     *,
     link_checker: Callable[[str], bool] | None = None,
+    start: int = 0,
+    sink: IssueSink | None = None,
 ) -> tuple[list[ValidationIssue], dict[str, int]]:
     """Validate link collections without performing network requests."""
-    issues: list[ValidationIssue] = []
+    issues: Any = sink if sink is not None else []
 
     if not isinstance(data, Mapping):
         return issues, {"links_checked": 0}
@@ -24,7 +26,7 @@ def validate_links(
         return issues, {"links_checked": 0}
 
     links_checked = 0
-    for index, record in enumerate(records):
+    for index, record in enumerate(records, start):
         if not isinstance(record, Mapping):
             continue
 
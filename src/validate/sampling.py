@@ -0,0 +1,218 @@
+"""Statistical sampling validation for very large payloads."""
+
+from __future__ import annotations
+
+import math
+import random
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from itertools import islice
+from statistics import NormalDist
+from typing import Any, Callable, Iterator
+
+from .schema import _run_validators
+
+IssueKey = tuple[str, str | None]
+
+
+@dataclass(slots=True)
+class RateEstimate:
+    """Estimated share of records affected by one validator/field pair."""
+
+    validator: str
+    field: str | None
+    affected: int
+    sampled: int
+    rate: float
+    lower: float
+    upper: float
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a serialisable representation of the estimate."""
+        return {
+            "validator": self.validator,
+            "field": self.field,
+            "affected": self.affected,
+            "sampled": self.sampled,
+            "rate": self.rate,
+            "lower": self.lower,
+            "upper": self.upper,
+        }
+
+
+@dataclass(slots=True)
+class SampleReport:
+    """Issue rate estimates derived from a reproducible record sample."""
+
+    population: int
+    sampled: int
+    seed: int
+    confidence: float
+    overall: RateEstimate
+    estimates: list[RateEstimate]
+
+    @property
+    def exhaustive(self) -> bool:
+        return self.sampled >= self.population
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a serialisable representation of the report."""
+        return {
+            "population": self.population,
+            "sampled": self.sampled,
+            "seed": self.seed,
+            "confidence": self.confidence,
+            "overall": self.overall.as_dict(),
+            "estimates": [estimate.as_dict() for estimate in self.estimates],
+        }
+
+
+def _wilson_interval(
+    affected: int, sampled: int, population: int, z: float
+) -> tuple[float, float, float]:
+    if sampled == 0:
+        return 0.0, 0.0, 1.0
+    rate = affected / sampled
+    if sampled >= population:
+        return rate, rate, rate
+    # Finite population correction: sampling without replacement behaves like
+    # a larger sample drawn with replacement.
+    effective = sampled * (population - 1) / (population - sampled)
+    z2 = z * z
+    denominator = 1 + z2 / effective
+    centre = (rate + z2 / (2 * effective)) / denominator
+    half_width = (
+        z * math.sqrt(rate * (1 - rate) / effective + z2 / (4 * effective * effective))
+    ) / denominator
+    lower = min(rate, max(0.0, centre - half_width))
+    upper = max(rate, min(1.0, centre + half_width))
+    return rate, lower, upper
+
+
+def _estimate(
+    validator: str,
+    field: str | None,
+    affected: int,
+    sampled: int,
+    population: int,
+    z: float,
+) -> RateEstimate:
+    rate, lower, upper = _wilson_interval(affected, sampled, population, z)
+    return RateEstimate(
+        validator=validator,
+        field=field,
+        affected=affected,
+        sampled=sampled,
+        rate=rate,
+        lower=lower,
+        upper=upper,
+    )
+
+
+def _sample_indices(population: int, seed: int) -> Iterator[int]:
+    """Yield record indices in a reproducible random order without repeats.
+
+    Indices are drawn lazily by rejection while the sample is sparse, so the
+    first few thousand positions of a multi-million record payload cost only a
+    few thousand draws; the remainder is shuffled once the sample gets dense.
+    """
+    rng = random.Random(seed)
+    seen: set[int] = set()
+    while len(seen) * 2 < population:
+        index = rng.randrange(population)
+        if index not in seen:
+            seen.add(index)
+            yield index
+    remaining = [index for index in range(population) if index not in seen]
+    rng.shuffle(remaining)
+    yield from remaining
+
+
+def validate_sample(
+    data: Any,
+    *,
+    sample_size: int | None = None,
+    margin: float | None = None,
+    confidence: float = 0.95,
+    seed: int = 0,
+    batch_size: int = 1_000,
+    max_sample_size: int | None = None,
+    link_checker: Callable[[str], bool] | None = None,
+) -> SampleReport:
+    """Estimate per-validator issue rates from a random sample of records.
+
+    Either validate a fixed *sample_size*, or keep drawing batches until every
+    confidence interval half-width is at most *margin* (bounded by
+    *max_sample_size*). The sample is drawn without replacement from a
+    generator seeded with *seed*, so repeated runs inspect the same records.
+    Rates count records with at least one issue for a validator/field pair.
+    """
+    if (sample_size is None) == (margin is None):
+        raise ValueError("Provide exactly one of sample_size or margin.")
+    if sample_size is not None and sample_size < 1:
+        raise ValueError("sample_size must be at least 1")
+    if margin is not None and not 0 < margin < 1:
+        raise ValueError("margin must be between 0 and 1")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    records = data.get("records") if isinstance(data, Mapping) else None
+    if not isinstance(records, Sequence) or isinstance(records, (str, bytes)):
+        raise ValueError("Sampling requires a mapping with a 'records' sequence.")
+    if not records:
+        raise ValueError("Sampling requires at least one record.")
+
+    population = len(records)
+    limit = sample_size if sample_size is not None else max_sample_size
+    draw = population if limit is None else min(population, limit)
+    source = _sample_indices(population, seed)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    affected: dict[IssueKey, int] = {}
+    any_affected = 0
+    sampled = 0
+
+    def current() -> tuple[RateEstimate, list[RateEstimate]]:
+        overall = _estimate("all", None, any_affected, sampled, population, z)
+        estimates = [
+            _estimate(validator, field, count, sampled, population, z)
+            for (validator, field), count in sorted(
+                affected.items(), key=lambda item: (item[0][0], item[0][1] or "")
+            )
+        ]
+        return overall, estimates
+
+    step = draw if margin is None else batch_size
+    while sampled < draw:
+        for index in islice(source, min(step, draw - sampled)):
+            keys: set[IssueKey] = set()
+            for issues, _ in _run_validators(
+                {"records": [records[index]]}, link_checker=link_checker, start=index
+            ):
+                keys.update((issue.validator, issue.field) for issue in issues)
+            for key in keys:
+                affected[key] = affected.get(key, 0) + 1
+            if keys:
+                any_affected += 1
+            sampled += 1
+
+        if margin is not None:
+            overall, estimates = current()
+            widest = max(
+                (estimate.upper - estimate.lower) / 2
+                for estimate in (overall, *estimates)
+            )
+            if widest <= margin:
+                break
+
+    overall, estimates = current()
+    return SampleReport(
+        population=population,
+        sampled=sampled,
+        seed=seed,
+        confidence=confidence,
+        overall=overall,
+        estimates=estimates,
+    )
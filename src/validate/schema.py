@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Callable
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field as dataclass_field
+from functools import lru_cache
+from itertools import repeat
+from typing import Any, Callable, Protocol
 from collections.abc import Mapping, Sequence
 
+_TEMPLATE_PATTERN = re.compile(r"'[^']*'|#\d+")
+
 
 @dataclass(slots=True)
 class ValidationIssue:
@@ -26,6 +33,87 @@ class ValidationIssue:
         }
 
 
+class IssueSink(Protocol):
+    """Destination for issues emitted by the validators."""
+
+    def append(self, issue: ValidationIssue) -> None:
+        ...
+
+
+@lru_cache(maxsize=4096)
+def _message_template(message: str) -> str:
+    """Collapse quoted values and record numbers so similar messages group."""
+    return sys.intern(
+        _TEMPLATE_PATTERN.sub(
+            lambda match: "#{}" if match.group(0).startswith("#") else "'{}'", message
+        )
+    )
+
+
+@dataclass(slots=True)
+class IssueGroup:
+    """Issues sharing a validator, field and message template."""
+
+    validator: str
+    field: str | None
+    template: str
+    count: int = 0
+    examples: list[str | int | None] = dataclass_field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a serialisable representation of the group."""
+        return {
+            "validator": self.validator,
+            "field": self.field,
+            "template": self.template,
+            "count": self.count,
+            "examples": list(self.examples),
+        }
+
+
+class IssueAggregator:
+    """Issue sink that keeps per-group counts and the first few item IDs.
+
+    Issues are folded into their group as soon as they are appended, so a
+    systemic problem affecting every record costs one group rather than one
+    retained object per record.
+    """
+
+    __slots__ = ("_groups", "_max_examples", "total")
+
+    def __init__(self, *, max_examples: int = 5) -> None:
+        if max_examples < 0:
+            raise ValueError("max_examples cannot be negative")
+        self._groups: dict[tuple[str, str | None, str], IssueGroup] = {}
+        self._max_examples = max_examples
+        self.total = 0
+
+    def append(self, issue: ValidationIssue) -> None:
+        template = _message_template(issue.message)
+        key = (issue.validator, issue.field, template)
+        group = self._groups.get(key)
+        if group is None:
+            group = IssueGroup(
+                validator=sys.intern(issue.validator),
+                field=sys.intern(issue.field) if issue.field is not None else None,
+                template=template,
+            )
+            self._groups[key] = group
+        group.count += 1
+        self.total += 1
+        if len(group.examples) < self._max_examples:
+            item = issue.item
+            group.examples.append(sys.intern(item) if isinstance(item, str) else item)
+
+    def extend(self, issues: Sequence[ValidationIssue]) -> None:
+        for issue in issues:
+            self.append(issue)
+
+    def groups(self) -> list[IssueGroup]:
+        """Return the groups in first-seen order."""
+        return list(self._groups.values())
+
+
 @dataclass(slots=True)
 class Report:
     """Summary of validation results."""
@@ -33,19 +121,43 @@ class Report:
     ok: bool
     issues: list[ValidationIssue]
     counts: dict[str, int]
+    groups: list[IssueGroup] | None = None
 
     def as_dict(self) -> dict[str, Any]:
         """Return a serialisable representation of the report."""
-        return {
+        payload: dict[str, Any] = {
             "ok": self.ok,
             "issues": [issue.as_dict() for issue in self.issues],
             "counts": dict(self.counts),
         }
+        if self.groups is not None:
+            payload["groups"] = [group.as_dict() for group in self.groups]
+        return payload
+
+    def as_compact_dict(self, *, max_examples: int = 5) -> dict[str, Any]:
+        """Return counts plus grouped issues instead of one entry per issue."""
+        groups = self.groups
+        if groups is None:
+            aggregator = IssueAggregator(max_examples=max_examples)
+            aggregator.extend(self.issues)
+            groups = aggregator.groups()
+        return {
+            "ok": self.ok,
+            "counts": dict(self.counts),
+            "groups": [group.as_dict() for group in groups],
+        }
 
 
-def validate_schema(data: Any) -> tuple[list[ValidationIssue], dict[str, int]]:
-    """Validate the structural schema of the provided data payload."""
-    issues: list[ValidationIssue] = []
+def validate_schema(
+    data: Any, *, start: int = 0, sink: IssueSink | None = None
+) -> tuple[list[ValidationIssue], dict[str, int]]:
+    """Validate the structural schema of the provided data payload.
+
+    *start* offsets record indices so that shards of a larger payload report
+    the same positions as a full pass. Issues are appended to *sink* (and the
+    sink is returned in place of the issue list) when one is provided.
+    """
+    issues: Any = sink if sink is not None else []
     if not isinstance(data, Mapping):
         issues.append(
             ValidationIssue(
@@ -81,7 +193,7 @@ def validate_schema(data: Any) -> tuple[list[ValidationIssue], dict[str, int]]:
         return issues, {"records": 0}
 
     record_count = len(records)
-    for index, record in enumerate(records):
+    for index, record in enumerate(records, start):
         identifier: str | int | None = index
         if isinstance(record, Mapping) and "id" in record:
             raw_id = record.get("id")
@@ -181,39 +293,123 @@ def _merge_counts(target: dict[str, int], incoming: Mapping[str, int]) -> None:
             target[key] = target.get(key, 0) + value
 
 
-def validate_all(
+def _run_validators(
     data: Any,
     *,
-    link_checker: Callable[[str], bool] | None = None,
-) -> Report:
-    """Run all validators and return a consolidated report."""
+    link_checker: Callable[[str], bool] | None,
+    start: int = 0,
+    sink: IssueSink | None = None,
+) -> list[tuple[list[ValidationIssue], dict[str, int]]]:
     from .content import validate_content
     from .links import validate_links
 
+    return [
+        validate_schema(data, start=start, sink=sink),
+        validate_content(data, start=start, sink=sink),
+        validate_links(data, link_checker=link_checker, start=start, sink=sink),
+    ]
+
+
+def _build_report(
+    results: Sequence[tuple[list[ValidationIssue], dict[str, int]]],
+    *,
+    aggregator: IssueAggregator | None = None,
+) -> Report:
     issues: list[ValidationIssue] = []
     counts: dict[str, int] = {}
     validators_run = 0
 
-    schema_issues, schema_counts = validate_schema(data)
-    issues.extend(schema_issues)
-    _merge_counts(counts, schema_counts)
-    validators_run += 1
+    for validator_issues, validator_counts in results:
+        if aggregator is None:
+            issues.extend(validator_issues)
+        _merge_counts(counts, validator_counts)
+        validators_run += 1
 
-    content_issues, content_counts = validate_content(data)
-    issues.extend(content_issues)
-    _merge_counts(counts, content_counts)
-    validators_run += 1
+    total = len(issues) if aggregator is None else aggregator.total
+    counts["issues"] = total
+    counts["validators"] = validators_run
 
-    link_issues, link_counts = validate_links(data, link_checker=link_checker)
-    issues.extend(link_issues)
-    _merge_counts(counts, link_counts)
-    validators_run += 1
+    counts.setdefault("records", 0)
+    counts.setdefault("content_checked", 0)
+    counts.setdefault("links_checked", 0)
+
+    groups = aggregator.groups() if aggregator is not None else None
+    return Report(ok=not total, issues=issues, counts=counts, groups=groups)
+
+
+def validate_all(
+    data: Any,
+    *,
+    link_checker: Callable[[str], bool] | None = None,
+    aggregate: bool = False,
+    max_examples: int = 5,
+) -> Report:
+    """Run all validators and return a consolidated report.
+
+    With *aggregate* enabled the report carries :class:`IssueGroup` entries
+    (count plus the first *max_examples* item IDs) instead of one
+    :class:`ValidationIssue` per finding.
+    """
+    if not aggregate:
+        return _build_report(_run_validators(data, link_checker=link_checker))
+
+    aggregator = IssueAggregator(max_examples=max_examples)
+    results = _run_validators(data, link_checker=link_checker, sink=aggregator)
+    return _build_report(results, aggregator=aggregator)
 
-    counts["issues"] = len(issues)
-    counts["validators"] = validators_run
 
-    counts.setdefault("records", schema_counts.get("records", 0))
-    counts.setdefault("content_checked", content_counts.get("content_checked", 0))
-    counts.setdefault("links_checked", link_counts.get("links_checked", 0))
+def _validate_shard(
+    records: list[Any],
+    start: int,
+    link_checker: Callable[[str], bool] | None,
+) -> list[tuple[list[ValidationIssue], dict[str, int]]]:
+    return _run_validators({"records": records}, link_checker=link_checker, start=start)
+
+
+def validate_all_sharded(
+    data: Any,
+    *,
+    link_checker: Callable[[str], bool] | None = None,
+    shard_size: int = 10_000,
+    max_workers: int | None = None,
+) -> Report:
+    """Run all validators over record shards in a process pool.
+
+    Each shard is validated independently and the partial results are merged
+    per validator before consolidation, so the report is identical to the one
+    produced by :func:`validate_all`. *link_checker* must be picklable.
+    Payloads that fit in a single shard, or that fail the top-level schema
+    checks, are validated serially.
+    """
+    if shard_size < 1:
+        raise ValueError("shard_size must be at least 1")
+
+    records = data.get("records") if isinstance(data, Mapping) else None
+    if (
+        not isinstance(records, Sequence)
+        or isinstance(records, (str, bytes))
+        or len(records) <= shard_size
+    ):
+        return validate_all(data, link_checker=link_checker)
+
+    records = list(records)
+    starts = range(0, len(records), shard_size)
+    shards = [records[offset : offset + shard_size] for offset in starts]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        partials = list(
+            executor.map(_validate_shard, shards, starts, repeat(link_checker))
+        )
 
-    return Report(ok=not issues, issues=issues, counts=counts)
\ No newline at end of file
+    merged: list[tuple[list[ValidationIssue], dict[str, int]]] = []
+    for position in range(len(partials[0])):
+        issues: list[ValidationIssue] = []
+        counts: dict[str, int] = {}
+        for partial in partials:
+            shard_issues, shard_counts = partial[position]
+            issues.extend(shard_issues)
+            for key, value in shard_counts.items():
+                counts[key] = counts.get(key, 0) + value
+        merged.append((issues, counts))
+
+    return _build_report(merged)
@@ -3,8 +3,15 @@ from __future__ import annotations
 import json
 import subprocess
 import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
+import pytest
+
+from src.pipeline.cli import PipelineRunner
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 CLI_PATH = PROJECT_ROOT / "src" / "pipeline" / "cli.py"
 
@@ -44,3 +51,102 @@ def test_pipeline_rejects_invalid_stage_order():
 
     assert result.returncode != 0
     assert "--from stage must not come after --to stage" in result.stderr
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    paths: list[str] = []
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        self.paths.append(self.path)
+        fixture = PROJECT_ROOT / "tests" / "fixtures" / self.path.lstrip("/")
+        if fixture.suffix != ".html" or not fixture.is_file():
+            body, status = b"missing", 404
+        else:
+            body, status = fixture.read_bytes(), 200
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        return
+
+
+@pytest.fixture
+def fixture_server():
+    _FixtureHandler.paths = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_pipeline_run_fetches_and_parses_url_list(fixture_server, tmp_path):
+    urls = [f"{fixture_server}/sample1.html", f"{fixture_server}/sample2.html", f"{fixture_server}/gone.html"]
+    url_file = tmp_path / "seed_urls.txt"
+    url_file.write_text("# seeds\n" + "\n".join(urls) + "\n\n", encoding="utf-8")
+
+    result = _run_cli(["run", "--urls", str(url_file), "--concurrency", "3"])
+
+    assert result.returncode == 0, result.stderr
+    records = {record["source"]: record for record in map(json.loads, result.stdout.splitlines())}
+    assert set(records) == set(urls)
+    sample = records[urls[0]]
+    assert sample["parse"]["company"] == "Acme Corp"
+    assert sample["fetch"]["status"] == 200
+    assert sample["fetch"]["elapsed_ms"] >= 0
+    assert "compose" in sample
+    assert "404" in records[urls[2]]["fetch"]["error"]
+    assert "parse" not in records[urls[2]]
+    assert "Fetched 3 URLs (1 failed)" in result.stderr
+
+
+def test_execute_urls_keeps_fetching_while_a_page_is_parsed(fixture_server):
+    urls = [f"{fixture_server}/sample1.html", f"{fixture_server}/sample2.html", f"{fixture_server}/gone.html"]
+    runner = PipelineRunner(input_path=PROJECT_ROOT / "tests" / "fixtures")
+    process = runner._process
+    seen_while_parsing = []
+
+    def blocking_process(html, record, from_stage, to_stage):
+        # The first page is parsed only once every request reached the server.
+        if not seen_while_parsing:
+            deadline = time.monotonic() + 2
+            while len(_FixtureHandler.paths) < len(urls) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            seen_while_parsing.append(len(_FixtureHandler.paths))
+        return process(html, record, from_stage, to_stage)
+
+    runner._process = blocking_process
+    records = list(runner.execute_urls(urls, "parse", "compose", concurrency=1, per_host=1))
+
+    assert seen_while_parsing == [3]
+    assert sorted(record["source"] for record in records) == sorted(urls)
+    assert [record["source"] for record in records if "parse" in record] == urls[:2]
+
+
+def test_pipeline_run_links_near_duplicates_to_first_copy(tmp_path):
+    html = (PROJECT_ROOT / "tests" / "fixtures" / "sample1.html").read_text(encoding="utf-8")
+    inputs = tmp_path / "pages"
+    inputs.mkdir()
+    (inputs / "a_original.html").write_text(html, encoding="utf-8")
+    (inputs / "b_mirror.html").write_text(html.replace("<body>", "<body><!-- fr mirror --><script>track()</script>"), encoding="utf-8")
+    index_path = tmp_path / "fingerprints.sqlite"
+
+    result = _run_cli(["run", "--input", str(inputs), "--dedup-index", str(index_path)])
+
+    assert result.returncode == 0, result.stderr
+    original, mirror = [json.loads(line) for line in result.stdout.splitlines()]
+    assert original["parse"]["company"] == "Acme Corp"
+    assert mirror["duplicate"] == {"of": original["source"], "distance": 0}
+    assert "parse" not in mirror and "compose" not in mirror
+    assert "Deduplicated 1 of 2 documents" in result.stderr
+
+    rerun = _run_cli(["run", "--input", str(inputs), "--dedup-index", str(index_path)])
+    assert "Deduplicated 1 of 2 documents" in rerun.stderr
+
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from src.crawler import download
+from src.crawler.download import ChecksumMismatchError, DownloadManager
+from src.crawler.http import HttpClient, HttpNetworkError, RetryConfig
+
+BODY = random.Random(0).randbytes(300_000)
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    body = BODY
+    etag = '"v1"'
+    ranges: list[str | None] = []
+    # Close the connection after this many bytes of the next response.
+    cut_after: int | None = None
+    # ETag served from the second request on, with the first response trickled out slowly.
+    next_etag: str | None = None
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        requested = self.headers.get("Range")
+        self.ranges.append(requested)
+        body = self.body
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", requested or "")
+        if_range = self.headers.get("If-Range")
+        ranged = self.path != "/norange" and match is not None and if_range in (None, self.etag)
+        if body and ranged:
+            start = int(match.group(1))
+            end = min(int(match.group(2) or len(body) - 1), len(body) - 1)
+            total = "*" if self.path == "/unsized" else str(len(body))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+            payload = body[start : end + 1]
+        else:
+            self.send_response(200)
+            payload = body
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        next_etag = type(self).next_etag
+        if next_etag is not None:
+            type(self).next_etag = None
+            type(self).etag = next_etag
+            for offset in range(0, len(payload), 4_096):
+                self.wfile.write(payload[offset : offset + 4_096])
+                self.wfile.flush()
+                time.sleep(0.01)
+            return
+        cut_after = type(self).cut_after
+        if cut_after is not None:
+            type(self).cut_after = None
+            self.wfile.write(payload[:cut_after])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        return
+
+
+@pytest.fixture
+def range_server() -> Iterator[str]:
+    _RangeHandler.body = BODY
+    _RangeHandler.etag = '"v1"'
+    _RangeHandler.ranges = []
+    _RangeHandler.cut_after = None
+    _RangeHandler.next_etag = None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_download_fetches_parts_in_parallel_and_verifies_checksum(range_server: str, tmp_path: Path) -> None:
+    checksum = "sha256:" + hashlib.sha256(BODY).hexdigest()
+    dest = tmp_path / "export.bin"
+
+    with HttpClient() as client:
+        manager = DownloadManager(client, chunk_size=16_384, part_size=64_000, max_parts=3)
+        result = manager.download(f"{range_server}/export.bin", dest, checksum=checksum)
+
+    assert dest.read_bytes() == BODY
+    assert result.size == len(BODY)
+    assert result.parts == 5
+    assert result.digest == checksum.split(":")[1]
+    assert sorted(_RangeHandler.ranges) == sorted(
+        ["bytes=0-63999", "bytes=64000-127999", "bytes=128000-191999", "bytes=192000-255999", "bytes=256000-299999"]
+    )
+    assert not (tmp_path / "export.bin.part").exists()
+    assert not (tmp_path / "export.bin.part.json").exists()
+
+
+def test_download_resumes_after_interruption(range_server: str, tmp_path: Path) -> None:
+    dest = tmp_path / "bundle.zip"
+    url = f"{range_server}/bundle.zip"
+    _RangeHandler.cut_after = 100_000
+
+    with HttpClient() as client:
+        manager = DownloadManager(client, chunk_size=8_192, part_size=1_000_000)
+        with pytest.raises(HttpNetworkError):
+            manager.download(url, dest)
+        assert (tmp_path / "bundle.zip.part.json").exists()
+
+        result = manager.download(url, dest)
+
+    assert dest.read_bytes() == BODY
+    assert 0 < result.resumed_bytes <= 100_000
+    assert _RangeHandler.ranges[-1] == f"bytes={result.resumed_bytes}-299999"
+
+
+def test_download_retries_interrupted_part_from_its_offset(range_server: str, tmp_path: Path) -> None:
+    _RangeHandler.cut_after = 10_000
+    config = RetryConfig(max_attempts=2, initial_delay=0)
+
+    with HttpClient() as client:
+        manager = DownloadManager(client, chunk_size=4_096, part_size=100_000, max_parts=2, retry=config)
+        result = manager.download(f"{range_server}/a.bin", tmp_path / "a.bin")
+
+    assert (tmp_path / "a.bin").read_bytes() == BODY
+    assert result.resumed_bytes == 0
+    retried = [value for value in _RangeHandler.ranges if value and value.endswith("-99999")]
+    assert retried[0] == "bytes=0-99999"
+    assert len(retried) == 2 and retried[1] != retried[0]
+
+
+def test_download_restarts_when_remote_file_changed(range_server: str, tmp_path: Path) -> None:
+    dest = tmp_path / "data.bin"
+    url = f"{range_server}/data.bin"
+    _RangeHandler.cut_after = 50_000
+
+    with HttpClient() as client:
+        manager = DownloadManager(client, chunk_size=8_192, part_size=1_000_000)
+        with pytest.raises(HttpNetworkError):
+            manager.download(url, dest)
+
+        _RangeHandler.body = BODY[::-1]
+        _RangeHandler.etag = '"v2"'
+        result = manager.download(url, dest)
+
+    assert dest.read_bytes() == BODY[::-1]
+    assert result.resumed_bytes == 0
+
+
+def test_download_without_range_support_streams_sequentially(range_server: str, tmp_path: Path) -> None:
+    with HttpClient() as client:
+        manager = DownloadManager(client, chunk_size=8_192, part_size=64_000, max_parts=4)
+        result = manager.download(f"{range_server}/norange", tmp_path / "plain.bin")
+
+    assert (tmp_path / "plain.bin").read_bytes() == BODY
+    assert result.parts == 1
+    assert len(_RangeHandler.ranges) == 1
+
+
+def test_download_checksum_mismatch_discards_partial_file(range_server: str, tmp_path: Path) -> None:
+    dest = tmp_path / "bad.bin"
+
+    with HttpClient() as client:
+        manager = DownloadManager(client, part_size=100_000)
+        with pytest.raises(ChecksumMismatchError):
+            manager.download(f"{range_server}/bad.bin", dest, checksum="md5:" + "0" * 32)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_with_unknown_total_size_streams_sequentially(range_server: str, tmp_path: Path) -> None:
+    with HttpClient() as client:
+        manager = DownloadManager(client, chunk_size=8_192, part_size=64_000, max_parts=4)
+        result = manager.download(f"{range_server}/unsized", tmp_path / "unsized.bin")
+
+    assert (tmp_path / "unsized.bin").read_bytes() == BODY
+    assert result.size == len(BODY) and result.parts == 1
+    assert _RangeHandler.ranges == ["bytes=0-63999", None]
+
+
+def test_download_stops_sibling_parts_before_discarding_changed_file(
+    range_server: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _RangeHandler.next_etag = '"v2"'
+    writing = 0
+    counter = threading.Lock()
+    write_part = DownloadManager._write_part
+
+    def tracked_write_part(self: DownloadManager, *args: object) -> None:
+        nonlocal writing
+        with counter:
+            writing += 1
+        try:
+            write_part(self, *args)  # type: ignore[arg-type]
+        finally:
+            with counter:
+                writing -= 1
+
+    removed_while_writing: list[int] = []
+    remove = download._remove
+
+    def tracked_remove(*paths: Path) -> None:
+        if any(path.suffix == ".part" for path in paths):
+            removed_while_writing.append(writing)
+        remove(*paths)
+
+    monkeypatch.setattr(DownloadManager, "_write_part", tracked_write_part)
+    monkeypatch.setattr(download, "_remove", tracked_remove)
+    with HttpClient() as client:
+        manager = DownloadManager(client, chunk_size=4_096, part_size=64_000, max_parts=3)
+        result = manager.download(f"{range_server}/moving.bin", tmp_path / "moving.bin")
+
+    assert (tmp_path / "moving.bin").read_bytes() == BODY
+    assert result.resumed_bytes == 0
+    assert len(removed_while_writing) == 2 and not any(removed_while_writing)
@@ -1,6 +1,12 @@
+import asyncio
+import os
+import threading
+import time
+
 import pytest
 
-from src.email.compose import EmailAdapter, EmailComposer, PromptRenderer, compose_email
+from src.email.compose import AsyncEmailComposer, EmailAdapter, EmailComposer, PromptRenderer, compose_email
+from src.llm.adapter import LLMBackend
 
 
 VALID_META = (
@@ -27,7 +33,7 @@ VALID_BODY = (
 VALID_OUTPUT = f"{VALID_META}\n\n{VALID_BODY}"
 
 
-class StubBackend:
+class StubBackend(LLMBackend):
     def __init__(self, response: str) -> None:
         self._response = response
         self.prompts: list[str] = []
@@ -131,3 +137,126 @@ def test_email_adapter_enforces_word_count():
 
     with pytest.raises(ValueError):
         adapter.adapt(raw_output)
+
+
+def test_prompt_renderer_caches_compiled_template_until_file_changes(tmp_path, monkeypatch):
+    template_path = tmp_path / "en" / "cold.md"
+    template_path.parent.mkdir()
+    template_path.write_text(
+        "Hi {contact.first_name}! {company.tags} {missing.key}|{contact.role}|{{literal}} {score:.1f} {contact.first_name!r:>8}",
+        encoding="utf-8",
+    )
+    reads = []
+    original_read_text = type(template_path).read_text
+
+    def counting_read_text(self, *args, **kwargs):
+        reads.append(self)
+        return original_read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(type(template_path), "read_text", counting_read_text)
+    data = {"contact": {"first_name": "Minji", "role": None}, "company": {"tags": ["ai", "ops"]}, "score": 0.25}
+    renderer = PromptRenderer(template_root=tmp_path)
+
+    first = renderer.render(data)
+    assert first == "Hi Minji! [\"ai\", \"ops\"] ||{literal} 0.2  'Minji'"
+    assert PromptRenderer(template_root=tmp_path).render(data) == first
+    assert len(reads) == 1
+
+    stat = template_path.stat()
+    template_path.write_text("Bye {contact.first_name}", encoding="utf-8")
+    os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert renderer.render(data) == "Bye Minji"
+    assert len(reads) == 2
+
+    with pytest.raises(FileNotFoundError):
+        renderer.render(data, language="ko")
+
+
+class SlowBackend:
+    def __init__(self, response: str, *, latency: float, fail_on: str | None = None) -> None:
+        self._response = response
+        self._latency = latency
+        self._fail_on = fail_on
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def complete(self, prompt: str, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self._latency)
+            if self._fail_on is not None and self._fail_on in prompt:
+                raise RuntimeError("backend unavailable")
+            return self._response
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def test_compose_many_runs_concurrently_in_order_and_isolates_failures():
+    records = [{"company": {"name": f"Company {index}"}, "contact": {"first_name": "Minji"}} for index in range(20)]
+    records[3]["company"]["name"] = "Broken Co"
+    backend = SlowBackend(VALID_OUTPUT, latency=0.05, fail_on="Broken Co")
+    adapter = EmailAdapter()
+    composer = EmailComposer(backend=backend, adapter=adapter)
+
+    batch = composer.compose_many(records, concurrency=5)
+
+    assert [result.index for result in batch.results] == list(range(20))
+    assert backend.max_in_flight == 5
+    assert batch.elapsed < 20 * 0.05
+    assert (batch.succeeded, batch.failed) == (19, 1)
+    failed = batch.results[3]
+    assert not failed.ok and isinstance(failed.error, RuntimeError) and failed.composition is None
+    assert batch.results[0].composition == adapter.adapt(VALID_OUTPUT)
+    percentiles = batch.latency_percentiles()
+    assert set(percentiles) == {"p50", "p95", "p99"}
+    assert 0.05 <= percentiles["p50"] <= percentiles["p99"]
+    assert batch.throughput > 20
+
+    invalid = EmailComposer(backend=StubBackend(response="not json")).compose_many(iter(records[:2]), concurrency=2)
+    assert [type(result.error) for result in invalid.results] == [ValueError, ValueError]
+    assert EmailComposer(backend=backend).compose_many([]).results == []
+    with pytest.raises(ValueError):
+        composer.compose_many(records, concurrency=0)
+
+
+class AsyncBackend(StubBackend):
+    def __init__(self, response: str, *, latency: float) -> None:
+        super().__init__(response)
+        self._latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def acomplete(self, prompt: str, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self._latency)
+        finally:
+            self.in_flight -= 1
+        if "Broken Co" in prompt:
+            raise RuntimeError("backend unavailable")
+        return self.complete(prompt)
+
+
+def test_async_composer_keeps_many_requests_in_flight_on_one_thread():
+    records = [{"company": {"name": f"Company {index}"}} for index in range(200)]
+    records[7]["company"]["name"] = "Broken Co"
+    backend = AsyncBackend(VALID_OUTPUT, latency=0.1)
+    composer = AsyncEmailComposer(backend=backend)
+
+    batch = asyncio.run(composer.compose_many(records, concurrency=150))
+
+    assert [result.index for result in batch.results] == list(range(200))
+    assert backend.max_in_flight == 150
+    assert batch.elapsed < 1.0
+    assert (batch.succeeded, batch.failed) == (199, 1)
+    assert isinstance(batch.results[7].error, RuntimeError)
+    assert asyncio.run(composer.compose(records[0])).meta["tone"] == "warm"
+
+    sync_backend = StubBackend(VALID_OUTPUT)
+    composition = asyncio.run(AsyncEmailComposer(backend=sync_backend).compose(records[0]))
+    assert composition.body.startswith("Hi {{contact.first_name}}") and len(sync_backend.prompts) == 1
@@ -0,0 +1,106 @@
+from pathlib import Path
+
+import pytest
+
+from src.ingest.bloom import BloomFilter
+from src.ingest.frontier import Frontier
+
+SEED_FILE = Path(__file__).resolve().parents[1] / "data" / "seed_urls.txt"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1_000, error_rate=0.01)
+    urls = [f"https://example.com/{index}" for index in range(1_000)]
+    for url in urls:
+        bloom.add(url)
+
+    assert all(url in bloom for url in urls)
+    false_positives = sum(f"https://example.org/{index}" in bloom for index in range(10_000))
+    assert false_positives < 300
+
+
+def test_frontier_dedupes_and_leases_by_priority(tmp_path):
+    frontier = Frontier(tmp_path / "frontier.db")
+    seeds = [line for line in SEED_FILE.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    assert frontier.enqueue_many(seeds) == len(seeds)
+    assert frontier.enqueue_many(seeds + [f" {seeds[0]} "]) == 0
+    assert frontier.enqueue("https://example.com/urgent", priority=10) is True
+    assert frontier.seen(seeds[1])
+    assert not frontier.seen("https://example.com/never")
+
+    leased = frontier.lease(3)
+
+    assert [item.url for item in leased] == ["https://example.com/urgent", seeds[0], seeds[1]]
+    assert frontier.stats()["leased"] == 3
+    assert len(frontier) == len(seeds) + 1
+    assert all(item.attempts == 1 for item in leased)
+    with pytest.raises(ValueError):
+        frontier.enqueue("  ")
+
+
+def test_frontier_retries_and_parks_failures(tmp_path):
+    frontier = Frontier(tmp_path / "frontier.db", max_attempts=2)
+    frontier.enqueue("https://example.com/flaky")
+
+    (item,) = frontier.lease()
+    assert frontier.fail(item.url, item.lease_id, error="HTTP 503") is True
+    (item,) = frontier.lease()
+    assert item.attempts == 2
+    assert frontier.fail(item.url, item.lease_id, error="HTTP 503") is False
+
+    assert frontier.lease() == []
+    assert frontier.stats()["failed"] == 1
+    with pytest.raises(KeyError):
+        frontier.complete("https://example.com/flaky", item.lease_id)
+
+
+def test_frontier_resumes_expired_leases_after_restart(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "frontier.db"
+    frontier = Frontier(path, lease_seconds=30, clock=clock)
+    frontier.enqueue_many(["https://example.com/a", "https://example.com/b"])
+    (first,) = frontier.lease()
+    frontier.complete(first.url, first.lease_id)
+    frontier.lease()
+    frontier.close()  # simulate a crash while holding the lease on /b
+
+    clock.now += 31
+    resumed = Frontier(path, lease_seconds=30, clock=clock)
+
+    assert resumed.enqueue("https://example.com/a") is False
+    (item,) = resumed.lease()
+    assert item.url == "https://example.com/b"
+    assert item.attempts == 2
+    resumed.complete(item.url, item.lease_id)
+    assert resumed.stats() == {"pending": 0, "leased": 0, "done": 2, "failed": 0}
+
+
+def test_frontier_rejects_settling_an_expired_lease(tmp_path):
+    clock = FakeClock()
+    frontier = Frontier(tmp_path / "frontier.db", lease_seconds=30, clock=clock)
+    frontier.enqueue_many(["https://example.com/a", "https://example.com/b"])
+    (stale,) = frontier.lease()
+
+    clock.now += 31  # the first worker stalls past its lease
+    (current,) = frontier.lease()
+    assert current.url == stale.url
+    assert current.lease_id != stale.lease_id
+
+    with pytest.raises(KeyError):
+        frontier.complete(stale.url, stale.lease_id)
+    with pytest.raises(KeyError):
+        frontier.fail(stale.url, stale.lease_id, error="timeout")
+    assert frontier.complete_many([(stale.url, stale.lease_id)]) == 0
+    assert frontier.stats()["leased"] == 1
+
+    frontier.complete(current.url, current.lease_id)
+    assert frontier.stats() == {"pending": 1, "leased": 0, "done": 1, "failed": 0}
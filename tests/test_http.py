@@ -1,10 +1,19 @@
 ﻿from __future__ import annotations
 
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
 import pytest
 import requests
 
 from src.crawler.http import (
     GET,
+    GET_many,
+    FetchResult,
+    HttpClient,
     HttpClientError,
     HttpConnectionError,
     HttpNetworkError,
@@ -13,6 +22,7 @@ from src.crawler.http import (
     HttpUnexpectedStatusError,
     RetryConfig,
 )
+from src.utils.retry import CircuitBreakers, CircuitOpenError, RetryBudget
 
 
 def _response_with_status(status_code: int, url: str = "https://example.com") -> requests.Response:
@@ -23,6 +33,13 @@ def _response_with_status(status_code: int, url: str = "https://example.com") ->
     return response
 
 
+def _patch_session_get(monkeypatch: pytest.MonkeyPatch, fake) -> None:
+    monkeypatch.setattr(
+        "src.crawler.http.requests.Session.get",
+        lambda _session, *args, **kwargs: fake(*args, **kwargs),
+    )
+
+
 def test_get_returns_response(monkeypatch: pytest.MonkeyPatch) -> None:
     response = _response_with_status(200)
     captured = {}
@@ -33,7 +50,7 @@ def test_get_returns_response(monkeypatch: pytest.MonkeyPatch) -> None:
         captured["headers"] = headers
         return response
 
-    monkeypatch.setattr("src.crawler.http.requests.get", fake_get)
+    _patch_session_get(monkeypatch, fake_get)
 
     result = GET("https://example.com/api", timeout=5.0, headers={"X-Test": "1"})
 
@@ -46,7 +63,7 @@ def test_get_returns_response(monkeypatch: pytest.MonkeyPatch) -> None:
 def test_get_maps_client_error(monkeypatch: pytest.MonkeyPatch) -> None:
     response = _response_with_status(404)
 
-    monkeypatch.setattr("src.crawler.http.requests.get", lambda *_, **__: response)
+    _patch_session_get(monkeypatch, lambda *_, **__: response)
 
     with pytest.raises(HttpClientError) as excinfo:
         GET("https://example.com/missing", timeout=2.0)
@@ -60,7 +77,7 @@ def test_get_maps_client_error(monkeypatch: pytest.MonkeyPatch) -> None:
 def test_get_maps_server_error(monkeypatch: pytest.MonkeyPatch) -> None:
     response = _response_with_status(503)
 
-    monkeypatch.setattr("src.crawler.http.requests.get", lambda *_, **__: response)
+    _patch_session_get(monkeypatch, lambda *_, **__: response)
 
     with pytest.raises(HttpServerError) as excinfo:
         GET("https://example.com/service", timeout=1.0)
@@ -73,7 +90,7 @@ def test_get_maps_server_error(monkeypatch: pytest.MonkeyPatch) -> None:
 def test_get_maps_unexpected_status(monkeypatch: pytest.MonkeyPatch) -> None:
     response = _response_with_status(302)
 
-    monkeypatch.setattr("src.crawler.http.requests.get", lambda *_, **__: response)
+    _patch_session_get(monkeypatch, lambda *_, **__: response)
 
     with pytest.raises(HttpUnexpectedStatusError) as excinfo:
         GET("https://example.com/redirect", timeout=1.0)
@@ -85,7 +102,7 @@ def test_get_maps_timeout_exception(monkeypatch: pytest.MonkeyPatch) -> None:
     def raise_timeout(*_: object, **__: object) -> None:
         raise requests.exceptions.Timeout("boom")
 
-    monkeypatch.setattr("src.crawler.http.requests.get", raise_timeout)
+    _patch_session_get(monkeypatch, raise_timeout)
 
     with pytest.raises(HttpTimeoutError) as excinfo:
         GET("https://example.com/slow", timeout=1.5)
@@ -101,7 +118,7 @@ def test_get_maps_connection_error(monkeypatch: pytest.MonkeyPatch) -> None:
     def raise_connection(*_: object, **__: object) -> None:
         raise exc
 
-    monkeypatch.setattr("src.crawler.http.requests.get", raise_connection)
+    _patch_session_get(monkeypatch, raise_connection)
 
     with pytest.raises(HttpConnectionError) as excinfo:
         GET("https://example.com/socket", timeout=1.0)
@@ -115,7 +132,7 @@ def test_get_maps_generic_request_exception(monkeypatch: pytest.MonkeyPatch) ->
     def raise_generic(*_: object, **__: object) -> None:
         raise exc
 
-    monkeypatch.setattr("src.crawler.http.requests.get", raise_generic)
+    _patch_session_get(monkeypatch, raise_generic)
 
     with pytest.raises(HttpNetworkError) as excinfo:
         GET("https://example.com/errors", timeout=1.0)
@@ -133,7 +150,7 @@ def test_get_retries_on_configured_exceptions(monkeypatch: pytest.MonkeyPatch) -
             raise requests.exceptions.ConnectionError("temporary failure")
         return response
 
-    monkeypatch.setattr("src.crawler.http.requests.get", flaky_get)
+    _patch_session_get(monkeypatch, flaky_get)
     monkeypatch.setattr("src.utils.retry.time.sleep", lambda _: None)
 
     config = RetryConfig(max_attempts=3, initial_delay=0, backoff_factor=1.0, retry_on=(HttpNetworkError,))
@@ -144,6 +161,42 @@ def test_get_retries_on_configured_exceptions(monkeypatch: pytest.MonkeyPatch) -
     assert len(attempts) == 3
 
 
+def test_get_breakers_fail_fast_per_host(monkeypatch: pytest.MonkeyPatch) -> None:
+    attempts: list[str] = []
+
+    def flaky_host(url: str, **__: object) -> requests.Response:
+        attempts.append(url)
+        if "down.example" in url:
+            raise requests.exceptions.ConnectionError("refused")
+        return _response_with_status(200, url)
+
+    _patch_session_get(monkeypatch, flaky_host)
+    monkeypatch.setattr("src.utils.retry.time.sleep", lambda _: None)
+
+    breakers = CircuitBreakers(failure_threshold=2, recovery_timeout=60.0)
+    config = RetryConfig(max_attempts=3, initial_delay=0, breakers=breakers)
+
+    with pytest.raises(CircuitOpenError):
+        GET("https://down.example/a", timeout=1.0, retry=config)
+    with pytest.raises(CircuitOpenError):
+        GET("https://DOWN.example/b", timeout=1.0, retry=config)
+
+    assert attempts == ["https://down.example/a", "https://down.example/a"]
+    assert GET("https://up.example/", timeout=1.0, retry=config).status_code == 200
+    assert breakers.states() == {"down.example": "open", "up.example": "closed"}
+
+
+def test_get_counts_single_attempts_against_shared_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    _patch_session_get(monkeypatch, lambda url, **_: _response_with_status(200, url))
+    budget = RetryBudget(0.5, min_retries=0)
+
+    for index in range(3):
+        GET(f"https://example.com/{index}", timeout=1.0, retry=RetryConfig(max_attempts=1, budget=budget))
+    GET("https://example.com/retrying", timeout=1.0, retry=RetryConfig(max_attempts=3, budget=budget))
+
+    assert budget.snapshot() == {"requests": 4, "retries": 0}
+
+
 def test_get_does_not_retry_on_client_error(monkeypatch: pytest.MonkeyPatch) -> None:
     attempts: list[int] = []
 
@@ -151,7 +204,7 @@ def test_get_does_not_retry_on_client_error(monkeypatch: pytest.MonkeyPatch) ->
         attempts.append(1)
         return _response_with_status(429)
 
-    monkeypatch.setattr("src.crawler.http.requests.get", always_404)
+    _patch_session_get(monkeypatch, always_404)
     monkeypatch.setattr("src.utils.retry.time.sleep", lambda _: None)
 
     config = RetryConfig(max_attempts=5, retry_on=(HttpNetworkError,))
@@ -159,4 +212,143 @@ def test_get_does_not_retry_on_client_error(monkeypatch: pytest.MonkeyPatch) ->
     with pytest.raises(HttpClientError):
         GET("https://example.com/rate-limited", timeout=1.0, retry=config)
 
-    assert len(attempts) == 1
\ No newline at end of file
+    assert len(attempts) == 1
+
+
+class _PortRecordingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    client_ports: list[int] = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        self.client_ports.append(self.client_address[1])
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.05)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+        status = 404 if self.path == "/missing" else 200
+        body = self.path.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        return
+
+
+@pytest.fixture
+def local_server() -> Iterator[str]:
+    _PortRecordingHandler.client_ports = []
+    _PortRecordingHandler.max_in_flight = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PortRecordingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_http_client_reuses_connections(local_server: str) -> None:
+    with HttpClient(pool_maxsize=2) as client:
+        for _ in range(5):
+            response = GET(f"{local_server}/page", timeout=5.0, client=client)
+            assert response.content == b"/page"
+
+    assert len(_PortRecordingHandler.client_ports) == 5
+    assert len(set(_PortRecordingHandler.client_ports)) == 1
+
+
+def test_http_client_maps_status_errors(local_server: str) -> None:
+    with HttpClient() as client:
+        with pytest.raises(HttpClientError) as excinfo:
+            client.get(f"{local_server}/missing", timeout=5.0)
+
+    assert excinfo.value.status_code == 404
+
+
+def test_http_client_rejects_invalid_pool_sizes() -> None:
+    with pytest.raises(ValueError):
+        HttpClient(pool_maxsize=0)
+
+
+def _collect(urls: list[str], **kwargs: object) -> list[FetchResult]:
+    async def run() -> list[FetchResult]:
+        return [result async for result in GET_many(urls, timeout=5.0, **kwargs)]
+
+    return asyncio.run(run())
+
+
+def test_get_many_bounds_concurrency_and_reports_errors(local_server: str) -> None:
+    urls = [f"{local_server}/slow/{index}" for index in range(12)] + [f"{local_server}/missing"]
+
+    with HttpClient(pool_maxsize=4) as client:
+        results = _collect(urls, concurrency=3, per_host=3, client=client)
+
+    assert sorted(result.url for result in results) == sorted(urls)
+    failures = [result for result in results if not result.ok]
+    assert [result.url for result in failures] == [f"{local_server}/missing"]
+    assert isinstance(failures[0].error, HttpClientError)
+    assert all(result.response is not None for result in results if result.ok)
+    assert 1 < _PortRecordingHandler.max_in_flight <= 3
+
+
+def test_get_many_applies_per_host_limit(local_server: str) -> None:
+    urls = [f"{local_server}/slow/{index}" for index in range(6)]
+
+    with HttpClient() as client:
+        results = _collect(urls, concurrency=6, per_host=1, client=client)
+
+    assert len(results) == 6
+    assert _PortRecordingHandler.max_in_flight == 1
+
+
+def test_get_many_retries_without_blocking(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+    slept: list[float] = []
+    response = _response_with_status(200)
+
+    def flaky_get(url: str, **_: object) -> requests.Response:
+        calls.append(url)
+        if len(calls) < 3:
+            raise requests.exceptions.ConnectionError("temporary failure")
+        return response
+
+    async def fake_sleep(delay: float) -> None:
+        slept.append(delay)
+
+    _patch_session_get(monkeypatch, flaky_get)
+    monkeypatch.setattr("src.crawler.http.asyncio.sleep", fake_sleep)
+    config = RetryConfig(max_attempts=3, initial_delay=0.1, backoff_factor=2.0, retry_on=(HttpNetworkError,))
+
+    (result,) = _collect(["https://example.com/flaky"], retry=config)
+
+    assert result.ok and result.response is response
+    assert result.attempts == 3
+    assert slept == [0.1, 0.2]
+
+
+def test_get_many_cancels_pending_fetches_on_close(local_server: str) -> None:
+    urls = [f"{local_server}/slow/{index}" for index in range(20)]
+
+    async def run() -> int:
+        with HttpClient() as client:
+            stream = GET_many(urls, timeout=5.0, concurrency=2, per_host=2, client=client)
+            first = await stream.__anext__()
+            assert first.ok
+            await stream.aclose()
+        await asyncio.sleep(0.2)
+        return len(_PortRecordingHandler.client_ports)
+
+    assert asyncio.run(run()) < len(urls)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from requests import Response
+
+from src.crawler.cache import HttpCache, parse_cache_control
+from src.crawler.http import HttpClient
+
+
+class _ConditionalHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    requests_seen: list[tuple[str, str | None]] = []
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        etag = f'"{self.path}"'
+        if_none_match = self.headers.get("If-None-Match")
+        self.requests_seen.append((self.path, if_none_match))
+        cache_control = "max-age=3600" if self.path.startswith("/fresh") else "no-cache"
+
+        if if_none_match == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = (self.path * 50).encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        return
+
+
+@pytest.fixture
+def conditional_server() -> Iterator[str]:
+    _ConditionalHandler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ConditionalHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_parse_cache_control_directives() -> None:
+    assert parse_cache_control('max-age=60, No-Store, private="x"') == {
+        "max-age": "60",
+        "no-store": None,
+        "private": "x",
+    }
+
+
+def test_fresh_entries_are_served_without_network(conditional_server: str, tmp_path: Path) -> None:
+    url = f"{conditional_server}/fresh/page"
+    with HttpClient(cache=HttpCache(tmp_path)) as client:
+        first = client.get(url, timeout=5.0)
+        second = client.get(url, timeout=5.0)
+        stats = client.cache.stats  # type: ignore[union-attr]
+
+    assert second.content == first.content
+    assert second.headers["Content-Type"] == "text/html"
+    assert len(_ConditionalHandler.requests_seen) == 1
+    assert stats.hits == 1 and stats.misses == 1
+    assert stats.bytes_saved == len(first.content)
+    assert stats.hit_ratio == pytest.approx(0.5)
+
+
+def test_stale_entries_revalidate_with_etag(conditional_server: str, tmp_path: Path) -> None:
+    url = f"{conditional_server}/stale/page"
+    with HttpClient(cache=HttpCache(tmp_path)) as client:
+        first = client.get(url, timeout=5.0)
+
+    # A new client reloads the persisted index and revalidates.
+    with HttpClient(cache=HttpCache(tmp_path)) as client:
+        second = client.get(url, timeout=5.0)
+        stats = client.cache.stats  # type: ignore[union-attr]
+
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert _ConditionalHandler.requests_seen == [
+        ("/stale/page", None),
+        ("/stale/page", '"/stale/page"'),
+    ]
+    assert stats.revalidated == 1
+    assert stats.bytes_saved == len(first.content)
+
+
+def test_cache_evicts_least_recently_used(conditional_server: str, tmp_path: Path) -> None:
+    cache = HttpCache(tmp_path, max_bytes=1_000)
+    with HttpClient(cache=cache) as client:
+        client.get(f"{conditional_server}/fresh/a", timeout=5.0)
+        client.get(f"{conditional_server}/fresh/b", timeout=5.0)
+        client.get(f"{conditional_server}/fresh/a", timeout=5.0)
+        client.get(f"{conditional_server}/fresh/c", timeout=5.0)
+
+    assert cache.stats.evicted == 1
+    assert cache.lookup(f"{conditional_server}/fresh/a") is not None
+    assert cache.lookup(f"{conditional_server}/fresh/b") is None
+    assert cache.total_bytes <= 1_000
+
+
+def _response(body: bytes, etag: str) -> Response:
+    response = Response()
+    response.status_code = 200
+    response._content = body
+    response.headers["ETag"] = etag
+    return response
+
+
+def test_cache_skips_bodies_larger_than_max_bytes(tmp_path: Path) -> None:
+    cache = HttpCache(tmp_path, max_bytes=100)
+
+    assert cache.store("http://a/small", _response(b"s" * 60, '"s"')) is not None
+    assert cache.store("http://a/page", _response(b"p" * 40, '"p1"')) is not None
+    assert cache.store("http://a/page", _response(b"p" * 101, '"p2"')) is None
+
+    assert cache.lookup("http://a/small") is not None
+    assert cache.lookup("http://a/page") is None
+    assert cache.total_bytes == 60 and cache.stats.evicted == 0
+
+
+def test_cache_drops_old_entry_when_fresh_response_is_uncacheable(tmp_path: Path) -> None:
+    cache = HttpCache(tmp_path)
+    no_store = _response(b"new", '"n"')
+    no_store.headers["Cache-Control"] = "no-store"
+    no_validators = _response(b"newer", '"x"')
+    del no_validators.headers["ETag"]
+
+    cache.store("http://a/one", _response(b"old", '"o1"'))
+    cache.store("http://a/two", _response(b"old", '"o2"'))
+    assert cache.store("http://a/one", no_store) is None
+    assert cache.store("http://a/two", no_validators) is None
+
+    assert cache.lookup("http://a/one") is None
+    assert cache.lookup("http://a/two") is None
+    assert len(cache) == 0 and cache.total_bytes == 0
+
+
+def test_cache_load_skips_damaged_index_rows(tmp_path: Path) -> None:
+    cache = HttpCache(tmp_path)
+    cache.store("http://a/kept", _response(b"kept", '"k"'))
+    cache.close()
+    rows = json.loads((tmp_path / "index.json").read_text(encoding="utf-8"))
+    rows += ["not a row", {"url": "http://a/partial"}, {**rows[0], "url": "http://a/extra", "unknown": 1}]
+    (tmp_path / "index.json").write_text(json.dumps(rows), encoding="utf-8")
+
+    reopened = HttpCache(tmp_path)
+
+    assert len(reopened) == 1 and reopened.lookup("http://a/kept") is not None
@@ -1,6 +1,12 @@
+import sys
+
 import pytest
 
+from src.ingest import url_index
+from src.ingest.canonical import canonicalize_url
+from src.ingest.dedup import FingerprintIndex, hamming_distance, page_text, simhash
 from src.ingest.registry import Registry, RegistryEntry
+from src.ingest.url_index import UrlIndex
 
 
 def test_registry_adds_entry_and_tracks_robots_flag():
@@ -22,4 +28,131 @@ def test_registry_prevents_duplicates():
         registry.add(" https://example.com/ ")
 
     assert registry.exists("https://example.com/")
-    assert len(registry.list_entries()) == 1
\ No newline at end of file
+    assert len(registry.list_entries()) == 1
+
+def test_registry_get_returns_entry_or_none():
+    registry = Registry()
+    entry = registry.add("https://example.com/", respects_robots=False)
+
+    assert registry.get(" https://example.com/ ") is entry
+    assert registry.get("https://example.org/") is None
+
+
+@pytest.mark.parametrize(
+    "raw,expected",
+    [
+        ("https://Example.com", "https://example.com/"),
+        ("HTTPS://EXAMPLE.com:443/", "https://example.com/"),
+        ("http://example.com:8080/a/./b/../c", "http://example.com:8080/a/c"),
+        ("https://example.com/%7euser/%2f?b=2&a=1#section", "https://example.com/~user/%2F?a=1&b=2"),
+        ("https://example.com/p?utm_source=mail&id=7&gclid=abc&UTM_Medium=x", "https://example.com/p?id=7"),
+        ("https://bücher.example/", "https://xn--bcher-kva.example/"),
+        ("not a url", "not a url"),
+    ],
+)
+def test_canonicalize_url(raw, expected):
+    assert canonicalize_url(raw) == expected
+
+
+def test_registry_treats_canonical_variants_as_duplicates():
+    registry = Registry()
+    registry.add("https://Example.com/")
+
+    assert registry.exists("https://example.com")
+    with pytest.raises(ValueError):
+        registry.add("https://example.com:443/#top")
+
+
+def test_registry_add_many_skips_duplicates():
+    registry = Registry()
+
+    added = registry.add_many(
+        ["https://example.com/a", "https://EXAMPLE.com/a?utm_source=x", "https://example.com/b"]
+    )
+
+    assert added == 2
+    assert len(registry) == 2
+    assert [entry.url for entry in registry.list_entries()] == [
+        "https://example.com/a",
+        "https://example.com/b",
+    ]
+
+
+def test_registry_compact_mode_keeps_only_hashes():
+    registry = Registry(keep_entries=False)
+    registry.add_many(f"https://example.com/{index}" for index in range(70_000))
+    registry.add("https://example.org/", respects_robots=False)
+
+    assert registry.exists("https://example.com/69999")
+    assert not registry.exists("https://example.com/70000")
+    assert registry.get("https://example.org").respects_robots is False
+    assert registry.get("https://example.com/1").respects_robots is True
+    with pytest.raises(RuntimeError):
+        registry.list_entries()
+
+
+def test_url_index_compacts_without_losing_members():
+    index = UrlIndex()
+    urls = [f"https://example.com/{index}" for index in range(70_000)]
+    for url in urls:
+        assert index.add(url)
+
+    assert not index.add(urls[0])
+    assert len(index) == 70_000
+    assert all(url in index for url in urls[::997])
+
+
+def test_url_index_bounds_recent_hashes_and_counts_them(monkeypatch):
+    monkeypatch.setattr(url_index, "_BUFFER_SIZE", 100)
+    index = UrlIndex()
+    urls = [f"https://example.com/{position}" for position in range(1_050)]
+    for url in urls:
+        assert index.add(url)
+
+    assert len(index._recent) == 50
+    assert len(index._runs) <= 4
+    assert len(index) == 1_050
+    assert all(url in index for url in urls)
+    assert not index.add(urls[-1]) and not index.add(urls[0])
+    assert index.size_bytes > 8 * 1_000 + 50 * 8
+
+    index.compact()
+    assert len(index._runs) == 1 and not index._recent
+    assert index.size_bytes == 8 * 1_050 + sys.getsizeof(set())
+    assert all(url in index for url in urls[::7])
+
+
+_ARTICLE = " ".join(f"vendor{index % 40} ships workflow{index % 17} automation for team{index % 23}" for index in range(60))
+
+
+def test_page_text_drops_markup_scripts_and_comments():
+    html = "<html><head><style>p {}</style><script>var x = 1;</script></head><body><!-- nav --><p>Hello&amp; <b>World</b></p></body></html>"
+
+    assert page_text(html) == "hello& world"
+
+
+def test_simhash_keeps_near_duplicates_close():
+    mirror = _ARTICLE + " version francaise"
+    other = " ".join(reversed(_ARTICLE.split()))
+
+    assert simhash(_ARTICLE) == simhash(_ARTICLE)
+    assert hamming_distance(simhash(_ARTICLE), simhash(mirror)) <= 3
+    assert hamming_distance(simhash(_ARTICLE), simhash(other)) > 10
+
+
+def test_fingerprint_index_links_near_duplicates_and_persists(tmp_path):
+    path = tmp_path / "fingerprints.sqlite"
+    original = simhash(_ARTICLE)
+
+    with FingerprintIndex(path) as index:
+        assert index.check("https://example.com/a", original) is None
+        assert index.check("https://example.com/a", original) is None
+        match = index.check("https://example.com/fr/a", original ^ 0b101)
+        assert match is not None
+        assert match.as_dict() == {"of": "https://example.com/a", "distance": 2}
+        assert index.check("https://example.com/b", original ^ 0xFFFF) is None
+        assert len(index) == 2
+
+    with FingerprintIndex(path) as reopened:
+        assert reopened.find(original ^ (1 << 63)).source == "https://example.com/a"
+
@@ -1,6 +1,9 @@
+import asyncio
+import threading
+
 import pytest
 
-from src.llm.adapter import CodexBackend
+from src.llm.adapter import CodexBackend, LLMBackend
 
 
 class DummyClient:
@@ -65,3 +68,44 @@ def test_codex_backend_requires_positive_max_tokens():
 
     with pytest.raises(ValueError):
         backend.complete("Test", max_tokens=0)
+
+
+class AsyncDummyClient(DummyClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.async_calls = 0
+
+    async def acreate_completion(self, **kwargs):
+        self.async_calls += 1
+        self.last_payload = kwargs
+        await asyncio.sleep(0)
+        return {"choices": [{"text": "async hello"}]}
+
+
+def test_codex_backend_acomplete_prefers_native_async_client():
+    client = AsyncDummyClient()
+    backend = CodexBackend(client=client, model="code-davinci-002")
+
+    result = asyncio.run(backend.acomplete("Generate code", max_tokens=5, user="u1"))
+
+    assert result == "async hello"
+    assert client.async_calls == 1
+    assert client.last_payload == {"model": "code-davinci-002", "prompt": "Generate code", "max_tokens": 5, "user": "u1"}
+    with pytest.raises(ValueError):
+        asyncio.run(backend.acomplete("Test", temperature=3))
+
+
+def test_acomplete_defaults_to_sync_complete_in_executor():
+    client = DummyClient()
+    backend = CodexBackend(client=client, model="code-davinci-002")
+    threads = []
+
+    class RecordingBackend(LLMBackend):
+        def complete(self, prompt, **kwargs):
+            threads.append(threading.current_thread())
+            return f"{prompt}:{kwargs['stop']}"
+
+    assert asyncio.run(backend.acomplete("Say hello", stop=["\n"])) == "hello"
+    assert client.last_payload["stop"] == ["\n"]
+    assert asyncio.run(RecordingBackend().acomplete("hi", stop=["."])) == "hi:['.']"
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from src.llm.adapter import CodexBackend, LLMBackend
+from src.llm.cache import CachingBackend, completion_key
+
+
+class CountingBackend(LLMBackend):
+    def __init__(self, *, latency: float = 0.0, fail: bool = False) -> None:
+        self.calls: list[tuple[str, dict[str, object]]] = []
+        self._latency = latency
+        self._fail = fail
+        self._lock = threading.Lock()
+
+    def complete(self, prompt: str, **kwargs: object) -> str:
+        with self._lock:
+            self.calls.append((prompt, kwargs))
+        time.sleep(self._latency)
+        if self._fail:
+            raise RuntimeError("backend unavailable")
+        return f"email for {prompt} ({len(self.calls)})"
+
+    async def acomplete(self, prompt: str, **kwargs: object) -> str:
+        self.calls.append((prompt, kwargs))
+        await asyncio.sleep(self._latency)
+        return f"async email for {prompt}"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_completion_key_covers_model_and_parameters() -> None:
+    key = completion_key("m", "hi", temperature=0.5, stop=("###",), max_tokens=10, extra={"user": "a"})
+
+    assert key == completion_key("m", "hi", temperature=0.5, stop=["###"], max_tokens=10, extra={"user": "a", "n": None})
+    assert key != completion_key("other", "hi", temperature=0.5, stop=("###",), max_tokens=10, extra={"user": "a"})
+    assert key != completion_key("m", "hi", temperature=0.7, stop=("###",), max_tokens=10, extra={"user": "a"})
+    assert key != completion_key("m", "hi", temperature=0.5, stop=("###",), max_tokens=10, extra={"user": "b"})
+    assert key != completion_key("m", "hi", temperature=0.5, stop=("###",), max_tokens=11, extra={"user": "a"})
+
+
+def test_caching_backend_hits_persists_and_bypasses(tmp_path: Path) -> None:
+    inner = CountingBackend()
+    backend = CachingBackend(inner, model="m", root=tmp_path)
+
+    first = backend.complete("Atlas", temperature=0.2)
+    assert backend.complete("Atlas", temperature=0.2) == first
+    assert backend.complete("Atlas", temperature=0.9) != first
+    refreshed = backend.complete("Atlas", temperature=0.2, bypass=True)
+    assert refreshed != first and backend.complete("Atlas", temperature=0.2) == refreshed
+    assert len(inner.calls) == 3
+    assert inner.calls[0] == ("Atlas", {"temperature": 0.2, "stop": None, "max_tokens": None})
+    assert backend.stats.as_dict() == {
+        "requests": 5,
+        "hits": 2,
+        "coalesced": 0,
+        "misses": 3,
+        "bypassed": 1,
+        "stored": 3,
+        "expired": 0,
+        "evicted": 0,
+        "hit_ratio": pytest.approx(0.4),
+    }
+    backend.close()
+
+    reopened = CachingBackend(CountingBackend(), model="m", root=tmp_path)
+    assert len(reopened) == 2
+    assert reopened.complete("Atlas", temperature=0.2) == refreshed
+    assert CachingBackend(inner, model="other", root=tmp_path).complete("Atlas", temperature=0.2) != refreshed
+    assert CachingBackend(CodexBackend(client=None, model="davinci"), root=tmp_path).model == "davinci"  # type: ignore[arg-type]
+
+
+def test_caching_backend_evicts_lru_and_expires_entries(tmp_path: Path) -> None:
+    clock = FakeClock()
+    inner = CountingBackend()
+    backend = CachingBackend(inner, model="m", root=tmp_path / "lru", max_bytes=40, ttl=100, clock=clock)
+
+    backend.complete("a")
+    backend.complete("b")
+    backend.complete("a")
+    backend.complete("c")
+    assert backend.stats.evicted == 1 and backend.total_bytes <= 40
+    backend.complete("a")
+    assert [prompt for prompt, _ in inner.calls] == ["a", "b", "c"]
+
+    clock.now += 100
+    backend.complete("a")
+    assert backend.stats.expired == 1
+    assert [prompt for prompt, _ in inner.calls] == ["a", "b", "c", "a"]
+    stored = [path for path in (tmp_path / "lru" / "completions").rglob("*") if path.is_file()]
+    assert len(stored) == len(backend) == 2
+
+    with pytest.raises(ValueError):
+        CachingBackend(inner, root=tmp_path, ttl=0)
+    with pytest.raises(ValueError):
+        CachingBackend(inner, root=tmp_path, max_bytes=0)
+
+
+def test_caching_backend_skips_oversized_texts_and_damaged_index_rows(tmp_path: Path) -> None:
+    inner = CountingBackend()
+    backend = CachingBackend(inner, model="m", root=tmp_path, max_bytes=30)
+
+    backend.complete("a")
+    backend.complete("a long prompt that makes the completion text exceed the cache limit")
+    assert len(backend) == 1 and backend.stats.evicted == 0
+    backend.close()
+
+    index_path = tmp_path / "index.json"
+    rows = json.loads(index_path.read_text(encoding="utf-8"))
+    rows += ["not a row", {"key": "abc"}, {**rows[0], "unknown": 1}]
+    index_path.write_text(json.dumps(rows), encoding="utf-8")
+    reopened = CachingBackend(inner, model="m", root=tmp_path, max_bytes=30)
+    assert len(reopened) == 1 and reopened.complete("a") == "email for a (1)"
+
+
+def test_caching_backend_coalesces_identical_in_flight_requests(tmp_path: Path) -> None:
+    inner = CountingBackend(latency=0.2)
+    backend = CachingBackend(inner, model="m", root=tmp_path)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(backend.complete, ["same"] * 6 + ["other"] * 2))
+
+    assert len(inner.calls) == 2
+    assert len(set(results[:6])) == 1 and len(set(results[6:])) == 1
+    assert backend.stats.hits + backend.stats.coalesced == 6 and backend.stats.hit_ratio == pytest.approx(0.75)
+
+    async def run() -> list[str]:
+        return await asyncio.gather(*(backend.acomplete("fresh", max_tokens=5) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["async email for fresh"] * 5
+    assert [prompt for prompt, _ in inner.calls].count("fresh") == 1
+
+    failing = CachingBackend(CountingBackend(latency=0.1, fail=True), model="m", root=tmp_path / "failing")
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(failing.complete, "boom") for _ in range(3)]
+    assert all(isinstance(future.exception(), RuntimeError) for future in futures)
+    assert len(failing) == 0
+
+
+def test_caching_backend_async_reads_off_the_loop_and_survives_leader_cancellation(tmp_path: Path) -> None:
+    inner = CountingBackend(latency=0.1)
+    backend = CachingBackend(inner, model="m", root=tmp_path)
+    read_threads: list[tuple[int, bool]] = []
+    read = backend._read
+
+    def lock_is_free() -> bool:
+        if not backend._lock.acquire(timeout=1):
+            return False
+        backend._lock.release()
+        return True
+
+    def tracked_read(key: str, entry: object) -> str | None:
+        # Another thread can take the lock while the file is read.
+        with ThreadPoolExecutor(max_workers=1) as probe:
+            free = probe.submit(lock_is_free).result()
+        read_threads.append((threading.get_ident(), free))
+        return read(key, entry)  # type: ignore[arg-type]
+
+    backend._read = tracked_read  # type: ignore[method-assign]
+
+    async def run() -> tuple[list[object], str, int]:
+        leader = asyncio.create_task(backend.acomplete("shared"))
+        await asyncio.sleep(0.02)
+        followers = [asyncio.create_task(backend.acomplete("shared")) for _ in range(2)]
+        await asyncio.sleep(0.02)
+        leader.cancel()
+        outcomes = await asyncio.gather(leader, *followers, return_exceptions=True)
+        cached = await backend.acomplete("shared")
+        return outcomes, cached, threading.get_ident()
+
+    outcomes, cached, loop_thread = asyncio.run(run())
+
+    assert isinstance(outcomes[0], asyncio.CancelledError)
+    assert outcomes[1:] == ["async email for shared"] * 2 and cached == "async email for shared"
+    # The cancelled call is made once more by a follower, not by each of them.
+    assert [prompt for prompt, _ in inner.calls] == ["shared", "shared"]
+    assert read_threads and all(thread != loop_thread and free for thread, free in read_threads)
+    assert backend.stats.requests == 4 and backend.stats.misses == 2 and backend.stats.coalesced == 1
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import itertools
+import random
 
 import pytest
 
-from src.utils.retry import retry
+from src.utils.retry import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreakers,
+    CircuitOpenError,
+    RetryBudget,
+    async_retry,
+    retry,
+)
 
 
 class TransientError(RuntimeError):
@@ -64,3 +75,232 @@ def test_retry_honors_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
 
     assert attempts["count"] == 2
     assert sleep_durations == [0.1]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_retry_budget_caps_retries_at_ratio_of_requests(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("src.utils.retry.time.sleep", lambda *_: None)
+    clock = FakeClock()
+    budget = RetryBudget(0.5, min_retries=0, clock=clock)
+    calls = {"count": 0}
+
+    @retry(TransientError, max_attempts=3, initial_delay=0, budget=budget)
+    def always_fail() -> None:
+        calls["count"] += 1
+        raise TransientError("down")
+
+    for _ in range(4):
+        with pytest.raises(TransientError):
+            always_fail()
+
+    # Four calls earn two retries in total instead of eight.
+    assert calls["count"] == 6
+    assert budget.snapshot() == {"requests": 4, "retries": 2}
+
+    clock.now = 11.0
+    assert budget.snapshot() == {"requests": 0, "retries": 0}
+
+
+def test_circuit_breaker_opens_half_opens_and_closes() -> None:
+    clock = FakeClock()
+    breakers = CircuitBreakers(failure_threshold=2, recovery_timeout=5.0, clock=clock)
+    breaker = breakers.get("example.com")
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.key == "example.com"
+    assert excinfo.value.retry_at == 5.0
+
+    clock.now = 5.0
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now = 10.0
+    breaker.before_call()
+    breaker.record_success()
+    assert breakers.states() == {"example.com": CLOSED}
+
+
+def test_retry_fails_fast_once_breaker_for_key_is_open(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("src.utils.retry.time.sleep", lambda *_: None)
+    breakers = CircuitBreakers(failure_threshold=2, recovery_timeout=60.0)
+    calls: list[str] = []
+
+    @retry(TransientError, max_attempts=5, initial_delay=0, breakers=breakers, breaker_key=lambda host: host)
+    def fetch(host: str) -> str:
+        calls.append(host)
+        if host == "down":
+            raise TransientError(host)
+        return host
+
+    with pytest.raises(CircuitOpenError):
+        fetch("down")
+    with pytest.raises(CircuitOpenError):
+        fetch("down")
+
+    assert calls == ["down", "down"]
+    assert fetch("up") == "up"
+    assert breakers.states() == {"down": OPEN, "up": CLOSED}
+
+
+def test_retry_releases_half_open_trial_on_unlisted_exception() -> None:
+    clock = FakeClock()
+    breakers = CircuitBreakers(failure_threshold=1, recovery_timeout=5.0, clock=clock)
+    outcomes = iter([TransientError("down"), KeyError("bug"), None])
+
+    @retry(TransientError, max_attempts=1, breakers=breakers, breaker_key=lambda host: host)
+    def fetch(host: str) -> str:
+        outcome = next(outcomes)
+        if outcome is not None:
+            raise outcome
+        return host
+
+    with pytest.raises(TransientError):
+        fetch("h")
+    clock.now = 1000.0
+    with pytest.raises(KeyError):
+        fetch("h")
+    assert breakers.states() == {"h": HALF_OPEN}
+    assert fetch("h") == "h"
+    assert breakers.states() == {"h": CLOSED}
+
+
+def test_async_retry_releases_half_open_trial_on_cancellation() -> None:
+    clock = FakeClock()
+    breakers = CircuitBreakers(failure_threshold=1, recovery_timeout=5.0, clock=clock)
+    outcomes = iter([TransientError("down"), asyncio.CancelledError(), LookupError("404"), None])
+
+    @async_retry(TransientError, max_attempts=1, breakers=breakers, breaker_key=lambda host: host)
+    async def fetch(host: str) -> str:
+        outcome = next(outcomes)
+        if outcome is not None:
+            raise outcome
+        return host
+
+    async def run() -> str:
+        with pytest.raises(TransientError):
+            await fetch("h")
+        clock.now = 1000.0
+        with pytest.raises(asyncio.CancelledError):
+            await fetch("h")
+        with pytest.raises(LookupError):
+            await fetch("h")
+        return await fetch("h")
+
+    assert asyncio.run(run()) == "h"
+    assert breakers.states() == {"h": CLOSED}
+
+
+def test_retry_requires_breaker_key_with_breakers() -> None:
+    with pytest.raises(ValueError):
+        retry(TransientError, breakers=CircuitBreakers())
+
+
+def test_async_retry_awaits_backoff_and_reports_each_retry(monkeypatch: pytest.MonkeyPatch) -> None:
+    slept: list[float] = []
+    reported: list[tuple[int, float]] = []
+
+    async def fake_sleep(delay: float) -> None:
+        slept.append(delay)
+
+    monkeypatch.setattr("src.utils.retry.asyncio.sleep", fake_sleep)
+    attempts: list[int] = []
+
+    @async_retry(
+        TransientError,
+        max_attempts=4,
+        initial_delay=0.1,
+        on_retry=lambda attempt, _exc, delay: reported.append((attempt, delay)),
+    )
+    async def flaky() -> str:
+        attempts.append(1)
+        if len(attempts) < 4:
+            raise TransientError("transient failure")
+        return "ok"
+
+    assert asyncio.run(flaky()) == "ok"
+    assert slept == [0.1, 0.2, 0.4]
+    assert reported == [(1, 0.1), (2, 0.2), (3, 0.4)]
+
+
+@pytest.mark.parametrize("jitter", ["full", "decorrelated"])
+def test_async_retry_jitter_spreads_delays_within_bounds(monkeypatch: pytest.MonkeyPatch, jitter: str) -> None:
+    slept: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        slept.append(delay)
+
+    monkeypatch.setattr("src.utils.retry.asyncio.sleep", fake_sleep)
+
+    @async_retry(
+        TransientError,
+        max_attempts=6,
+        initial_delay=0.1,
+        max_delay=1.0,
+        jitter=jitter,
+        rng=random.Random(1),
+    )
+    async def always_fail() -> None:
+        raise TransientError("down")
+
+    with pytest.raises(TransientError):
+        asyncio.run(always_fail())
+
+    assert len(slept) == 5
+    assert len(set(slept)) == 5
+    assert all(0 <= delay <= 1.0 for delay in slept)
+    if jitter == "full":
+        assert all(delay <= 0.1 * 2**index for index, delay in enumerate(slept))
+    else:
+        assert all(delay >= 0.1 for delay in slept)
+
+
+def test_async_retry_cancels_attempts_past_timeout_budget() -> None:
+    attempts: list[int] = []
+
+    @async_retry(TransientError, max_attempts=10, timeout=0.2, initial_delay=0.05)
+    async def slow() -> None:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise TransientError("first attempt fails fast")
+        await asyncio.sleep(10)
+
+    elapsed = asyncio.run(_timed(slow))
+
+    assert elapsed < 1.0
+    assert len(attempts) == 2
+
+
+async def _timed(func) -> float:
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    with pytest.raises(TimeoutError):
+        await func()
+    return loop.time() - started
+
+
+def test_async_retry_validates_like_retry() -> None:
+    with pytest.raises(ValueError):
+        async_retry(TransientError, max_attempts=0)
+    with pytest.raises(ValueError):
+        async_retry(TransientError, backoff_factor=0)
+    with pytest.raises(ValueError):
+        async_retry(TransientError, jitter="equal")
+    with pytest.raises(TypeError):
+        async_retry(TransientError)(lambda: None)
+
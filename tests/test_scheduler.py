@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from urllib.parse import urlsplit
+
+import pytest
+from requests import Response
+
+from src.crawler.http import HttpClient, HttpClientError, HttpServerError, HttpStatusError, RetryConfig
+from src.crawler.scheduler import CrawlScheduler, RobotsDisallowedError, TokenBucket
+from src.ingest.registry import Registry
+from src.utils.retry import RetryBudget
+
+
+class _PoliteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    hits: list[tuple[str, str]] = []
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        self.hits.append((self.headers.get("Host", ""), self.path))
+        body = b"ok"
+        if self.path == "/robots.txt":
+            body = b"User-agent: *\nDisallow: /private\n"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        return
+
+
+@pytest.fixture
+def polite_server() -> Iterator[int]:
+    _PoliteHandler.hits = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PoliteHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the scheduler sleeps."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            # A minimum step keeps float rounding from stalling waits for tiny remainders.
+            self.now += max(seconds, 1e-6)
+
+
+class ScriptedClient:
+    """Client stand-in recording the fake time of every page request.
+
+    *script* maps a path to the statuses returned by its successive
+    requests (200 once exhausted); robots.txt is always missing.
+    """
+
+    def __init__(self, clock: FakeClock, script: dict[str, list[tuple[int, dict[str, str]]]] | None = None) -> None:
+        self.clock = clock
+        self.script = {path: list(statuses) for path, statuses in (script or {}).items()}
+        self.hits: list[tuple[str, str, float]] = []
+        self.retries: list[RetryConfig | None] = []
+        self._lock = threading.Lock()
+
+    def get(self, url: str, *, timeout: float, headers: object = None, retry: RetryConfig | None = None) -> Response:
+        parts = urlsplit(url)
+        if parts.path == "/robots.txt":
+            raise HttpClientError("not found", url=url, status_code=404, response=_response(404, {}))
+        with self._lock:
+            self.hits.append((parts.netloc, parts.path, self.clock()))
+            self.retries.append(retry)
+            steps = self.script.get(parts.path)
+            status, extra = steps.pop(0) if steps else (200, {})
+        response = _response(status, extra)
+        if status >= 500:
+            raise HttpServerError(f"HTTP {status}", url=url, status_code=status, response=response)
+        if status >= 400:
+            raise HttpClientError(f"HTTP {status}", url=url, status_code=status, response=response)
+        return response
+
+    def times(self, host: str) -> list[float]:
+        return [at for netloc, _path, at in self.hits if netloc == host]
+
+
+def _response(status: int, headers: dict[str, str]) -> Response:
+    response = Response()
+    response.status_code = status
+    response.headers.update(headers)
+    response._content = b"ok"
+    return response
+
+
+def test_token_bucket_spaces_reservations() -> None:
+    bucket = TokenBucket(interval=0.5, capacity=2, now=0.0)
+
+    assert bucket.reserve(0.0) == 0.0
+    assert bucket.reserve(0.0) == 0.0
+    assert bucket.reserve(0.0) == pytest.approx(0.5)
+    assert bucket.reserve(0.25) == pytest.approx(0.25)
+    assert bucket.reserve(0.5) == 0.0
+    # Float refills that fall a hair short of a whole token do not stall callers.
+    bucket = TokenBucket(interval=0.3, capacity=1, now=0.4)
+    assert bucket.reserve(0.4) == 0.0
+    assert bucket.reserve(0.7) == 0.0
+
+
+def test_crawl_spaces_requests_per_host_and_interleaves_hosts() -> None:
+    clock = FakeClock()
+    client = ScriptedClient(clock)
+    hosts = ("a.example", "b.example")
+    urls = [f"http://{host}/page/{index}" for index in range(4) for host in hosts]
+    scheduler = CrawlScheduler(client=client, initial_delay=0.1, min_delay=0.1, clock=clock, sleep=clock.sleep)  # type: ignore[arg-type]
+
+    results = list(scheduler.crawl(urls, workers=1))
+
+    assert all(result.ok for result in results)
+    assert sorted(result.url for result in results) == sorted(urls)
+    for host in hosts:
+        times = client.times(host)
+        assert len(times) == 4
+        assert all(later - earlier >= 0.1 - 1e-9 for earlier, later in zip(times, times[1:]))
+    # Hosts are crawled side by side rather than one after the other.
+    assert [netloc for netloc, _path, _at in client.hits] == list(hosts) * 4
+    assert clock.now == pytest.approx(0.3)
+    assert set(scheduler.host_stats()) == set(hosts)
+
+
+def test_crawl_enforces_robots_for_registered_targets(polite_server: int) -> None:
+    base = f"http://127.0.0.1:{polite_server}"
+    registry = Registry()
+    registry.add(f"{base}/private/ignored", respects_robots=False)
+
+    with HttpClient() as client:
+        scheduler = CrawlScheduler(client=client, registry=registry, initial_delay=0, min_delay=0)
+        results = {result.url: result for result in scheduler.crawl([f"{base}/private/a", f"{base}/private/ignored", f"{base}/public"])}
+
+    assert isinstance(results[f"{base}/private/a"].error, RobotsDisallowedError)
+    assert results[f"{base}/private/ignored"].ok
+    assert results[f"{base}/public"].ok
+    assert [hit[1] for hit in _PoliteHandler.hits].count("/robots.txt") == 1
+
+
+def test_crawl_backs_off_and_requeues_on_429() -> None:
+    clock = FakeClock()
+    client = ScriptedClient(clock, {"/limited": [(429, {"Retry-After": "0.2"})]})
+    scheduler = CrawlScheduler(client=client, initial_delay=0, min_delay=0, clock=clock, sleep=clock.sleep)  # type: ignore[arg-type]
+
+    (result,) = list(scheduler.crawl(["http://a.example/limited"], workers=2))
+
+    assert result.ok
+    first, second = client.times("a.example")
+    assert second - first >= 0.2
+    assert scheduler.host_stats()["a.example"]["throttled"] == 1
+
+
+def test_crawl_retries_server_errors_through_the_host_bucket() -> None:
+    clock = FakeClock()
+    client = ScriptedClient(clock, {"/flaky": [(500, {}), (502, {})], "/down": [(500, {})] * 5})
+    budget = RetryBudget(ratio=1.0, min_retries=10)
+    retry = RetryConfig(max_attempts=3, budget=budget)
+    scheduler = CrawlScheduler(client=client, initial_delay=0.1, min_delay=0.1, clock=clock, sleep=clock.sleep)  # type: ignore[arg-type]
+
+    results = {result.url: result for result in scheduler.crawl(["http://a.example/flaky", "http://a.example/down"], retry=retry)}
+
+    assert results["http://a.example/flaky"].ok
+    assert isinstance(results["http://a.example/down"].error, HttpServerError)
+    times = client.times("a.example")
+    assert len(times) == 6
+    # Every re-attempt took its own token, and failures slowed the host down.
+    assert all(later - earlier >= 0.1 - 1e-9 for earlier, later in zip(times, times[1:]))
+    assert times[-1] - times[-2] >= 0.15 - 1e-9
+    # The client makes single attempts; the scheduler owns the retries.
+    assert all(config is not None and config.max_attempts == 1 and config.budget is None for config in client.retries)
+
+
+def test_fetch_retries_through_the_host_bucket() -> None:
+    clock = FakeClock()
+    client = ScriptedClient(clock, {"/flaky": [(503, {}), (500, {})], "/gone": [(404, {})]})
+    scheduler = CrawlScheduler(client=client, initial_delay=0.1, min_delay=0.1, clock=clock, sleep=clock.sleep)  # type: ignore[arg-type]
+
+    response = scheduler.fetch("http://a.example/flaky", retry=RetryConfig(max_attempts=3))
+    assert response.status_code == 200
+    first, second, third = client.times("a.example")
+    assert second - first >= 0.2 - 1e-9 and third - second >= 0.3 - 1e-9
+
+    with pytest.raises(HttpStatusError):
+        scheduler.fetch("http://a.example/gone", retry=RetryConfig(max_attempts=3))
+    assert len(client.times("a.example")) == 4
+
+
+def test_fetch_waits_for_a_saturated_host_with_an_injected_sleep() -> None:
+    clock = FakeClock()
+    client = ScriptedClient(clock)
+    started = threading.Barrier(2)
+    release = threading.Event()
+    get = client.get
+
+    def slow_get(url: str, **kwargs: object) -> Response:
+        if urlsplit(url).path == "/first":
+            started.wait(timeout=5)
+            release.wait(timeout=5)
+        return get(url, **kwargs)  # type: ignore[arg-type]
+
+    client.get = slow_get  # type: ignore[method-assign]
+    scheduler = CrawlScheduler(client=client, initial_delay=0, min_delay=0, per_host=1, clock=clock, sleep=clock.sleep)  # type: ignore[arg-type]
+    errors: list[BaseException] = []
+
+    def fetch(path: str) -> None:
+        try:
+            scheduler.fetch(f"http://a.example{path}")
+        except BaseException as exc:  # noqa: BLE001 - surfaced by the assertion below
+            errors.append(exc)
+
+    first = threading.Thread(target=fetch, args=("/first",))
+    first.start()
+    started.wait(timeout=5)  # /first holds the only slot for the host
+    second = threading.Thread(target=fetch, args=("/second",))
+    second.start()
+    second.join(timeout=0.2)
+    assert second.is_alive()  # blocked on the saturated host, not crashed
+    release.set()
+    first.join(timeout=5)
+    second.join(timeout=5)
+
+    assert errors == []
+    assert [path for _netloc, path, _at in client.hits] == ["/first", "/second"]
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+import requests
+
+from src.crawler.standin import Route, StandinServer, constant, parse_latency
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_standin_serves_etag_and_ranges() -> None:
+    with StandinServer(default=Route(body_size=100_000)) as server:
+        url = server.url("/asset.bin")
+        full = requests.get(url, timeout=5)
+        etag = full.headers["ETag"]
+
+        assert len(full.content) == 100_000
+        assert full.content == server.body(100_000)
+        assert requests.get(url, headers={"If-None-Match": etag}, timeout=5).status_code == 304
+
+        partial = requests.get(url, headers={"Range": "bytes=10-19", "If-Range": etag}, timeout=5)
+        assert partial.status_code == 206
+        assert partial.headers["Content-Range"] == "bytes 10-19/100000"
+        assert partial.content == full.content[10:20]
+
+        suffix = requests.get(url, headers={"Range": "bytes=-5"}, timeout=5)
+        assert suffix.content == full.content[-5:]
+        assert requests.get(url, headers={"Range": "bytes=200000-"}, timeout=5).status_code == 416
+        assert requests.get(url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'}, timeout=5).status_code == 200
+
+
+def test_standin_injects_faults_per_route() -> None:
+    routes = {
+        "/flaky": Route(fail_first=2),
+        "/limited": Route(throttle_rate=1.0, retry_after=1.5),
+        "/broken": Route(error_rate=1.0, error_status=500),
+        "/slow": Route(latency=constant(0.1)),
+    }
+    with StandinServer(routes) as server:
+        statuses = [requests.get(server.url("/flaky/a"), timeout=5).status_code for _ in range(3)]
+        limited = requests.get(server.url("/limited"), timeout=5)
+        started = time.perf_counter()
+        requests.get(server.url("/slow"), timeout=5)
+        slow_elapsed = time.perf_counter() - started
+
+        assert statuses == [503, 503, 200]
+        assert limited.status_code == 429 and limited.headers["Retry-After"] == "1.5"
+        assert requests.get(server.url("/broken"), timeout=5).status_code == 500
+        assert slow_elapsed >= 0.1
+        assert server.hits == {503: 2, 200: 2, 429: 1, 500: 1}
+
+
+def test_standin_stalls_requests_past_client_timeout() -> None:
+    with StandinServer(default=Route(timeout_rate=1.0, stall=1.0)) as server:
+        with pytest.raises(requests.exceptions.Timeout):
+            requests.get(server.url("/"), timeout=0.2)
+
+        # Still stalled: counted as a request but not yet as an answer.
+        assert server.total_requests == 1 and server.total_hits == 0
+
+
+def test_parse_latency_specs() -> None:
+    rng = random.Random(0)
+
+    assert parse_latency("constant:0.25")(rng) == 0.25
+    assert 0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2
+    assert parse_latency("lognormal:0.01,0.5")(rng) > 0
+    with pytest.raises(ValueError):
+        parse_latency("gaussian:1")
+    with pytest.raises(ValueError):
+        parse_latency("uniform:1")
+
+
+def test_bench_http_reports_throughput_and_retry_overhead() -> None:
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(PROJECT_ROOT / "tools" / "bench_http.py"),
+            "--requests",
+            "40",
+            "--clients",
+            "pooled",
+            "async",
+            "--error-rate",
+            "0.2",
+        ],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+    lines = result.stdout.splitlines()
+    assert lines[0].split() == ["client", "req/s", "p50", "ms", "p99", "ms", "failed", "retry", "ovh"]
+    assert [line.split()[0] for line in lines[1:]] == ["pooled", "async"]
+    assert all(line.endswith("%") and not line.endswith(" 0.0%") for line in lines[1:])
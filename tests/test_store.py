@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
 import json
+import subprocess
+import sys
+import threading
 from pathlib import Path
 
 import pytest
 
-from src.store import local
+from src.store import formats, local, locks, writer
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
 
 
 def test_save_and_load_snapshot(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
@@ -42,3 +49,397 @@ def test_load_snapshot_missing_version(tmp_path: Path, monkeypatch: pytest.Monke
 
     with pytest.raises(FileNotFoundError):
         local.load_snapshot("v000000000")
+
+
+def test_iter_snapshot_streams_with_projection_filter_and_paging(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+    records = [{"id": index, "name": f"company-{index}", "active": index % 2 == 0} for index in range(10)]
+    local.save_snapshot(records, version="v1")
+
+    iterator = local.iter_snapshot("v1", fields=["id"], where=lambda record: record["active"], skip=1, limit=3)
+
+    assert not isinstance(iterator, list)
+    assert list(iterator) == [{"id": 2}, {"id": 4}, {"id": 6}]
+    assert [record["id"] for record in local.iter_snapshot("v1", skip=8)] == [8, 9]
+    assert list(local.iter_snapshot("v1", limit=0)) == []
+
+
+def test_iter_snapshot_skips_lines_without_decoding(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+    (tmp_path / "v2.jsonl").write_text("not json\n\n{\"id\": 1}\n", encoding="utf-8")
+
+    assert list(local.iter_snapshot("v2", skip=1)) == [{"id": 1}]
+
+
+def test_iter_snapshot_validates_eagerly(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+
+    with pytest.raises(FileNotFoundError):
+        local.iter_snapshot("v404")
+    with pytest.raises(ValueError):
+        local.iter_snapshot("v1", skip=-1)
+
+
+def test_indexed_snapshot_supports_point_lookups_and_ranges(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+    records = [{"id": index, "company": f"Company {index % 50}", "note": "é"} for index in range(500)]
+    local.save_snapshot(records, version="v3", index_keys=["id", "company"])
+
+    assert (tmp_path / "v3.offsets").stat().st_size == 8 * 501
+    assert local.get_record("v3", 321) == records[321]
+    assert local.get_record("v3", "Company 7", field="company") == records[7]
+    assert local.get_record("v3", 10_000) is None
+    assert local.get_record("v3", "é", field="note") == records[0]  # unindexed field falls back to a scan
+    assert local.read_range("v3", 498, 600) == records[498:]
+    assert local.read_range("v3", 10, 13, use_mmap=False) == records[10:13]
+
+    with local.open_index("v3") as index:
+        assert len(index) == 500
+        assert index.read(42) == records[42]
+        assert index.get("Company 49", key="company") == records[49]
+
+
+def test_resaving_without_index_drops_stale_sidecars(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+    local.save_snapshot([{"id": 1}], version="v4", index_keys=["id"])
+    local.save_snapshot([{"id": 2}, {"id": 1}], version="v4")
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["catalog.json", "v4.jsonl"]
+    assert local.get_record("v4", 1) == {"id": 1}
+    assert local.read_range("v4", 1, 2) == [{"id": 1}]
+    with pytest.raises(FileNotFoundError):
+        local.open_index("v4")
+
+
+def test_gzip_snapshot_round_trips_and_seeks_by_frame(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+    records = [{"id": index, "text": f"record {index} " * 10} for index in range(5000)]
+    local.save_snapshot(records, version="v5", format="jsonl.gz")
+
+    path = tmp_path / "v5.jsonl.gz"
+    frames = (tmp_path / "v5.jsonl.gz.frames").stat().st_size // 16
+    assert frames > 2
+    assert path.stat().st_size < len(gzip.decompress(path.read_bytes())) // 5
+    assert local.load_snapshot("v5") == records
+    assert local.read_range("v5", 4321, 4324) == records[4321:4324]
+    assert list(local.iter_snapshot("v5", fields=["id"], skip=4998)) == [{"id": 4998}, {"id": 4999}]
+
+    (tmp_path / "v5.jsonl.gz.frames").unlink()
+    assert local.read_range("v5", 4321, 4322) == records[4321:4322]
+
+
+def test_columnar_snapshot_keeps_missing_keys_and_projects(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+    monkeypatch.setattr(formats, "ROW_GROUP_SIZE", 4)
+    records = [{"id": index, "name": f"n{index}", "meta": {"tags": ["a"]}} for index in range(6)]
+    records[2] = {"id": 2, "email": None}
+    records[5] = {"name": "n5", "id": 5}
+    local.save_snapshot(records, version="v6", format="columnar")
+
+    assert local.load_snapshot("v6") == records
+    assert list(local.iter_snapshot("v6", fields=["email", "id"], skip=1, limit=2)) == [
+        {"id": 1},
+        {"email": None, "id": 2},
+    ]
+    assert local.get_record("v6", "n5", field="name") == records[5]
+    with pytest.raises(ValueError):
+        local.save_snapshot([1, 2], version="v7", format="columnar")
+
+
+def test_saving_in_another_format_replaces_the_previous_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+    local.save_snapshot([{"id": 1}], version="v8", format="jsonl.gz")
+    local.save_snapshot([{"id": 2}], version="v8", index_keys=["id"])
+    local.save_snapshot([{"id": 3}], version="v8", format="columnar")
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["catalog.json", "v8.cols"]
+    assert local.load_snapshot("v8") == [{"id": 3}]
+    with pytest.raises(ValueError):
+        local.save_snapshot([{"id": 1}], version="v8", format="parquet")
+    with pytest.raises(ValueError):
+        local.save_snapshot([{"id": 1}], version="v8", format="jsonl.gz", index_keys=["id"])
+
+
+@pytest.mark.skipif(formats.zstandard is not None, reason="zstandard is installed")
+def test_zstd_format_needs_optional_dependency(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+
+    with pytest.raises(ModuleNotFoundError):
+        local.save_snapshot([{"id": 1}], version="v9", format="jsonl.zst")
+
+
+def test_bench_store_compares_formats() -> None:
+    result = subprocess.run(
+        [sys.executable, str(PROJECT_ROOT / "tools" / "bench_store.py"), "--records", "500"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+    lines = result.stdout.splitlines()
+    assert lines[0].split()[:3] == ["format", "MiB", "ratio"]
+    assert {line.split()[0] for line in lines[1:]} >= {"jsonl", "jsonl.gz", "columnar"}
+
+
+def test_delta_snapshots_replay_chain_and_checkpoint(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+    base = [{"id": index, "name": f"company-{index}"} for index in range(6)]
+    local.save_snapshot(base, version="v1")
+
+    second = [record for record in base if record["id"] != 2]
+    second[0] = {"id": 0, "name": "renamed"}
+    second.insert(1, {"id": 10, "name": "new"})
+    assert local.save_delta(second, "v1", "v2", checkpoint_every=2) == "v2"
+    third = second[:-1]
+
+    local.save_delta(third, "v2", "v3", checkpoint_every=2, format="jsonl.gz")
+    local.save_delta(third, "v3", "v4", checkpoint_every=2)
+
+    assert local.delta_info("v2") == local.DeltaInfo(
+        base="v1", depth=1, records=6, inserted=1, updated=1, deleted=1
+    )
+    assert local.load_snapshot("v2") == [second[0], *base[1:2], *base[3:], {"id": 10, "name": "new"}]
+    assert len((tmp_path / "v2.delta.jsonl").read_text(encoding="utf-8").splitlines()) == 3
+    assert sorted(local.load_snapshot("v3"), key=lambda record: record["id"]) == sorted(
+        third, key=lambda record: record["id"]
+    )
+    assert local.delta_info("v3").depth == 2
+    assert local.delta_info("v4") is None
+    assert list(local.iter_snapshot("v3", fields=["id"], skip=1, limit=2)) == [{"id": 1}, {"id": 3}]
+    assert local.get_record("v3", 10) == {"id": 10, "name": "new"}
+
+    with pytest.raises(ValueError):
+        local.save_delta(third, "v4", "v4")
+    with pytest.raises(FileNotFoundError):
+        local.save_delta(third, "v404", "v5")
+
+
+def test_diff_snapshots_streams_sorted_runs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+    local.save_snapshot([{"sku": f"s{index}", "price": index} for index in range(9)], version="v1")
+    local.save_snapshot(
+        [{"sku": f"s{index}", "price": index * (2 if index == 4 else 1)} for index in range(8, 0, -1)] + [{"sku": "s9"}],
+        version="v2",
+    )
+
+    changes = list(local.diff_snapshots("v1", "v2", key="sku", run_size=2))
+
+    assert [change.as_dict() for change in changes] == [
+        {"op": "delete", "key": "s0", "before": {"sku": "s0", "price": 0}, "after": None},
+        {"op": "update", "key": "s4", "before": {"sku": "s4", "price": 4}, "after": {"sku": "s4", "price": 8}},
+        {"op": "insert", "key": "s9", "before": None, "after": {"sku": "s9"}},
+    ]
+    assert list(local.diff_snapshots("v2", "v2", key=lambda record: record["sku"], run_size=3)) == []
+
+    local.save_snapshot([{"sku": "s1"}, {"sku": "s1"}], version="v3")
+    with pytest.raises(ValueError):
+        list(local.diff_snapshots("v1", "v3", key="sku"))
+
+
+def test_snapshot_writer_publishes_atomically(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+
+    with local.open_writer("v1", index_keys=["id"], group_size=2) as snapshot:
+        for index in range(5):
+            snapshot.append({"id": index})
+        snapshot.flush()
+        with pytest.raises(FileNotFoundError):
+            local.load_snapshot("v1")
+        assert [path.name for path in tmp_path.glob("v1.*")] == ["v1.lock"]
+
+    assert snapshot.records == 5 and snapshot.closed
+    assert local.load_snapshot("v1") == [{"id": index} for index in range(5)]
+    assert local.get_record("v1", 3) == {"id": 3}
+    assert not list(tmp_path.glob(".*")) and not (tmp_path / "v1.lock").exists()
+    with pytest.raises(ValueError):
+        snapshot.append({"id": 5})
+
+    with pytest.raises(RuntimeError):
+        with local.open_writer("v1") as failed:
+            failed.append({"id": "partial"})
+            raise RuntimeError("crawl aborted")
+    assert local.load_snapshot("v1") == [{"id": index} for index in range(5)]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "catalog.json",
+        "v1.id.keys",
+        "v1.index.json",
+        "v1.jsonl",
+        "v1.offsets",
+    ]
+
+
+def test_snapshot_writer_allocates_free_versions_and_guards_locks(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+    monkeypatch.setattr(writer.time, "time", lambda: 1_700_000_000.5)
+    local.save_snapshot([{"id": 0}], version="v1700000000")
+
+    first = local.open_writer()
+    second = local.open_writer()
+    assert (first.version, second.version) == ("v1700000001", "v1700000002")
+    with pytest.raises(writer.SnapshotLockedError):
+        local.open_writer("v1700000001")
+    first.abort()
+    second.commit()
+    assert local.save_snapshot([{"id": 1}]) == "v1700000001"
+
+    finished = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    stale = {"pid": int(finished.stdout), "host": locks.socket.gethostname(), "created": 0}
+    (tmp_path / "v9.lock").write_text(json.dumps(stale), encoding="utf-8")
+    assert local.save_snapshot([{"id": 9}], version="v9") == "v9"
+
+
+def test_concurrent_stale_lock_takeovers_have_one_winner(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    finished = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    stale = {"pid": int(finished.stdout), "host": locks.socket.gethostname(), "created": 0}
+    lock_path = tmp_path / "v1.lock"
+    lock_path.write_text(json.dumps(stale), encoding="utf-8")
+
+    is_stale = locks._lock_is_stale
+    barrier = threading.Barrier(2)
+
+    def slow_is_stale(path: Path) -> bool:
+        # Both takers see the dead owner before either acts on it.
+        result = is_stale(path)
+        if result:
+            try:
+                barrier.wait(timeout=0.5)
+            except threading.BrokenBarrierError:
+                pass
+        return result
+
+    monkeypatch.setattr(locks, "_lock_is_stale", slow_is_stale)
+    outcomes: list[bool] = []
+    threads = [threading.Thread(target=lambda: outcomes.append(locks.acquire_lock(lock_path))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(outcomes) == [False, True]
+    assert json.loads(lock_path.read_text(encoding="utf-8"))["pid"] == locks.os.getpid()
+    assert [path.name for path in tmp_path.iterdir()] == ["v1.lock"]
+
+
+def test_snapshot_writer_accepts_concurrent_appends(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+
+    with local.open_writer("v1", format="jsonl.gz", durable=False) as snapshot:
+        threads = [
+            threading.Thread(target=snapshot.extend, args=([{"worker": worker, "n": n} for n in range(500)],))
+            for worker in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    records = local.load_snapshot("v1")
+    assert snapshot.records == len(records) == 2000
+    assert sorted((record["worker"], record["n"]) for record in records) == [
+        (worker, n) for worker in range(4) for n in range(500)
+    ]
+
+
+def test_catalog_lists_snapshots_and_rebuilds_from_disk(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+    (tmp_path / "v0.json").write_text(json.dumps([{"id": 0}]), encoding="utf-8")
+    local.save_snapshot([{"id": 1}, {"id": 2}], version="v1")
+    local.save_delta([{"id": 1}, {"id": 3}], "v1", "v2")
+    local.save_snapshot([{"id": 4}], version="v3", format="columnar")
+
+    written = json.loads((tmp_path / "catalog.json").read_text(encoding="utf-8"))
+    assert not written["complete"]
+    entries = {entry.version: entry for entry in local.list_snapshots()}
+    assert set(entries) == {"v0", "v1", "v2", "v3"}
+    assert (entries["v1"].format, entries["v1"].records, entries["v1"].base) == ("jsonl", 2, None)
+    assert (entries["v2"].records, entries["v2"].base) == (2, "v1")
+    assert entries["v3"].records == 1
+    data = (tmp_path / "v1.jsonl").read_bytes()
+    assert entries["v1"].bytes == len(data)
+    assert entries["v1"].checksum == f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+    (tmp_path / "catalog.json").write_text("{broken", encoding="utf-8")
+    rebuilt = local.rebuild_catalog()
+    assert {version: entry.checksum for version, entry in rebuilt.items()} == {
+        version: entry.checksum for version, entry in entries.items()
+    }
+    assert json.loads((tmp_path / "catalog.json").read_text(encoding="utf-8"))["complete"]
+
+
+def test_retention_keeps_last_daily_weekly_and_delta_bases(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    day = 86_400.0
+    start = 1_700_000_000.0  # Tuesday 2023-11-14 22:13 UTC
+
+    def entry(version: str, created: float, base: str | None = None) -> local.SnapshotEntry:
+        return local.SnapshotEntry(version, "jsonl", 1, 1, "sha256:", created, base)
+
+    entries = [
+        entry("v1", start - 30 * day),
+        entry("v2", start - 8 * day),
+        entry("v3", start - 2 * day),
+        entry("v4", start - 1 * day),
+        entry("v5", start - 1 * day + 60, base="v1"),
+        entry("v6", start),
+        entry("v7", start + 60),
+    ]
+    assert local.select_expired(entries, local.RetentionPolicy(keep_last=2)) == ["v1", "v2", "v3", "v4", "v5"]
+    assert local.select_expired(entries, local.RetentionPolicy(keep_daily=2)) == ["v2", "v3", "v4", "v6"]
+    assert local.select_expired(entries, local.RetentionPolicy(keep_weekly=3)) == ["v2", "v4", "v5", "v6"]
+    with pytest.raises(ValueError):
+        local.RetentionPolicy()
+    with pytest.raises(ValueError):
+        local.RetentionPolicy(keep_last=-1, keep_daily=2)
+
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+    for index in range(1, 5):
+        local.save_snapshot([{"id": index}], version=f"v{index}", index_keys=["id"])
+    assert local.apply_retention(local.RetentionPolicy(keep_last=1), dry_run=True) == ["v1", "v2", "v3"]
+    assert locks.acquire_lock(tmp_path / "v2.lock")
+    reader = local.iter_snapshot("v1")
+
+    assert local.apply_retention(local.RetentionPolicy(keep_last=1)) == ["v1", "v3"]
+    assert next(reader) == {"id": 1}
+    assert {path.name.split(".")[0] for path in tmp_path.glob("v*.*")} == {"v2", "v4"}
+    assert (tmp_path / "v2.lock").exists() and local.get_record("v4", 4) == {"id": 4}
+    assert [entry.version for entry in local.list_snapshots()] == ["v2", "v4"]
+
+
+def test_compaction_replaces_delta_chains_without_blocking_readers(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(local, "SNAPSHOT_DIR", tmp_path)
+    base = [{"id": index, "name": f"company-{index}"} for index in range(5)]
+    local.save_snapshot(base, version="v1")
+    second = [{"id": 0, "name": "renamed"}, *base[1:], {"id": 9, "name": "new"}]
+    local.save_delta(second, "v1", "v2", format="jsonl.gz")
+    third = second[1:]
+    local.save_delta(third, "v2", "v3")
+    created = {entry.version: entry.created for entry in local.list_snapshots()}
+
+    reader = local.iter_snapshot("v3")
+    assert local.compact_snapshots(min_depth=2) == ["v3"]
+    assert list(reader) == third
+    assert local.delta_info("v3") is None and local.load_snapshot("v3") == third
+    assert sorted(path.name for path in tmp_path.glob("v3.*")) == ["v3.jsonl"]
+    assert not local.compact_snapshot("v3")
+
+    assert locks.acquire_lock(tmp_path / "v2.lock")
+    assert local.compact_snapshots() == []
+    (tmp_path / "v2.lock").unlink()
+    with local.Compactor(interval=0.01) as compactor:
+        for _ in range(500):
+            if compactor.compacted:
+                break
+            threading.Event().wait(0.01)
+    assert compactor.compacted == ["v2"] and compactor.error is None
+    assert sorted(path.name for path in tmp_path.glob("v2.*")) == ["v2.jsonl.gz", "v2.jsonl.gz.frames"]
+    assert local.load_snapshot("v2") == second
+    entries = {entry.version: entry for entry in local.list_snapshots()}
+    assert [entries[version].base for version in ("v1", "v2", "v3")] == [None, None, None]
+    assert {version: entry.created for version, entry in entries.items()} == created
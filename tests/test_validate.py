@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import json
 from unittest.mock import Mock
 
-from src.validate.schema import Report, ValidationIssue, validate_all
+import pytest
+
+from src.validate.sampling import validate_sample
+from src.validate.schema import (
+    Report,
+    ValidationIssue,
+    validate_all,
+    validate_all_sharded,
+)
 
 
 def test_validate_all_with_valid_payload() -> None:
@@ -67,4 +76,127 @@ def test_validate_all_reports_mixed_issues() -> None:
     assert any(issue.validator == "links" and "Unsupported link scheme" in issue.message for issue in report.issues)
     assert any(issue.validator == "links" and "Unreachable link" in issue.message for issue in report.issues)
     assert any(issue.validator == "links" and "Duplicate link" in issue.message for issue in report.issues)
-    assert checker.call_count == 1
\ No newline at end of file
+    assert checker.call_count == 1
+
+
+def test_validate_all_sharded_matches_serial_report() -> None:
+    records: list[object] = []
+    for index in range(23):
+        if index % 5 == 0:
+            records.append({"title": "", "body": "TODO", "links": ["ftp://x"]})
+        elif index % 7 == 0:
+            records.append("not-a-mapping")
+        else:
+            records.append(
+                {
+                    "id": f"rec-{index}",
+                    "title": f"Record {index}",
+                    "body": (
+                        "A sufficiently long body describing the record"
+                        " in enough detail."
+                    ),
+                    "links": ["https://example.com/a", "https://example.com/a"],
+                }
+            )
+    data = {"records": records}
+
+    serial = validate_all(data)
+    sharded = validate_all_sharded(data, shard_size=4, max_workers=2)
+
+    assert json.dumps(sharded.as_dict()) == json.dumps(serial.as_dict())
+    assert sharded.counts["records"] == 23
+
+
+def test_validate_all_sharded_falls_back_for_invalid_payload() -> None:
+    report = validate_all_sharded({"records": "oops"}, shard_size=1)
+
+    assert report.as_dict() == validate_all({"records": "oops"}).as_dict()
+
+    with pytest.raises(ValueError):
+        validate_all_sharded({"records": []}, shard_size=0)
+
+
+def _sampling_payload(size: int) -> dict[str, object]:
+    records = []
+    for index in range(size):
+        record = {
+            "id": index,
+            "title": "Quarterly update",
+            "body": "This update describes the quarter in a reasonable amount of detail.",
+            "links": ["https://example.com/report"],
+        }
+        if index % 4 == 0:
+            del record["links"]
+        records.append(record)
+    return {"records": records}
+
+
+def test_validate_sample_is_reproducible_and_bounded() -> None:
+    data = _sampling_payload(2_000)
+
+    first = validate_sample(data, sample_size=400, seed=3)
+    second = validate_sample(data, sample_size=400, seed=3)
+
+    assert first.as_dict() == second.as_dict()
+    assert first.sampled == 400
+    assert first.population == 2_000
+    (links_estimate,) = [e for e in first.estimates if e.field == "links"]
+    assert links_estimate.lower <= 0.25 <= links_estimate.upper
+    assert first.overall.affected == links_estimate.affected
+
+
+def test_validate_sample_stops_at_target_margin() -> None:
+    data = _sampling_payload(5_000)
+
+    report = validate_sample(data, margin=0.05, batch_size=100, seed=1)
+
+    assert report.sampled < report.population
+    assert (report.overall.upper - report.overall.lower) / 2 <= 0.05
+
+
+def test_validate_sample_exhaustive_matches_exact_rate() -> None:
+    report = validate_sample(_sampling_payload(40), sample_size=100)
+
+    assert report.exhaustive
+    assert report.overall.rate == report.overall.lower == report.overall.upper == 0.25
+
+    with pytest.raises(ValueError, match="at least one record"):
+        validate_sample({"records": []}, margin=0.05)
+
+
+def test_validate_all_aggregate_groups_systemic_issues() -> None:
+    records = [
+        {"id": f"rec-{index}", "title": "Launch", "body": "A detailed body that is long enough to pass."}
+        for index in range(1_000)
+    ]
+
+    report = validate_all({"records": records}, aggregate=True, max_examples=3)
+
+    assert report.ok is False
+    assert report.issues == []
+    assert report.counts["issues"] == 1_000
+    assert report.groups is not None
+    (group,) = report.groups
+    assert (group.validator, group.field) == ("schema", "links")
+    assert group.template == "Missing required field '{}'."
+    assert group.count == 1_000
+    assert group.examples == ["rec-0", "rec-1", "rec-2"]
+    assert report.as_dict()["groups"][0]["count"] == 1_000
+
+
+def test_report_compact_dict_matches_aggregate_mode() -> None:
+    data = {
+        "records": [
+            {"id": "a", "title": "", "body": "short", "links": ["ftp://a", "ftp://b"]},
+            {"id": "b", "title": "", "body": "short", "links": ["ftp://c"]},
+        ]
+    }
+
+    full = validate_all(data)
+    aggregated = validate_all(data, aggregate=True)
+
+    assert full.as_compact_dict() == aggregated.as_compact_dict()
+    assert full.counts == aggregated.counts
+    groups = {(g["validator"], g["template"]): g for g in full.as_compact_dict()["groups"]}
+    assert groups[("links", "Unsupported link scheme in '{}'.")]["count"] == 3
+    assert groups[("links", "Unsupported link scheme in '{}'.")]["examples"] == ["a", "a", "b"]
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Sequence
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import requests
+
+from src.crawler.http import GET, GET_many, HttpClient, HttpError, RetryConfig
+from src.crawler.standin import Route, StandinServer, parse_latency
+
+CLIENTS: tuple[str, ...] = ("requests", "get", "pooled", "async")
+
+Fetch = Callable[[str], object]
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def _run_threaded(fetch: Fetch, urls: Sequence[str], concurrency: int) -> tuple[list[float], int]:
+    def timed(url: str) -> tuple[float, bool]:
+        started = time.perf_counter()
+        try:
+            fetch(url)
+        except (HttpError, requests.RequestException):
+            return time.perf_counter() - started, False
+        return time.perf_counter() - started, True
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(timed, urls))
+    return [elapsed for elapsed, _ in outcomes], sum(not ok for _, ok in outcomes)
+
+
+def _run_async(
+    urls: Sequence[str], concurrency: int, timeout: float, retry: RetryConfig | None
+) -> tuple[list[float], int]:
+    async def collect() -> tuple[list[float], int]:
+        latencies: list[float] = []
+        failed = 0
+        with HttpClient(pool_maxsize=concurrency) as client:
+            async for result in GET_many(
+                urls, timeout=timeout, concurrency=concurrency, per_host=concurrency, retry=retry, client=client
+            ):
+                latencies.append(result.elapsed)
+                failed += not result.ok
+        return latencies, failed
+
+    return asyncio.run(collect())
+
+
+def _unpooled_get(url: str, timeout: float) -> requests.Response:
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response
+
+
+def run_client(
+    server: StandinServer,
+    client: str,
+    *,
+    requests_count: int,
+    concurrency: int,
+    timeout: float,
+    retry: RetryConfig | None,
+) -> dict[str, float]:
+    """Drive *client* against *server* and return throughput, latency and retry overhead."""
+
+    urls = [server.url(f"/page/{index}") for index in range(requests_count)]
+    server.reset_stats()
+    started = time.perf_counter()
+    if client == "requests":
+        latencies, failed = _run_threaded(lambda url: _unpooled_get(url, timeout), urls, concurrency)
+    elif client == "get":
+        latencies, failed = _run_threaded(lambda url: GET(url, timeout=timeout, retry=retry), urls, concurrency)
+    elif client == "pooled":
+        with HttpClient(pool_maxsize=concurrency) as pooled:
+            latencies, failed = _run_threaded(
+                lambda url: pooled.get(url, timeout=timeout, retry=retry), urls, concurrency
+            )
+    elif client == "async":
+        latencies, failed = _run_async(urls, concurrency, timeout, retry)
+    else:
+        raise ValueError(f"Unknown client: {client}")
+    elapsed = time.perf_counter() - started
+
+    # Counted on arrival: requests the client gave up on may still be stalled server-side.
+    attempts = server.total_requests
+    return {
+        "requests": float(requests_count),
+        "failed": float(failed),
+        "rps": requests_count / elapsed,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "attempts": float(attempts),
+        # Extra requests the server saw because of retries, per logical request.
+        "retry_overhead": (attempts - requests_count) / requests_count,
+    }
+
+
+def run_benchmark(
+    requests_count: int = 500,
+    *,
+    clients: Sequence[str] = CLIENTS,
+    concurrency: int = 8,
+    timeout: float = 2.0,
+    retries: int = 1,
+    route: Route | None = None,
+) -> dict[str, dict[str, float]]:
+    """Benchmark each HTTP client against a local :class:`StandinServer`.
+
+    The ``requests`` client is a per-call ``requests.get`` baseline without
+    retries; the others use *retries* extra attempts on 5xx/network errors.
+    """
+
+    retry = RetryConfig(max_attempts=retries + 1, initial_delay=0.01) if retries else None
+    results: dict[str, dict[str, float]] = {}
+    with StandinServer(default=route or Route()) as server:
+        for client in clients:
+            results[client] = run_client(
+                server,
+                client,
+                requests_count=requests_count,
+                concurrency=concurrency,
+                timeout=timeout,
+                retry=None if client == "requests" else retry,
+            )
+    return results
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark crawler HTTP clients against a local stand-in server.")
+    parser.add_argument("--requests", type=int, default=500, help="Number of GETs per client.")
+    parser.add_argument("--clients", nargs="+", choices=CLIENTS, default=list(CLIENTS), help="Clients to benchmark.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests per client.")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--retries", type=int, default=1, help="Extra attempts on 5xx and network errors.")
+    parser.add_argument("--latency", default="constant:0", help="Server latency, e.g. lognormal:0.01,0.5.")
+    parser.add_argument("--body-size", type=int, default=2048, help="Response body size in bytes.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 503 responses.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of 429 responses.")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Share of requests that stall.")
+    args = parser.parse_args(argv)
+
+    route = Route(
+        body_size=args.body_size,
+        latency=parse_latency(args.latency),
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        timeout_rate=args.timeout_rate,
+        stall=args.timeout * 2,
+    )
+    results = run_benchmark(
+        args.requests,
+        clients=args.clients,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        retries=args.retries,
+        route=route,
+    )
+    print(f"{'client':<10} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'failed':>7} {'retry ovh':>10}")
+    for client, result in results.items():
+        print(
+            f"{client:<10} {result['rps']:>9.0f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+            f"{int(result['failed']):>7} {result['retry_overhead']:>9.1%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
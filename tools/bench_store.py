@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.store import formats, local
+
+FORMATS: tuple[str, ...] = (formats.JSONL, formats.JSONL_GZIP, formats.JSONL_ZSTD, formats.COLUMNAR)
+_WORDS = ("industrial", "supplier", "automation", "sensor", "logistics", "software", "service", "parts")
+
+
+def make_records(count: int, *, seed: int = 0) -> list[dict[str, Any]]:
+    """Return *count* company-like records with a mix of field types."""
+
+    rng = random.Random(seed)
+    return [
+        {
+            "id": index,
+            "company": f"Company {index}",
+            "email": f"contact{index}@example.com",
+            "url": f"https://www.example.com/companies/{index}",
+            "country": rng.choice(("DE", "US", "KR", "JP", "FR")),
+            "score": round(rng.random(), 4),
+            "active": rng.random() < 0.7,
+            "tags": rng.sample(_WORDS, rng.randint(0, 3)),
+            "description": " ".join(rng.choice(_WORDS) for _ in range(rng.randint(10, 40))),
+        }
+        for index in range(count)
+    ]
+
+
+def _timed(action: Any) -> float:
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+
+def run_benchmark(
+    records_count: int = 100_000,
+    *,
+    snapshot_formats: Sequence[str] = FORMATS,
+    fields: Sequence[str] = ("id", "email"),
+    directory: Path | None = None,
+) -> dict[str, dict[str, float]]:
+    """Save the same records in each format and time full and projected scans.
+
+    Formats whose optional dependency is missing are skipped.
+    """
+
+    records = make_records(records_count)
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory(dir=directory) as scratch:
+        original_dir = local.SNAPSHOT_DIR
+        local.SNAPSHOT_DIR = Path(scratch)
+        try:
+            for index, snapshot_format in enumerate(snapshot_formats):
+                version = f"v{index}"
+                try:
+                    save = _timed(lambda: local.save_snapshot(records, version, format=snapshot_format))
+                except ModuleNotFoundError:
+                    continue
+                size = sum(path.stat().st_size for path in Path(scratch).glob(f"{version}.*"))
+                middle = records_count // 2
+                results[snapshot_format] = {
+                    "bytes": float(size),
+                    "save_s": save,
+                    "save_rps": records_count / save,
+                    "scan_s": _timed(lambda: sum(1 for _ in local.iter_snapshot(version))),
+                    "project_s": _timed(lambda: sum(1 for _ in local.iter_snapshot(version, fields=fields))),
+                    "range_ms": _timed(lambda: local.read_range(version, middle, middle + 10)) * 1000,
+                }
+        finally:
+            local.SNAPSHOT_DIR = original_dir
+    return results
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare snapshot formats by size and scan speed.")
+    parser.add_argument("--records", type=int, default=100_000, help="Number of records per snapshot.")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS), help="Formats to compare.")
+    parser.add_argument("--fields", nargs="+", default=["id", "email"], help="Fields read by the projected scan.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.records, snapshot_formats=args.formats, fields=args.fields)
+    baseline = results.get(formats.JSONL)
+    print(
+        f"{'format':<10} {'MiB':>8} {'ratio':>6} {'save s':>7} {'krec/s':>7} "
+        f"{'scan s':>7} {'proj s':>7} {'range ms':>9}"
+    )
+    for snapshot_format, result in results.items():
+        ratio = result["bytes"] / baseline["bytes"] if baseline else 1.0
+        print(
+            f"{snapshot_format:<10} {result['bytes'] / 2**20:>8.1f} {ratio:>6.2f} {result['save_s']:>7.2f} "
+            f"{result['save_rps'] / 1000:>7.0f} {result['scan_s']:>7.2f} {result['project_s']:>7.2f} "
+            f"{result['range_ms']:>9.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())